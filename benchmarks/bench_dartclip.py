@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Benchmark: .dartclip generation throughput.
+
+Compares the ElementTree writer (create_dartclip, one tree per play) with the
+template-based batch writer (create_dartclips, serial and threaded) on a set
+of synthetic events, and checks that both produce byte-identical files.
+
+Usage:
+    python benchmarks/bench_dartclip.py --events 10000 --workers 8
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pf_events import Event, EventColumns
+from utils.pf_create_dartclip import create_dartclip, create_dartclips
+
+
+def make_events(count, seed=0):
+    # Hudl-style breakdown rows with a few awkward characters to escape
+    rng = random.Random(seed)
+    columns = EventColumns(['Name', 'Position', 'Duration', 'Down', 'ODK', 'Play Type',
+                            'DIST', 'RESULT', 'Formation', 'Notes'])
+    events = []
+    position = 0
+    for index in range(count):
+        duration = rng.randint(4000, 12000)
+        row = {
+            'Name': f"Play {index + 1}",
+            'Position': str(position),
+            'Duration': str(duration),
+            'Down': str(rng.randint(1, 4)),
+            'ODK': rng.choice(['O', 'D', 'K']),
+            'Play Type': rng.choice(['Run', 'Pass', 'Punt', 'FG']),
+            'DIST': str(rng.randint(1, 15)),
+            'RESULT': rng.choice(['Gain', 'Loss', 'Incomplete', 'TD']),
+            'Formation': rng.choice(['Trips Rt', 'Ace', 'Gun "Empty"', 'I <Tight>']),
+            'Notes': rng.choice(['', 'Q&A', 'Coverage: Cover 3', 'Blitz -> Sam']),
+        }
+        events.append(Event(index, row, columns))
+        position += duration + rng.randint(5000, 40000)
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark .dartclip generation")
+    parser.add_argument('--events', type=int, default=10000, help="Number of synthetic events")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Threads for the batch writer")
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+
+    with tempfile.TemporaryDirectory() as tmp_folder:
+        results = {}
+        for label in ('elementtree', 'batch', 'batch_threaded'):
+            folder = os.path.join(tmp_folder, label)
+            os.makedirs(folder)
+            names = [os.path.join(folder, f"Play_{index + 1:03d}") for index in range(len(events))]
+
+            start = time.perf_counter()
+            if label == 'elementtree':
+                for event, name in zip(events, names):
+                    create_dartclip(event, name)
+            else:
+                workers = args.workers if label == 'batch_threaded' else 1
+                errors = create_dartclips(zip(events, names), workers=workers)
+                assert not any(errors), [error for error in errors if error][:3]
+            results[label] = time.perf_counter() - start
+
+        # Every batch file must match the ElementTree output byte for byte
+        for label in ('batch', 'batch_threaded'):
+            for index in range(len(events)):
+                name = f"Play_{index + 1:03d}.dartclip"
+                with open(os.path.join(tmp_folder, 'elementtree', name), 'rb') as f:
+                    expected = f.read()
+                with open(os.path.join(tmp_folder, label, name), 'rb') as f:
+                    if f.read() != expected:
+                        raise AssertionError(f"{label} output differs for {name}")
+
+    print(f"{args.events} events, byte-identical output: yes")
+    for label, seconds in results.items():
+        print(f"  {label:15s} {seconds:8.3f}s  {args.events / seconds:10.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+Benchmark: concurrent re-encode jobs versus threads per job.
+
+Re-encodes the clips of a CSV with every split of the core budget into
+jobs x threads (powers of two), reports the measured clips per minute next
+to the scheduler's estimate, and marks the split the scheduler would pick.
+Use it to check (and calibrate ENCODE_MODEL / the profile costs) on the
+render machine.
+
+Usage:
+    python benchmarks/bench_encode_threads.py "Game.mp4" "Game.csv" --profile review-fast --budget 16 --limit 40
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_splitter import VideoSplitter
+from utils.pf_encoding import ENCODING_PROFILES, get_profile
+from utils.pf_events import read_events
+from utils.pf_probe import get_video_info
+from utils.pf_scheduler import encode_cost, plan_encodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark jobs x threads splits of concurrent re-encodes")
+    parser.add_argument('video', help="Source video")
+    parser.add_argument('csv', help="CSV with the clips (Position / Duration)")
+    parser.add_argument('--profile', default='review-fast', choices=list(ENCODING_PROFILES))
+    parser.add_argument('--budget', type=int, default=os.cpu_count() or 1, help="Core budget")
+    parser.add_argument('--limit', type=int, default=30, help="Number of clips to encode")
+    parser.add_argument('--buffer', type=float, default=0.5, help="Seconds added to each clip")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    events = read_events(args.csv)[:args.limit]
+    durations = [event.duration / 1000 + args.buffer for event in events]
+    cost = encode_cost(get_profile(args.profile)['cost'], get_video_info(args.video))
+    plan = plan_encodes(durations, args.budget, cost)
+    estimates = {(candidate['jobs'], candidate['threads']): candidate for candidate in plan['candidates']}
+
+    threads = 1
+    splits = []
+    while threads <= args.budget:
+        splits.append((max(1, args.budget // threads), threads))
+        threads *= 2
+
+    print(f"{len(events)} clips, mean {sum(durations) / len(durations):.1f}s, profile {args.profile}, "
+          f"budget {args.budget} cores; planned {plan['jobs']} jobs x {plan['threads']} threads")
+    for jobs, threads in splits:
+        with tempfile.TemporaryDirectory(prefix="bench_threads_") as tmp_folder:
+            splitter = VideoSplitter({'reencode': True, 'profile': args.profile, 'create_dartclip': False,
+                                      'resume': False, 'workers': jobs, 'threads_per_job': threads,
+                                      'buffer': args.buffer})
+            start = time.perf_counter()
+            result = splitter.split_video(args.video, events, tmp_folder)
+            seconds = time.perf_counter() - start
+
+        estimate = estimates.get((min(jobs, len(events)), threads))
+        estimated = f"{estimate['clips_per_minute']:7.1f}" if estimate else "      -"
+        marker = "  <- planned" if (min(jobs, len(events)), threads) == (plan['jobs'], plan['threads']) else ""
+        print(f"{jobs:3d} jobs x {threads:2d} threads  {seconds:8.1f}s  "
+              f"{result['clips_created'] * 60 / seconds:7.1f} clips/min (estimated {estimated}){marker}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Benchmark: encoding speed and output size of the encoding profiles.
+
+Encodes the same stretch of a video with every profile (see
+utils/pf_encoding.py) and reports the encoding speed in source frames per
+second, the realtime factor, the output size and the bitrate. Without a
+video, a synthetic 1080p test pattern is generated first (its size figures
+say little about real game film, so use real footage for those).
+
+Usage:
+    python benchmarks/bench_encoding_profiles.py "Game.mp4" --start 600 --duration 30
+    python benchmarks/bench_encoding_profiles.py --profiles review-fast proxy --json results.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pf_encoding import ENCODING_PROFILES, encoder_args
+from utils.pf_probe import get_video_info
+
+
+def make_test_video(path, duration):
+    # moving 1080p test pattern with a tone, encoded like a typical camera file
+    cmd = ["ffmpeg", "-y", "-v", "error",
+           "-f", "lavfi", "-i", f"testsrc2=s=1920x1080:r=30:d={duration}",
+           "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+           "-c:v", "libx264", "-preset", "veryfast", "-crf", "20", "-g", "60",
+           "-c:a", "aac", "-shortest", path]
+    subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL)
+
+
+def encode(video_path, profile, start, duration, output_path):
+    cmd = (["ffmpeg", "-y", "-v", "error", "-ss", str(start), "-t", str(duration), "-i", video_path] +
+           encoder_args(profile) + [output_path])
+    begin = time.perf_counter()
+    subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL)
+    return time.perf_counter() - begin
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the encoding profiles")
+    parser.add_argument('video', nargs='?', help="Source video (default: synthetic 1080p test pattern)")
+    parser.add_argument('--start', type=float, default=0.0, help="Start of the encoded stretch in seconds")
+    parser.add_argument('--duration', type=float, default=10.0, help="Length of the encoded stretch in seconds")
+    parser.add_argument('--profiles', nargs='+', default=list(ENCODING_PROFILES), choices=list(ENCODING_PROFILES))
+    parser.add_argument('--json', help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_encoding_") as tmp_folder:
+        video_path = args.video
+        if not video_path:
+            video_path = os.path.join(tmp_folder, "testsrc.mp4")
+            make_test_video(video_path, args.start + args.duration)
+
+        info = get_video_info(video_path)
+        source_frames = round(min(args.duration, info['duration'] - args.start) * info['fps'])
+        print(f"{os.path.basename(video_path)}: {info['width']}x{info['height']} @ {info['fps']:.2f} fps, "
+              f"{source_frames} frames from {args.start:.1f}s")
+
+        results = []
+        for profile in args.profiles:
+            output_path = os.path.join(tmp_folder, f"{profile}.mp4")
+            seconds = encode(video_path, profile, args.start, args.duration, output_path)
+            size = os.path.getsize(output_path)
+            output_info = get_video_info(output_path)
+            result = {
+                'profile': profile,
+                'wall_time': round(seconds, 3),
+                'encode_fps': round(source_frames / seconds, 1),
+                'realtime': round(source_frames / info['fps'] / seconds, 2),
+                'size_mb': round(size / 1e6, 2),
+                'bitrate_mbps': round(size * 8 / 1e6 / output_info['duration'], 2),
+                'resolution': f"{output_info['width']}x{output_info['height']}",
+            }
+            results.append(result)
+            print(f"{profile:<15s} {result['encode_fps']:8.1f} fps  x{result['realtime']:<6.2f} "
+                  f"{result['size_mb']:8.2f} MB  {result['bitrate_mbps']:6.2f} Mbit/s  {result['resolution']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'video': args.video, 'start': args.start, 'duration': args.duration,
+                       'cpu_count': os.cpu_count(), 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+"""
+Benchmark: every stage of the pipeline on a synthetic game film.
+
+Generates (or reuses) a fixture with benchmarks/fixtures.py and times the
+stages on it:
+
+- split_copy:      VideoSplitter.split_video, stream copy, one clip per play
+- split_reencode:  VideoSplitter.split_video, re-encoded with --profile (first --reencode-clips plays)
+- dartclips:       VideoSplitter.create_dartclips_for_folder for the copied clips
+- concat:          concatenate_folder on the copied clips (timeline, concat, clip_times.csv)
+- frames:          extract_frames_from_videos, --frames random frames per copied clip
+- scenes:          scene_detection with the proxy decode
+- scenes_full:     scene_detection with PySceneDetect at full resolution (not run by default)
+
+Every stage runs --repeat times on fresh output folders; the JSON results
+hold the single run times, the median, throughput figures, the machine, the
+FFmpeg build and the git commit. With --compare, the medians are checked
+against an earlier result file and the run fails (exit code 1) if a stage
+got slower than --tolerance allows, so regressions show up between versions.
+
+Usage:
+    python benchmarks/bench_pipeline.py --duration 3600 --json results/main.json
+    python benchmarks/bench_pipeline.py --duration 3600 --stages split_copy concat --compare results/main.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import FIXTURE_DEFAULTS, ensure_fixture
+from video_splitter import VideoSplitter
+from utils.pf_encoding import ENCODING_PROFILES
+from utils.pf_events import read_events
+from utils.pf_progress import ProgressReporter
+
+STAGES = ['split_copy', 'split_reencode', 'dartclips', 'concat', 'frames', 'scenes', 'scenes_full']
+DEFAULT_STAGES = [stage for stage in STAGES if stage != 'scenes_full']
+
+
+def run_git(*args):
+    try:
+        result = subprocess.run(['git'] + list(args), capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    ffmpeg = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True).stdout.splitlines()
+    return {
+        'git_commit': run_git('rev-parse', 'HEAD'),
+        'git_dirty': bool(run_git('status', '--porcelain', '--untracked-files=no')),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'ffmpeg': ffmpeg[0] if ffmpeg else None,
+    }
+
+
+def fresh_folder(path):
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    return path
+
+
+def splitter(**config):
+    return VideoSplitter(dict({'create_dartclip': False, 'resume': False}, **config))
+
+
+def run_split(config, video_path, events, output):
+    # the final FFmpeg progress record of every clip gives its encoding speed (and keeps FFmpeg quiet)
+    finished = []
+    progress = ProgressReporter(callbacks=[lambda record: finished.append(record)
+                                           if record['event'] == 'ffmpeg' and record['done'] else None])
+    result = splitter(progress=progress, **config).split_video(video_path, events, output)
+    speeds = [record['speed'] for record in finished if record.get('speed')]
+    return result, {'clips': result['clips_created'], 'failed': result['clips_failed'],
+                    'media_seconds': sum(event.duration for event in events) / 1000,
+                    'clip_speed_median': round(statistics.median(speeds), 2) if speeds else None,
+                    'stage_times': result['stage_times']}
+
+
+class PipelineBench:
+    """Runs the stages on one fixture; the copied clips are shared by the later stages."""
+
+    def __init__(self, fixture, workdir, args):
+        self.fixture = fixture
+        self.workdir = workdir
+        self.args = args
+        self.events = read_events(fixture['csv'])
+        self.clips_folder = None
+
+    def copied_clips(self):
+        # dartclips, concat and frames work on the clips of a copy split (made untimed if needed)
+        if self.clips_folder is None:
+            result = splitter(workers=self.args.workers).split_video(
+                self.fixture['video'], self.events, fresh_folder(os.path.join(self.workdir, 'clips')))
+            self.clips_folder = result['output_folder']
+        return self.clips_folder
+
+    def clip_files(self):
+        folder = self.copied_clips()
+        return sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                      if name.startswith("Play_") and name.endswith(".mp4"))
+
+    def run_split_copy(self, output):
+        result, details = run_split({'workers': self.args.workers}, self.fixture['video'], self.events, output)
+        self.clips_folder = result['output_folder']
+        return details
+
+    def run_split_reencode(self, output):
+        config = {'reencode': True, 'profile': self.args.profile, 'workers': 0, 'core_budget': self.args.core_budget}
+        result, details = run_split(config, self.fixture['video'], self.events[:self.args.reencode_clips], output)
+        return details
+
+    def run_dartclips(self, output):
+        # the dartclip files go next to the clips; remove those of an earlier run first
+        folder = self.copied_clips()
+        for name in os.listdir(folder):
+            if name.endswith(".dartclip"):
+                os.remove(os.path.join(folder, name))
+        created = splitter(split_video=False, create_dartclip=True,
+                           workers=self.args.workers).create_dartclips_for_folder(self.events, folder)
+        return {'clips': created}
+
+    def run_concat(self, output):
+        from script_concatenate_and_import_csv import concatenate_folder
+
+        files = self.clip_files()
+        output_path = os.path.join(output, "Concatenated_Video.mp4")
+        timeline = concatenate_folder(self.copied_clips(), output_path, progress=ProgressReporter())
+        return {'clips': len(files), 'media_seconds': sum(entry['duration_us'] for entry in timeline) / 1e6}
+
+    def run_frames(self, output):
+        import extract_frames
+
+        files = self.clip_files()
+        results = extract_frames.extract_frames_from_videos(files, output, num_frames=self.args.frames, seed=0,
+                                                            workers=self.args.workers or None)
+        return {'clips': len(files), 'frames': sum(len(frames) for frames in results.values())}
+
+    def run_scenes(self, output, proxy=True):
+        from script_scenedetect import scene_detection
+
+        scene_list, scene_file = scene_detection(self.fixture['video'], proxy=proxy, use_cached_metrics=False,
+                                                 workers=self.args.workers if proxy else 1)
+        return {'scenes': len(scene_list), 'media_seconds': self.fixture['params']['duration'],
+                'expected_scenes': 3 * self.fixture['events']}
+
+    def run_scenes_full(self, output):
+        return self.run_scenes(output, proxy=False)
+
+    def run_stage(self, stage):
+        runner = getattr(self, f"run_{stage}")
+        if stage in ('dartclips', 'concat', 'frames'):
+            self.copied_clips()  # not part of the timing
+
+        times = []
+        details = {}
+        for _ in range(self.args.repeat):
+            output = fresh_folder(os.path.join(self.workdir, stage))
+            start = time.perf_counter()
+            details = runner(output)
+            times.append(time.perf_counter() - start)
+
+        median = statistics.median(times)
+        result = {'median': round(median, 3), 'best': round(min(times), 3), 'runs': [round(t, 3) for t in times]}
+        # the details (counts, speeds, stage times) are those of the last run
+        result.update(details)
+        # throughput of the median run
+        if details.get('clips'):
+            result['clips_per_second'] = round(details['clips'] / median, 2)
+        if details.get('media_seconds'):
+            result['realtime_factor'] = round(details['media_seconds'] / median, 2)
+        return result
+
+
+def compare_results(current, baseline, tolerance):
+    """Print the median of every stage against a baseline; returns the regressed stages."""
+    if current['fixture'] != baseline.get('fixture'):
+        print("Warning: the baseline was measured on a different fixture")
+    print(f"{'stage':<16s} {'baseline':>10s} {'current':>10s}  change")
+    regressions = []
+    for stage, result in current['stages'].items():
+        old = baseline.get('stages', {}).get(stage)
+        if not old:
+            print(f"{stage:<16s} {'-':>10s} {result['median']:9.2f}s")
+            continue
+        change = result['median'] / old['median'] - 1 if old['median'] else 0.0
+        regressed = change > tolerance
+        if regressed:
+            regressions.append(stage)
+        print(f"{stage:<16s} {old['median']:9.2f}s {result['median']:9.2f}s  {change:+7.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on a synthetic game film")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=DEFAULT_STAGES)
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), "pf_bench"),
+                        help="Folder for the fixtures (kept for later runs) and the outputs")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per stage (the median is compared)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Workers of the stages")
+    parser.add_argument('--profile', default='proxy', choices=list(ENCODING_PROFILES),
+                        help="Profile of split_reencode")
+    parser.add_argument('--reencode-clips', type=int, default=10, help="Plays re-encoded by split_reencode")
+    parser.add_argument('--core-budget', type=int, help="Cores of split_reencode (default: all)")
+    parser.add_argument('--frames', type=int, default=5, help="Frames extracted per clip")
+    parser.add_argument('--json', help="Write the results to this file (default: <workdir>/results_<commit>.json)")
+    parser.add_argument('--compare', help="Earlier results to compare the medians with")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="Allowed slowdown against --compare before a stage counts as a regression")
+    for key, value in FIXTURE_DEFAULTS.items():
+        parser.add_argument(f"--{key}", type=type(value), help=f"Fixture {key} (default: {value})")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    fixture_args = {key: getattr(args, key) for key in FIXTURE_DEFAULTS}
+    fixture_start = time.perf_counter()
+    fixture = ensure_fixture(os.path.join(args.workdir, "fixtures"), **fixture_args)
+    print(f"Fixture {os.path.basename(fixture['video'])}: {fixture['events']} plays"
+          f"{f', generated in {time.perf_counter() - fixture_start:.1f}s' if fixture['created'] else ''}")
+
+    bench = PipelineBench(fixture, args.workdir, args)
+    results = dict(environment(), timestamp=time.strftime('%Y-%m-%dT%H:%M:%S'), fixture=fixture['params'],
+                   options={'repeat': args.repeat, 'workers': args.workers, 'profile': args.profile,
+                            'reencode_clips': args.reencode_clips, 'core_budget': args.core_budget,
+                            'frames': args.frames},
+                   stages={})
+    for stage in [stage for stage in STAGES if stage in args.stages]:
+        result = bench.run_stage(stage)
+        results['stages'][stage] = result
+        throughput = "".join(f"  {key} {result[key]}" for key in ('clips_per_second', 'realtime_factor')
+                             if key in result)
+        print(f"{stage:<16s} median {result['median']:8.2f}s  best {result['best']:8.2f}s{throughput}")
+
+    json_path = args.json or os.path.join(args.workdir, f"results_{(results['git_commit'] or 'unknown')[:10]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(json_path)), exist_ok=True)
+    with open(json_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results: {json_path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare_results(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
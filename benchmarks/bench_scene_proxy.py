@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Benchmark: proxy scene detection against the full-resolution reference.
+
+Runs the regular PySceneDetect pass (OpenCV decode, AdaptiveDetector) once
+as the reference, then the FFmpeg proxy pass for every requested proxy width
+and frame skip, and reports the run time and how well the proxy cuts match
+the reference cuts.
+
+Usage:
+    python benchmarks/bench_scene_proxy.py "Game.mp4" --widths 256 192 --skips 0 1 2
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scenedetect
+
+from utils.pf_scene_detect import DETECTOR_PARAMS, PROXY_WIDTH, detect_scenes_proxy, compare_scene_lists
+
+
+def detect_full_resolution(video_path):
+    video_stream = scenedetect.open_video(video_path)
+    scene_manager = scenedetect.SceneManager(scenedetect.StatsManager())
+    scene_manager.add_detector(scenedetect.AdaptiveDetector(**DETECTOR_PARAMS))
+    scene_manager.detect_scenes(video=video_stream)
+    return scene_manager.get_scene_list()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark proxy scene detection")
+    parser.add_argument('video', help="Reference game video")
+    parser.add_argument('--widths', type=int, nargs='+', default=[PROXY_WIDTH], help="Proxy widths to test")
+    parser.add_argument('--skips', type=int, nargs='+', default=[0, 1, 2], help="Frame skips to test")
+    parser.add_argument('--tolerance', type=int, default=2, help="Allowed cut offset in frames")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    reference = detect_full_resolution(args.video)
+    reference_time = time.perf_counter() - start
+    print(f"full resolution          {reference_time:8.2f}s  {len(reference)} scenes")
+
+    for width in args.widths:
+        for skip in args.skips:
+            start = time.perf_counter()
+            scenes = detect_scenes_proxy(args.video, proxy_width=width, frame_skip=skip,
+                                         stats_manager=scenedetect.StatsManager())
+            seconds = time.perf_counter() - start
+            result = compare_scene_lists(reference, scenes, tolerance_frames=args.tolerance)
+            print(f"proxy w={width:<4d} skip={skip:<2d}  {seconds:8.2f}s  x{reference_time / seconds:4.1f}  "
+                  f"recall {result['recall']:.3f}  precision {result['precision']:.3f}  "
+                  f"max offset {result['max_offset']} frames  "
+                  f"missed {result['missed'][:5]}  extra {result['extra'][:5]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""
+Synthetic game film for the benchmarks.
+
+Generates a video that cuts like a broadcast of a football game, entirely
+from FFmpeg's lavfi test sources, together with the matching event CSV:
+
+    | scoreboard | sideline ............ | endzone ............ | scoreboard | ...
+      (smptebars)  (testsrc2)              (testsrc2, mirrored)
+
+Every play is a short scoreboard shot followed by the two camera angles,
+with hard cuts between them (what the scene detector and the play pattern
+look for). The video has a fixed GOP (a keyframe every `gop` frames and no
+scene-cut keyframes, like camera footage), an AAC tone as audio track, and
+can be hours long. The CSV has one event per play (the two angles), with
+Position and Duration in milliseconds like a Hudl export.
+
+Only one play is encoded; longer fixtures repeat it with a stream copy, so
+a multi-hour fixture takes seconds (keep the play length a multiple of the
+GOP for evenly spaced keyframes). Fixtures are written once per parameter
+set and reused; the file name holds the parameters.
+
+Usage:
+    python benchmarks/fixtures.py bench_data --duration 3600 --fps 60 --gop 120
+"""
+
+import os
+import csv
+import argparse
+import subprocess
+from typing import Any, Dict, List
+
+# defaults of a fixture: a quarter-sized 60 fps broadcast, one play every 30 seconds
+FIXTURE_DEFAULTS = {
+    'duration': 300,         # seconds
+    'width': 640,
+    'height': 360,
+    'fps': 60,
+    'gop': 120,              # frames between keyframes
+    'scoreboard': 3.0,       # seconds of scoreboard before every play
+    'angle': 13.5,           # seconds per camera angle
+    'crf': 23,
+}
+
+
+def fixture_params(**params: Any) -> Dict[str, Any]:
+    """Fixture parameters with the defaults filled in (unknown keys raise a ValueError)."""
+    unknown = set(params) - set(FIXTURE_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown fixture parameters: {', '.join(sorted(unknown))}")
+    return dict(FIXTURE_DEFAULTS, **{key: value for key, value in params.items() if value is not None})
+
+
+def fixture_name(params: Dict[str, Any]) -> str:
+    """File name (without extension) that identifies a parameter set."""
+    return (f"game_{params['duration']:g}s_{params['width']}x{params['height']}_{params['fps']:g}fps_"
+            f"gop{params['gop']}_play{params['scoreboard']:g}+{params['angle']:g}x2")
+
+
+def play_events(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One event per complete play of the fixture: the two angles after the scoreboard."""
+    cycle = params['scoreboard'] + 2 * params['angle']
+    events = []
+    start = 0.0
+    while start + cycle <= params['duration'] + 1e-9:
+        events.append({
+            'Name': f"Play {len(events) + 1}",
+            'Position': round((start + params['scoreboard']) * 1000),
+            'Duration': round(2 * params['angle'] * 1000),
+            'ODK': 'ODK'[len(events) % 3],
+            'Down': len(events) % 4 + 1,
+        })
+        start += cycle
+    return events
+
+
+def write_events_csv(events: List[Dict[str, Any]], csv_path: str) -> None:
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(events[0]) if events else ['Name', 'Position', 'Duration'])
+        writer.writeheader()
+        writer.writerows(events)
+
+
+def make_game_video(video_path: str, params: Dict[str, Any]) -> None:
+    """
+    Write the synthetic game film: one encoded play, repeated up to the duration.
+
+    Raises:
+        subprocess.CalledProcessError: If FFmpeg fails.
+    """
+    cycle = params['scoreboard'] + 2 * params['angle']
+    if params['duration'] <= cycle:
+        encode_plays(video_path, params, params['duration'])
+        return
+
+    play_path = os.path.splitext(video_path)[0] + ".play.mp4"
+    try:
+        encode_plays(play_path, params, cycle)
+        cmd = ["ffmpeg", "-y", "-v", "error", "-hide_banner",
+               "-stream_loop", "-1", "-i", play_path,
+               "-map", "0", "-c", "copy", "-t", str(params['duration']), video_path]
+        subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL)
+    finally:
+        if os.path.exists(play_path):
+            os.remove(play_path)
+
+
+def encode_plays(video_path: str, params: Dict[str, Any], duration: float) -> None:
+    """Encode `duration` seconds of plays from the lavfi test sources."""
+    size = f"{params['width']}x{params['height']}"
+    rate = params['fps']
+    scoreboard, angle = params['scoreboard'], params['angle']
+    cycle = scoreboard + 2 * angle
+    # position within the current play; the overlays switch the angle with hard cuts
+    phase = f"mod(t\\,{cycle:g})"
+    graph = (
+        f"testsrc2=s={size}:r={rate}:d={duration}[sideline];"
+        f"testsrc2=s={size}:r={rate}:d={duration},hflip[endzone];"
+        f"smptebars=s={size}:r={rate}:d={duration}[scoreboard];"
+        f"[sideline][endzone]overlay=enable='gte({phase}\\,{scoreboard + angle:g})'[angles];"
+        f"[angles][scoreboard]overlay=enable='lt({phase}\\,{scoreboard:g})',format=yuv420p[v]"
+    )
+    cmd = ["ffmpeg", "-y", "-v", "error", "-hide_banner",
+           "-filter_complex", graph,
+           "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+           "-map", "[v]", "-map", "0:a",
+           "-c:v", "libx264", "-preset", "veryfast", "-crf", str(params['crf']),
+           # fixed GOP like a camera: no extra keyframes at the cuts
+           "-g", str(params['gop']), "-keyint_min", str(params['gop']), "-sc_threshold", "0",
+           "-c:a", "aac", "-b:a", "96k",
+           "-t", str(duration), video_path]
+    subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL)
+
+
+def ensure_fixture(folder: str, **params: Any) -> Dict[str, Any]:
+    """
+    Return the fixture for a parameter set, generating it if it does not exist yet.
+
+    Args:
+        folder (str): Folder for the fixtures.
+        **params: Overrides of FIXTURE_DEFAULTS.
+
+    Returns:
+        dict: video (path), csv (path), events (number of plays), params and
+              created (False if an existing fixture was reused).
+    """
+    params = fixture_params(**params)
+    os.makedirs(folder, exist_ok=True)
+    base = os.path.join(folder, fixture_name(params))
+    video_path, csv_path = base + ".mp4", base + ".csv"
+
+    created = False
+    if not os.path.exists(video_path):
+        # write under a temporary name, so an interrupted run is not taken for a fixture
+        tmp_path = base + ".part.mp4"
+        make_game_video(tmp_path, params)
+        os.replace(tmp_path, video_path)
+        created = True
+    events = play_events(params)
+    write_events_csv(events, csv_path)
+    return {'video': video_path, 'csv': csv_path, 'events': len(events), 'params': params, 'created': created}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic game film and its event CSV")
+    parser.add_argument('folder', help="Folder for the fixture")
+    for key, value in FIXTURE_DEFAULTS.items():
+        parser.add_argument(f"--{key}", type=type(value), help=f"default: {value}")
+    args = vars(parser.parse_args())
+    folder = args.pop('folder')
+    fixture = ensure_fixture(folder, **args)
+    print(f"{fixture['video']} ({fixture['events']} plays{'' if fixture['created'] else ', existing'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,18 @@
 import random
 import subprocess
-import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 # own tools
 from utils.pf_helpers import select_folder
 from utils.pf_helpers import select_file
+from utils import pf_probe as probe
+from utils.pf_frame_dataset import create_frame_dataset, select_expression
 
 
 def get_video_info(video_path):
-    # use the subprocess and ffmpeg (ie ffprobe) to get the video info
-    cmd = [
-        'ffprobe',
-        '-v', 'error',
-        '-print_format', 'json',
-        '-show_streams',
-        video_path
-    ]
-    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    return json.loads(result.stdout)
+    # ffprobe info from the shared probe module (cached by path, size and mtime)
+    return probe.get_video_info(video_path)
 
 def get_video_files_from_folder(folder_path, extensions=['.mp4'], filter_text=None):
     video_files = []
@@ -30,49 +24,109 @@ def get_video_files_from_folder(folder_path, extensions=['.mp4'], filter_text=No
     return video_files
 
 
-def extract_random_frames(video_path, output_dir, num_frames=50, presnap_flag=True):
+def sample_frame_numbers(total_frames, num_frames, presnap_flag=True, rng=None):
+    # Draw the sorted frame numbers to extract (same rules as before, but from a seedable generator)
+    rng = rng or random.Random()
+
+    # if we want to focus on the presnap phase, we'll crudely take frames from the first 1/3 of video
+    if presnap_flag:
+        total_frames = total_frames // 3
+        # Ensure the first frame is included
+        random_frames = [1]
+        population = range(2, total_frames + 1)
+        random_frames += rng.sample(population, min(num_frames - 1, len(population)))
+    else:
+        population = range(1, total_frames + 1)
+        random_frames = rng.sample(population, min(num_frames, len(population)))
+
+    random_frames.sort()
+    return random_frames
+
+
+def sample_frame_indices(video_path, total_frames, num_frames, presnap_flag=True, seed=None):
+    # a fixed seed gives every video its own, reproducible sample
+    rng = random.Random(f"{seed}:{os.path.basename(video_path)}") if seed is not None else random.Random()
+    random_frames = sample_frame_numbers(total_frames, num_frames, presnap_flag, rng)
+
+    # frame_num / fps used to be the seek time, i.e. the frame with index frame_num
+    return sorted({min(frame_num, total_frames - 1) for frame_num in random_frames})
+
+
+def extract_random_frames(video_path, output_dir, num_frames=50, presnap_flag=True, seed=None, video_info=None):
     # Create the second filename by replacing "Endzone" with "Sideline"
     # note, both sideline and endzone video must be synchronised
     # sideline_video_path = video_path.replace("Endzone", "Sideline")
-    
-    # Get video info using ffmpeg command
-    video_info = get_video_info(video_path)
 
+    # Get video info using ffmpeg command
     if video_info is None:
-        print(f"Skipping {video_path} due to ffprobe error.")
-        return
+        video_info = get_video_info(video_path)
 
-    total_frames = int(video_info['streams'][0]['nb_frames'])
-    avg_frame_rate_str = video_info['streams'][0]['avg_frame_rate']
-    num, denom = avg_frame_rate_str.split('/')
-    avg_frame_rate = float(num) / float(denom)
+    if video_info is None or not video_info['nb_frames']:
+        print(f"Skipping {video_path} due to ffprobe error.")
+        return []
 
     # Get the base name of the video file without extension
     video_name = os.path.splitext(os.path.basename(video_path))[0]
 
-    # if we want to focus on the presnap phase, we'll crudely take frames from the first 1/3 of video
-    if presnap_flag:
-        total_frames = total_frames // 3
-        # Ensure the first frame is included
-        random_frames = [1]
-        random_frames += random.sample(range(2, total_frames + 1), num_frames - 1)
+    frame_indices = sample_frame_indices(video_path, video_info['nb_frames'], num_frames, presnap_flag, seed)
+
+    # Extract all frames in one decode: select keeps only the sampled frames and
+    # -frames:v stops decoding after the last one
+    select = select_expression(frame_indices)
+    output_pattern = os.path.join(output_dir, video_name.replace("%", "%%") + "_frame_%d.png")
+    cmd = [
+        'ffmpeg',
+        '-y',
+        '-hide_banner',
+        '-loglevel', 'error',
+        '-i', video_path,
+        '-map', '0:v:0',
+        '-vf', f"select={select}",
+        '-vsync', '0',
+        '-frames:v', str(len(frame_indices)),
+        '-start_number', '1',
+        output_pattern
+    ]
+    result = subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        print(f"Error extracting frames from {video_path}: {result.stderr.strip()}")
+        return []
+
+    output_files = [os.path.join(output_dir, f"{video_name}_frame_{i + 1}.png") for i in range(len(frame_indices))]
+    return [output_file for output_file in output_files if os.path.exists(output_file)]
+
+
+def extract_frames_from_videos(video_files, output_dir, num_frames=50, presnap_flag=True, seed=None, workers=None):
+    # Sample frames from many videos, one decode per video, videos spread over a process pool
+    video_infos = probe.probe_videos(video_files)
+
+    jobs = [(video_path, output_dir, num_frames, presnap_flag, seed, video_info)
+            for video_path, video_info in zip(video_files, video_infos)]
+
+    if workers == 1 or len(jobs) < 2:
+        results = [extract_random_frames(*job) for job in jobs]
     else:
-        random_frames = random.sample(range(1, total_frames + 1), num_frames)
-        
-    random_frames.sort()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(extract_random_frames, *zip(*jobs)))
 
-    # Extract frames using ffmpeg
-    for i, frame_num in enumerate(random_frames):
-        time_sec = frame_num / avg_frame_rate
-        output_file = f"{output_dir}/{video_name}_frame_{i + 1}.png"
-        cmd = [
-            'ffmpeg',
-            '-ss', str(time_sec),
-            '-i', video_path,
-            '-vframes', '1',
-            output_file
-        ]
-        subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return dict(zip(video_files, results))
+
+
+def extract_frames_to_dataset(video_files, dataset_path, num_frames=50, presnap_flag=True, seed=None,
+                              width=640, height=360, workers=None):
+    # Same sampling as extract_frames_from_videos, but the frames go into one memory-mapped
+    # .npy array (plus an index CSV) instead of PNG files
+    video_infos = probe.probe_videos(video_files)
+
+    samples = []
+    for video_path, video_info in zip(video_files, video_infos):
+        if video_info is None or not video_info['nb_frames']:
+            print(f"Skipping {video_path} due to ffprobe error.")
+            continue
+        frame_indices = sample_frame_indices(video_path, video_info['nb_frames'], num_frames, presnap_flag, seed)
+        samples.append((video_path, frame_indices, video_info['fps']))
+
+    return create_frame_dataset(samples, dataset_path, width=width, height=height, workers=workers)
 
 
 if __name__ == "__main__":
@@ -81,6 +135,8 @@ if __name__ == "__main__":
     video_mode = "folder"
     use_subset = True  # Set to False to use all files, True to use a subset
     subset_size = 30  # Number of video files to process if using a subset
+    seed = None  # Set to an integer to make the sampled dataset reproducible
+    output_format = "png"  # "png" for image files, "npy" for a memory-mapped frame dataset
 
     # where to save the resulting images
     output_directory = select_folder(title="Choose the folder to save the images")
@@ -90,7 +146,7 @@ if __name__ == "__main__":
         video_dir, video_name = select_file(title="Choose the video file you want to cut")
         video_path = os.path.join(video_dir, video_name)
 
-        extract_random_frames(video_path, output_directory)
+        extract_random_frames(video_path, output_directory, seed=seed)
 
     else:
         # videos in a folder breakdown
@@ -103,10 +159,17 @@ if __name__ == "__main__":
             # Ensure the subset size does not exceed the number of available video files
             subset_size = min(subset_size, len(video_files))
             # Randomly select a subset of video files
-            video_files = random.sample(video_files, subset_size)
-
-        for video_path in video_files:
-            extract_random_frames(video_path, 
-                                  output_directory, 
-                                  num_frames=3, 
-                                  presnap_flag=True)
\ No newline at end of file
+            video_files = random.Random(seed).sample(sorted(video_files), subset_size)
+
+        if output_format == "npy":
+            extract_frames_to_dataset(video_files,
+                                      os.path.join(output_directory, "frames.npy"),
+                                      num_frames=3,
+                                      presnap_flag=True,
+                                      seed=seed)
+        else:
+            extract_frames_from_videos(video_files,
+                                       output_directory,
+                                       num_frames=3,
+                                       presnap_flag=True,
+                                       seed=seed)
\ No newline at end of file
@@ -0,0 +1,414 @@
+#!/usr/bin/env python
+"""
+Command line interface for the video tools, without any dialogs.
+
+Every step of the workflow is a subcommand, so it can run on a headless
+machine or from a script. "batch" runs the jobs of a manifest (see
+utils/pf_batch.py) concurrently under a CPU and I/O budget.
+
+Usage:
+    python pf_cli.py split "Game.mp4" "Game.csv" --workers 4
+    python pf_cli.py dartclip "Game.csv" "Game Clips"
+    python pf_cli.py concat "Game Clips" --output "Game.mp4" --verify
+    python pf_cli.py scenes "Game.mp4" --proxy --workers 4
+    python pf_cli.py detect-split "Game.mp4" --angles "All 22" Endzone --split-workers 2
+    python pf_cli.py frames "Clips" --output "Frames" --num-frames 3 --filter Endzone
+    python pf_cli.py batch weekend.json --cpu 16 --io 3 --report weekend_report.json
+    python pf_cli.py --metrics weekend_metrics.jsonl batch weekend.json
+
+--metrics appends FFmpeg progress, per-clip records and stage timings as JSON
+lines (see utils/pf_progress.py); --progress shows them on the console.
+"""
+
+import os
+import sys
+import random
+import logging
+import argparse
+
+from utils.pf_batch import load_batch_manifest, run_batch
+from utils.pf_encoding import DEFAULT_PROFILE, ENCODING_PROFILES
+from utils.pf_progress import ProgressReporter, print_progress, print_stage_times
+from utils.pf_scene_patterns import PLAY_PATTERNS
+
+logger = logging.getLogger('pf_cli')
+
+# The commands import their modules when they run, so a command does not need the
+# dependencies of the others (e.g. split works without PySceneDetect).
+
+
+def cmd_split(video, csv, output=None, workers=1, start_number=1, skip=0, buffer=0.5, time_offset=0.0,
+              reencode=False, split_mode='per_clip', keyframe_align=False, smart_cut=False, resume=True,
+              dartclip=True, profile=DEFAULT_PROFILE, video_filters=None, core_budget=None, threads_per_job=None,
+              media_backend=None, follow=False, poll_interval=2.0, idle_timeout=120.0, progress=None):
+    """
+    Split a video into Play_NNN clips (see VideoSplitter); the clips folder goes next to the video.
+    With follow, the video and the CSV may still be growing (see VideoSplitter.follow_video).
+    """
+    from video_splitter import VideoSplitter
+
+    splitter = VideoSplitter({
+        'split_video': True,
+        'create_dartclip': dartclip,
+        'skip': skip,
+        'reencode': reencode,
+        'time_offset': time_offset,
+        'buffer': buffer,
+        'start_number': start_number,
+        'workers': workers,
+        'split_mode': split_mode,
+        'keyframe_align': keyframe_align,
+        'smart_cut': smart_cut,
+        'resume': resume,
+        'profile': profile,
+        'video_filters': video_filters,
+        'core_budget': core_budget,
+        'threads_per_job': threads_per_job,
+        'media_backend': media_backend,
+        'progress': progress,
+    })
+    output = output or os.path.dirname(os.path.abspath(video))
+    if follow:
+        print(f"Following {video} and {csv}, press Ctrl+C to stop")
+        result = splitter.follow_video(video, csv, output_folder=output, poll_interval=poll_interval,
+                                       idle_timeout=idle_timeout)
+    else:
+        result = splitter.process_video(video, csv, output_folder=output)
+    if result is None:
+        raise RuntimeError(f"Splitting {video} failed")
+    if result['clips_failed']:
+        raise RuntimeError(f"{result['clips_failed']} clips of {video} failed")
+    print(f"Created {result['clips_created']} clips ({result['clips_skipped']} skipped) in {result['output_folder']}")
+    return result
+
+
+def cmd_split_angles(csv, videos, output=None, sync=None, name=None, workers=1, start_number=1, skip=0,
+                     buffer=0.5, time_offset=0.0, reencode=False, split_mode='per_clip', keyframe_align=False,
+                     smart_cut=False, resume=True, dartclip=True, profile=DEFAULT_PROFILE, video_filters=None,
+                     core_budget=None, threads_per_job=None, media_backend=None, progress=None):
+    """
+    Split the recordings of several angles with one CSV (see VideoSplitter.split_angles).
+    videos maps angle names to videos and sync angle names to offsets in seconds (dicts, or
+    (name, value) pairs as given on the command line); the clips folder is named after the CSV.
+    """
+    from video_splitter import VideoSplitter
+
+    videos = dict(videos)
+    sync = {angle: float(offset) for angle, offset in dict(sync or {}).items()}
+    unknown = set(sync) - set(videos)
+    if unknown:
+        raise ValueError(f"Sync offsets for unknown angles: {sorted(unknown)}")
+    sources = [{'angle': angle, 'video': video, 'offset': sync.get(angle, 0.0)} for angle, video in videos.items()]
+
+    splitter = VideoSplitter({
+        'split_video': True,
+        'create_dartclip': dartclip,
+        'skip': skip,
+        'reencode': reencode,
+        'time_offset': time_offset,
+        'buffer': buffer,
+        'start_number': start_number,
+        'workers': workers,
+        'split_mode': split_mode,
+        'keyframe_align': keyframe_align,
+        'smart_cut': smart_cut,
+        'resume': resume,
+        'profile': profile,
+        'video_filters': video_filters,
+        'core_budget': core_budget,
+        'threads_per_job': threads_per_job,
+        'media_backend': media_backend,
+        'progress': progress,
+    })
+    events = splitter.extract_events(csv)
+    result = splitter.split_angles(sources, events, output or os.path.dirname(os.path.abspath(csv)),
+                                   name=name or os.path.splitext(os.path.basename(csv))[0])
+    if result['clips_failed']:
+        raise RuntimeError(f"{result['clips_failed']} clips of {csv} failed")
+    print(f"Created {result['clips_created']} clips ({result['clips_skipped']} skipped) of {len(sources)} angles "
+          f"in {result['output_folder']}")
+    return result
+
+
+def cmd_dartclip(csv, clips_folder, start_number=1, workers=1, progress=None):
+    """Create the dartclip files for existing clips."""
+    from video_splitter import VideoSplitter
+
+    if not os.path.isdir(clips_folder):
+        raise FileNotFoundError(f"Clips folder not found: {clips_folder}")
+    splitter = VideoSplitter({'split_video': False, 'create_dartclip': True,
+                              'start_number': start_number, 'workers': workers, 'progress': progress})
+    result = splitter.process_video(csv_path=csv, clips_folder=clips_folder)
+    if result is None:
+        raise RuntimeError(f"Creating dartclips in {clips_folder} failed")
+    print(f"Created {result} dartclip files in {clips_folder}")
+    return result
+
+
+def cmd_concat(folder, output=None, search=None, verify=False, normalize=True, core_budget=None, progress=None):
+    """Concatenate the mp4 clips of a folder and write clip_times.csv."""
+    from script_concatenate_and_import_csv import concatenate_folder
+
+    # by default the video goes next to the clips folder (inside it, a rerun would pick it up)
+    folder = os.path.normpath(folder)
+    output = output or folder + ".mp4"
+    timeline = concatenate_folder(folder, output, search_term=search, verify=verify,
+                                  normalize=normalize, core_budget=core_budget, progress=progress)
+    if timeline is None:
+        raise RuntimeError(f"No clips to concatenate in {folder}")
+    return output
+
+
+def cmd_scenes(video, proxy=False, proxy_width=None, frame_skip=0, workers=1, use_cache=True, angle_model=None,
+               progress=None):
+    """Detect, label and save the scenes of a video (<video>_scene.csv)."""
+    from script_scenedetect import process_scenes
+
+    options = {'proxy': proxy, 'frame_skip': frame_skip, 'workers': workers, 'use_cached_metrics': use_cache}
+    if proxy_width:
+        options['proxy_width'] = proxy_width
+    scene_list, scene_file = process_scenes(video, angle_model=angle_model, progress=progress, **options)
+    return scene_file
+
+
+def cmd_detect_split(video, output=None, pattern='scoreboard', angles=None, proxy_width=None, frame_skip=0,
+                     workers=1, use_cache=True, split_workers=1, reencode=False, profile=DEFAULT_PROFILE,
+                     dartclip=True, resume=True, media_backend=None, progress=None):
+    """Detect the plays of a video and cut them while the detection is still running."""
+    from script_scenedetect import detect_and_split
+
+    options = {'proxy': True, 'frame_skip': frame_skip, 'workers': workers, 'use_cached_metrics': use_cache}
+    if proxy_width:
+        options['proxy_width'] = proxy_width
+    splitter_config = {'workers': split_workers, 'reencode': reencode, 'profile': profile,
+                       'create_dartclip': dartclip, 'resume': resume, 'media_backend': media_backend}
+    result = detect_and_split(video, output_folder=output, pattern=pattern, angles=angles,
+                              splitter_config=splitter_config, progress=progress, **options)
+    if result['clips_failed']:
+        raise RuntimeError(f"{result['clips_failed']} clips of {video} failed")
+    print(f"Created {result['clips_created']} clips ({result['clips_skipped']} skipped) of "
+          f"{len(result['events'])} plays in {result['output_folder']}")
+    return result
+
+
+def cmd_frames(inputs, output, num_frames=50, presnap=True, seed=None, filter=None, subset=None,
+               format='png', workers=None, progress=None):
+    """Sample random frames from videos and folders of videos, as PNG files or a .npy dataset."""
+    import extract_frames
+
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    video_files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            video_files.extend(extract_frames.get_video_files_from_folder(path, filter_text=filter))
+        else:
+            video_files.append(path)
+    if not video_files:
+        raise RuntimeError(f"No videos found in {', '.join(inputs)}")
+
+    if subset:
+        video_files = random.Random(seed).sample(sorted(video_files), min(subset, len(video_files)))
+
+    progress = progress or ProgressReporter()
+    with progress.stage('frames', videos=len(video_files)):
+        if format == 'npy':
+            dataset_path = os.path.join(output, "frames.npy") if os.path.isdir(output) else output
+            return extract_frames.extract_frames_to_dataset(video_files, dataset_path, num_frames=num_frames,
+                                                            presnap_flag=presnap, seed=seed, workers=workers)
+
+        os.makedirs(output, exist_ok=True)
+        return extract_frames.extract_frames_from_videos(video_files, output, num_frames=num_frames,
+                                                         presnap_flag=presnap, seed=seed, workers=workers)
+
+
+COMMANDS = {
+    'split': cmd_split,
+    'split-angles': cmd_split_angles,
+    'dartclip': cmd_dartclip,
+    'concat': cmd_concat,
+    'scenes': cmd_scenes,
+    'detect-split': cmd_detect_split,
+    'frames': cmd_frames,
+}
+
+
+def run_job(job):
+    """Run one batch job (a dictionary with "command" and the options of that command)."""
+    command = COMMANDS.get(job['command'])
+    if command is None:
+        raise ValueError(f"Unknown command: {job['command']}")
+    options = {key: value for key, value in job.items() if key not in ('command', 'cpu', 'io')}
+    return command(**options)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Split, label and prepare game film without dialogs")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Log debug messages")
+    parser.add_argument('--metrics', help="Append progress records and stage timings to this JSON-lines file")
+    parser.add_argument('--progress', action='store_true', help="Show FFmpeg progress and stage timings")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    split = subparsers.add_parser('split', help="Split a video into clips from a Dartfish CSV")
+    split.add_argument('video', help="Video to split")
+    split.add_argument('csv', help="CSV with Position and Duration columns")
+    split.add_argument('--output', help="Folder for the clips folder (default: next to the video)")
+    split.add_argument('--workers', type=int, default=1,
+                       help="Clips cut in parallel (0 = one per core; with --reencode, 0 = planned jobs and threads)")
+    split.add_argument('--start-number', type=int, default=1, help="Number of the first clip")
+    split.add_argument('--skip', type=int, default=0, help="Number of initial events to skip")
+    split.add_argument('--buffer', type=float, default=0.5, help="Seconds added to the end of each clip")
+    split.add_argument('--time-offset', type=float, default=0.0, help="Seconds added to every event time")
+    split.add_argument('--reencode', action='store_true', help="Re-encode instead of stream copy")
+    split.add_argument('--profile', choices=list(ENCODING_PROFILES), default=DEFAULT_PROFILE,
+                       help="Encoding profile for --reencode")
+    split.add_argument('--video-filter', dest='video_filters', action='append',
+                       help="Video filter replacing those of the profile (repeatable, e.g. crop=iw:ih-300)")
+    split.add_argument('--core-budget', type=int, help="Cores shared by the re-encodes (default: all)")
+    split.add_argument('--threads-per-job', type=int, help="Encoder threads per re-encode (default: planned)")
+    split.add_argument('--split-mode', choices=['per_clip', 'single_pass'], default='per_clip')
+    split.add_argument('--keyframe-align', action='store_true', help="Start copied clips on a keyframe")
+    split.add_argument('--smart-cut', action='store_true', help="Re-encode only up to the first keyframe")
+    split.add_argument('--media-backend', choices=['pyav'],
+                       help="Copy the clips in-process with PyAV instead of one FFmpeg run per clip")
+    split.add_argument('--no-resume', dest='resume', action='store_false', help="Cut all clips again")
+    split.add_argument('--no-dartclip', dest='dartclip', action='store_false', help="Do not write dartclip files")
+    split.add_argument('--follow', action='store_true',
+                       help="The recording and the CSV are still growing: cut every clip once it is recorded")
+    split.add_argument('--poll-interval', type=float, default=2.0, help="Seconds between checks with --follow")
+    split.add_argument('--idle-timeout', type=float, default=120.0,
+                       help="Stop following when neither file has grown for this many seconds")
+
+    split_angles = subparsers.add_parser('split-angles', help="Split the recordings of several angles with one CSV")
+    split_angles.add_argument('csv', help="CSV with Position and Duration columns")
+    split_angles.add_argument('--angle', dest='videos', nargs=2, action='append', required=True,
+                              metavar=('NAME', 'VIDEO'), help="An angle and its recording (repeatable)")
+    split_angles.add_argument('--sync', nargs=2, action='append', metavar=('NAME', 'SECONDS'),
+                              help="Seconds added to the event times for this angle's recording (repeatable)")
+    split_angles.add_argument('--name', help="Name of the clips folder (default: the name of the CSV)")
+    split_angles.add_argument('--output', help="Folder for the clips folder (default: next to the CSV)")
+    split_angles.add_argument('--workers', type=int, default=1,
+                              help="Clips cut in parallel (0 = one per core; with --reencode, 0 = planned)")
+    split_angles.add_argument('--start-number', type=int, default=1, help="Number of the first play")
+    split_angles.add_argument('--skip', type=int, default=0, help="Number of initial events to skip")
+    split_angles.add_argument('--buffer', type=float, default=0.5, help="Seconds added to the end of each clip")
+    split_angles.add_argument('--time-offset', type=float, default=0.0, help="Seconds added to every event time")
+    split_angles.add_argument('--reencode', action='store_true', help="Re-encode instead of stream copy")
+    split_angles.add_argument('--profile', choices=list(ENCODING_PROFILES), default=DEFAULT_PROFILE,
+                              help="Encoding profile for --reencode")
+    split_angles.add_argument('--video-filter', dest='video_filters', action='append',
+                              help="Video filter replacing those of the profile (repeatable)")
+    split_angles.add_argument('--core-budget', type=int, help="Cores shared by the re-encodes (default: all)")
+    split_angles.add_argument('--threads-per-job', type=int, help="Encoder threads per re-encode (default: planned)")
+    split_angles.add_argument('--split-mode', choices=['per_clip', 'single_pass'], default='per_clip')
+    split_angles.add_argument('--keyframe-align', action='store_true', help="Start copied clips on a keyframe")
+    split_angles.add_argument('--smart-cut', action='store_true', help="Re-encode only up to the first keyframe")
+    split_angles.add_argument('--media-backend', choices=['pyav'], help="Copy the clips in-process with PyAV")
+    split_angles.add_argument('--no-resume', dest='resume', action='store_false', help="Cut all clips again")
+    split_angles.add_argument('--no-dartclip', dest='dartclip', action='store_false',
+                              help="Do not write dartclip files")
+
+    dartclip = subparsers.add_parser('dartclip', help="Create dartclip files for existing clips")
+    dartclip.add_argument('csv', help="CSV with the events of the clips")
+    dartclip.add_argument('clips_folder', help="Folder with the Play_NNN clips")
+    dartclip.add_argument('--start-number', type=int, default=1, help="Number of the first clip")
+    dartclip.add_argument('--workers', type=int, default=1, help="Files written in parallel")
+
+    concat = subparsers.add_parser('concat', help="Concatenate a folder of clips and write clip_times.csv")
+    concat.add_argument('folder', help="Folder with the mp4 clips")
+    concat.add_argument('--output', help="Output video (default: <folder>.mp4)")
+    concat.add_argument('--search', help="Only use clips whose name contains this text")
+    concat.add_argument('--verify', action='store_true', help="Check the clip starts in the output video")
+    concat.add_argument('--no-normalize', dest='normalize', action='store_false',
+                        help="Copy all clips as they are, without re-encoding incompatible ones")
+    concat.add_argument('--core-budget', type=int, help="Cores shared by the re-encodes of incompatible clips")
+
+    scenes = subparsers.add_parser('scenes', help="Detect and label the scenes of a video")
+    scenes.add_argument('video', help="Video to analyze")
+    scenes.add_argument('--proxy', action='store_true', help="Detect on a downscaled FFmpeg decode")
+    scenes.add_argument('--proxy-width', type=int, help="Width of the proxy frames")
+    scenes.add_argument('--frame-skip', type=int, default=0, help="Frames skipped between analyzed frames")
+    scenes.add_argument('--workers', type=int, default=1, help="Parallel detection processes (0 = one per core)")
+    scenes.add_argument('--no-cache', dest='use_cache', action='store_false', help="Ignore cached frame metrics")
+    scenes.add_argument('--angle-model', help="JSON model of the angle classifier")
+
+    detect_split = subparsers.add_parser('detect-split', help="Detect the plays of a video and cut them into clips")
+    detect_split.add_argument('video', help="Video to analyze and split")
+    detect_split.add_argument('--output', help="Folder for the clips folder (default: next to the video)")
+    detect_split.add_argument('--pattern', choices=list(PLAY_PATTERNS), default='scoreboard',
+                              help="Angle sequence of a play")
+    detect_split.add_argument('--angles', nargs='+', help="Angles a clip covers (default: the whole play)")
+    detect_split.add_argument('--proxy-width', type=int, help="Width of the proxy frames")
+    detect_split.add_argument('--frame-skip', type=int, default=0, help="Frames skipped between analyzed frames")
+    detect_split.add_argument('--workers', type=int, default=1,
+                              help="Parallel detection processes (0 = one per core)")
+    detect_split.add_argument('--no-cache', dest='use_cache', action='store_false', help="Ignore cached frame metrics")
+    detect_split.add_argument('--split-workers', type=int, default=1, help="Clips cut concurrently")
+    detect_split.add_argument('--reencode', action='store_true', help="Re-encode instead of stream copy")
+    detect_split.add_argument('--profile', choices=list(ENCODING_PROFILES), default=DEFAULT_PROFILE,
+                              help="Encoding profile for --reencode")
+    detect_split.add_argument('--media-backend', choices=['pyav'], help="Copy the clips in-process with PyAV")
+    detect_split.add_argument('--no-resume', dest='resume', action='store_false', help="Cut all clips again")
+    detect_split.add_argument('--no-dartclip', dest='dartclip', action='store_false',
+                              help="Do not write dartclip files")
+
+    frames = subparsers.add_parser('frames', help="Sample random frames from videos")
+    frames.add_argument('inputs', nargs='+', help="Videos or folders of videos")
+    frames.add_argument('--output', required=True, help="Image folder, or .npy file with --format npy")
+    frames.add_argument('--num-frames', type=int, default=50, help="Frames per video")
+    frames.add_argument('--no-presnap', dest='presnap', action='store_false', help="Sample the whole clip")
+    frames.add_argument('--seed', type=int, help="Seed for a reproducible sample")
+    frames.add_argument('--filter', help="Only use videos whose name contains this text")
+    frames.add_argument('--subset', type=int, help="Use a random subset of this many videos")
+    frames.add_argument('--format', choices=['png', 'npy'], default='png')
+    frames.add_argument('--workers', type=int, help="Videos decoded in parallel")
+
+    batch = subparsers.add_parser('batch', help="Run the jobs of a batch manifest")
+    batch.add_argument('manifest', help="JSON batch manifest")
+    batch.add_argument('--cpu', type=int, help="CPU cores shared by all jobs (default: all)")
+    batch.add_argument('--io', type=int, default=2, help="Jobs reading or writing video at the same time")
+    batch.add_argument('--report', help="JSON report (default: <manifest>_report.json)")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    options = vars(args)
+    command = options.pop('command')
+    options.pop('verbose')
+    metrics_path = options.pop('metrics')
+    progress = ProgressReporter(metrics_path, [print_progress] if options.pop('progress') else None, job=command)
+
+    try:
+        if command == 'batch':
+            jobs = load_batch_manifest(args.manifest)
+            report = args.report or os.path.splitext(args.manifest)[0] + "_report.json"
+            results = run_batch(jobs, run_job, cpu_budget=args.cpu, io_budget=args.io, report_path=report,
+                                progress=progress)
+            failed = [result for result in results if result['status'] != 'done']
+            print(f"{len(results) - len(failed)} of {len(results)} jobs done, report: {report}")
+            for result in failed:
+                print(f"  failed: {result['name']}: {result['error']}")
+            return_code = 1 if failed else 0
+        else:
+            try:
+                with progress.stage('job', command=command):
+                    COMMANDS[command](progress=progress, **options)
+                return_code = 0
+            except Exception as e:
+                logger.error(f"{command} failed: {e}")
+                return_code = 1
+
+        if progress.active:
+            print("Time per stage:")
+            print_stage_times(progress)
+        return return_code
+    finally:
+        progress.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
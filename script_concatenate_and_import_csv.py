@@ -3,17 +3,17 @@
 # system tools
 import os
 import glob
-import csv
 import subprocess
+import tempfile
 # nice wrapper for direct ffmpeg functions (must have ffmpeg installed directly)
 # import ffmpeg
-import time # just for timing processes and testing
-
-from tkinter import Tk, filedialog
 
 # Import helper functions
-from utils.pf_helpers import select_folder, select_file
-from utils.pf_create_dartclip import create_dartclip
+from utils.pf_helpers import select_folder
+from utils.pf_encoding import encoder_args, get_profile
+from utils.pf_concat import plan_concat, prepare_parts, print_concat_plan
+from utils.pf_progress import ProgressReporter, print_progress, run_ffmpeg
+from utils.pf_timeline import build_timeline, write_concat_list, write_timeline_csv, verify_timeline, print_drift_report
 
 # --------------------------- #
 
@@ -46,64 +46,10 @@ def make_filelist(video_path, search_term=None, output_filename="mp4_filelist.tx
     return file_list
 
 
-def get_video_duration(file_list):
-    video_duration = []
-    video_name = []
-
-    total_files = len(file_list)  # Total number of files to process
-    processed_files = 0  # Counter for processed files
-
-    for file in file_list:
-        video_name.append("play " + str(file_list.index(file) + 1))
-
-        try:
-            # Run ffprobe command to get video duration
-            command = ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'stream=duration', '-of', 'default=noprint_wrappers=1:nokey=1', file]
-            result = subprocess.run(command, capture_output=True, text=True)
-            duration = float(result.stdout.strip())
-            video_duration.append(duration)
-        except Exception as e:
-            print(f"Error processing {file}: {str(e)}")
-
-        processed_files += 1  # Increment processed files count
-        progress = processed_files / total_files * 100  # Calculate progress percentage
-        print(f"\rProgress: {progress:.2f}%", end='', flush=True)  # Print progress update, overwriting the previous line
-
-    print()  # Print a newline after the progress updates
-
-    return video_duration, video_name
-
-
-def calculate_video_starttime(video_duration):
-    video_starttime = [0.0]  # Initialize with 0 as the first start time
-
-    for duration in video_duration[:-1]:
-        previous_start_time = video_starttime[-1]
-        start_time = previous_start_time + duration
-        video_starttime.append(start_time)
-
-    return video_starttime
-
-
-def write_clip_times_to_csv(working_path, video_name, video_starttime, video_duration):
-    # Prepare the rows for the CSV file
-    rows = zip(video_name, video_starttime, video_duration)
-
-    # Open the CSV file for writing
-    with open(os.path.join(working_path, "clip_times.csv"), 'w', newline='') as f:
-        # Create a CSV writer
-        writer = csv.writer(f)
-        
-        # Write the header row
-        writer.writerow(['Name', 'Position', 'Duration'])
-
-        # Write the rows
-        for row in rows:
-            writer.writerow(row)
-
-
-def concatenate_video(video_path, output_name=None, input_file=None):
+def concatenate_video(video_path, output_name=None, input_file=None, duration=None, progress=None):
     # Concatenate the video
+    # duration (seconds, e.g. from the timeline) gives the percentage and ETA of the progress;
+    # progress is a ProgressReporter (utils/pf_progress.py), by default a progress line on the console
 
     if output_name is None:
         output_name = os.path.join(video_path, "Concatenated_Video.mp4")
@@ -113,6 +59,7 @@ def concatenate_video(video_path, output_name=None, input_file=None):
 
     cmd = [
         "ffmpeg",                       # Command for FFmpeg
+        "-y",                           # Overwrite (FFmpeg cannot ask, stdin is closed)
         "-f", "concat",                 # Input format: concatenate
         "-safe", "0",                   # Disable safety check for input file
         "-i", input_file,               # Input file
@@ -123,80 +70,95 @@ def concatenate_video(video_path, output_name=None, input_file=None):
         output_name                     # Output file name
     ]
 
-    process = subprocess.Popen(
-        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True
-    )
-
-    # Process the output and display progress
-    while True:
-        output = process.stdout.readline()
-        if output == '' and process.poll() is not None:
-            break
-        if output:
-            # Check if the output contains progress information
-            if "time=" in output:
-                # Extract the time progress from the output
-                time_progress = output.split("time=")[1].split()[0]
-                print(f"Progress: {time_progress}", end='\r', flush=True)
+    # FFmpeg reports its progress through -progress pipe:1 (the stats line is hidden by the log level)
+    if progress is None:
+        progress = ProgressReporter(callbacks=[print_progress])
+    returncode, stderr = run_ffmpeg(cmd, duration, progress, stage='concat')
+    if returncode:
+        raise RuntimeError(f"Concatenation failed (FFmpeg exited with status {returncode}): {stderr.strip()}")
 
     print("Video concatenation completed.")
 
 
-def recode_video(working_path):
-
-    # TODO: Completely refactor with chatGPT
-    
-    video_file = game_path + " - Full GP9.mp4"
-    required_video_file = os.path.join(working_path, video_file)
-    
-    # use ffplay to preview some options
-    cmd = ["ffplay " + 
-    ' -vf "crop=iw:ih-600, scale=1280:-1" ' + 
-    ('"' + required_video_file + '"')]
-    subprocess.run(cmd[0], shell=True)
-
-
-    # fastest encoding to DF compatible
-    output_name = '"' + os.path.join(working_path, (game_path + " - Small.mp4")) + '"'
-    cmd = ["ffmpeg" +
-    " -i " + ('"' + required_video_file + '"') +
-    ' -vf "crop=iw:ih-300, scale=1280:-1" ' +       # crop the useless top and bottom of video off and downscale to 1280
-    " -r 30 " +                                     # reduce framerate
-    " -preset ultrafast " + 
-    " -crf 25 " +                                   # general quality 0 (best) - 51 (worst)
-    " -vcodec libx264" + 
-    " -acodec copy" +
-    " -hide_banner " +
-    output_name]
-    subprocess.run(cmd[0], shell=True)
-
-
-    # or to "final" H264 video 
+def recode_video(working_path, video_file, profile='review-fast', preview=False):
+    # re-encode a (concatenated) game video with an encoding profile (see utils/pf_encoding.py),
+    # e.g. 'review-fast' for a small DF compatible copy or 'archive' for the "final" H264 video
     # (suboptimal if cut files can be recoded instead)
-    output_name = '"' + os.path.join(working_path, (game_path + " - Small.mp4")) + '"'
-    cmd = ["ffmpeg" +
-    " -i " + ('"' + required_video_file + '"') +
-    " -vcodec libx264 -preset slow -crf 18 -acodec copy" +
-    " -hide_banner " +
-    output_name]
-    subprocess.run(cmd[0], shell=True)
+    required_video_file = os.path.join(working_path, video_file)
+    settings = get_profile(profile)
+
+    # use ffplay to preview the filters (cropping, scaling) of the profile
+    if preview and settings['filters']:
+        subprocess.run(["ffplay", "-vf", ",".join(settings['filters']), required_video_file])
+
+    output_name = os.path.join(working_path, f"{os.path.splitext(video_file)[0]} - {settings['name']}.mp4")
+    cmd = ["ffmpeg", "-y", "-i", required_video_file] + encoder_args(profile) + ["-hide_banner", output_name]
+    subprocess.run(cmd)
+
+    return output_name
+
+
+def concatenate_folder(video_path, output_name, search_term=None, verify=False, normalize=True, core_budget=None,
+                       progress=None):
+    # concatenate all mp4 clips of a folder and write clip_times.csv (no dialogs, used by the CLI)
+    # progress: ProgressReporter for FFmpeg progress and the stage timings (see utils/pf_progress.py)
+    progress = progress or ProgressReporter(callbacks=[print_progress])
+    file_list = make_filelist(video_path, search_term=search_term, output_filename="mp4_list.txt")
+    if not file_list:
+        print(f"No mp4 clips found in {video_path}")
+        return None
+
+    # probe the clips: if they all fit together they are copied directly, otherwise only
+    # the clips that differ are re-encoded (normalize=False forces the direct copy)
+    with progress.stage('plan', count=len(file_list)):
+        plan = plan_concat(file_list) if normalize else {'mode': 'copy'}
+    if plan['mode'] == 'copy':
+        return concatenate_clips(video_path, file_list, output_name, os.path.join(video_path, "mp4_list.txt"),
+                                 verify, progress)
+
+    print_concat_plan(plan)
+    with tempfile.TemporaryDirectory(prefix=".concat_parts_", dir=video_path) as parts_folder:
+        with progress.stage('parts', count=len(file_list)):
+            parts = prepare_parts(plan, parts_folder, core_budget, progress)
+        timeline = concatenate_clips(video_path, parts, output_name, os.path.join(parts_folder, "parts_list.txt"),
+                                     verify, progress)
+
+    # the parts are gone, refer to the original clips
+    for entry, clip in zip(timeline, file_list):
+        entry['file'] = clip
+    return timeline
+
+
+def concatenate_clips(video_path, file_list, output_name, list_file, verify=False, progress=None):
+    progress = progress or ProgressReporter(callbacks=[print_progress])
+
+    # measure each clip from its packets and build the cumulative timeline
+    # (the concat list gets the same exact durations, so the offsets do not drift)
+    with progress.stage('timeline', count=len(file_list)):
+        timeline = build_timeline(file_list)
+        write_concat_list(timeline, list_file)
+
+        # write the csv file for DartFish (positions in milliseconds)
+        write_timeline_csv(timeline, os.path.join(video_path, "clip_times.csv"))
+
+    # create a new video of all clips together
+    total_seconds = sum(entry['duration_us'] for entry in timeline) / 1e6
+    with progress.stage('concat'):
+        concatenate_video(video_path, output_name, list_file, total_seconds, progress)
 
+    # compare the clip starts in the concatenated video with clip_times.csv
+    if verify:
+        with progress.stage('verify'):
+            print_drift_report(verify_timeline(timeline, output_name))
+
+    return timeline
+
+
+def main_pipeline(verify=False):
 
-def main_pipeline():
-    
     # choose the file to be split (somehow)
     video_path = select_folder(title="Select folder with current clips")
     output_path = select_folder(title="Select output folder for output video")
     output_name = os.path.join(output_path, "Concatenated_Video.mp4")
 
-    file_list = make_filelist(video_path, output_filename="mp4_list.txt")
-
-    # calculate the duration of each clip
-    video_duration, video_name = get_video_duration(file_list)
-    video_starttime = calculate_video_starttime(video_duration)
-
-    # write the csv file for DartFish
-    write_clip_times_to_csv(video_path, video_name, video_starttime, video_duration)
-
-    # create a new video of all clips together
-    concatenate_video(video_path, output_name)
\ No newline at end of file
+    concatenate_folder(video_path, output_name, verify=verify)
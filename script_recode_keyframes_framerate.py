@@ -1,13 +1,22 @@
 #!/usr/bin/env python
 
 import os
+import logging
 import subprocess
-# for the user selection of the path / file
-from tkinter import Tk
-from tkinter import filedialog
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.pf_encoding import encoder_args, get_profile
+from utils.pf_probe import probe_videos
+from utils.pf_scheduler import encode_cost, plan_encodes
+
+logger = logging.getLogger('pf_recode')
 
 
 def select_file():
+  # for the user selection of the path / file (imported here so the module loads headless)
+  from tkinter import Tk
+  from tkinter import filedialog
+
   # Create an instance of Tkinter's Tk class
   root = Tk()
 
@@ -29,27 +38,45 @@ def select_file():
   return file_path, file_name
 
 
-def process_video(video_path, video_name, max_keyframe_distance=15, adjust_framerate=False):
-    
+def process_video(video_path, video_name, max_keyframe_distance=15, adjust_framerate=False, profile='dartfish-scrub',
+                  threads=None):
+    # profile: encoding profile (see utils/pf_encoding.py); the keyframe distance
+    # and frame rate options override the keyint / fps of the profile
+    # threads: decoder / encoder threads (None = all cores, see process_videos)
+
     # Output file path in the same folder with "_kf15" appended
-    output_file = os.path.join(video_path, f"{video_name}_kf15.mp4")
-
-    cmd = [
-        "ffmpeg",
-        "-i", video_path,
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "18",
-        "-x264opts", f"keyint={max_keyframe_distance}:min-keyint=1:no-scenecut",
-        "-c:a", "copy",
-    ]
+    input_file = os.path.join(video_path, video_name)
+    output_file = os.path.join(video_path, f"{os.path.splitext(video_name)[0]}_kf{max_keyframe_distance}.mp4")
 
+    settings = {'base': profile} if isinstance(profile, str) else dict(profile)
+    settings['keyint'] = max_keyframe_distance
     if adjust_framerate:
-        cmd += ["-r", "30"]  # Adjust the framerate to 30fps
+        settings['fps'] = 30  # Adjust the framerate to 30fps
+
+    input_args = ["-threads", str(threads)] if threads else []
+    cmd = ["ffmpeg"] + input_args + ["-i", input_file] + encoder_args(settings, threads=threads) + [output_file]
+
+    subprocess.run(cmd, stdin=subprocess.DEVNULL)
+    return output_file
+
+
+def process_videos(video_files, max_keyframe_distance=15, adjust_framerate=False, profile='dartfish-scrub',
+                   core_budget=None):
+    # recode many videos at once; the core budget is split into concurrent jobs and
+    # threads per job by the scheduler (utils/pf_scheduler.py), based on the video lengths
+    infos = probe_videos(video_files)
+    durations = [info['duration'] if info and info.get('duration') else 0.0 for info in infos]
+    profile_cost = get_profile(profile)['cost']
+    costs = [encode_cost(profile_cost, info) for info in infos]
+    plan = plan_encodes(durations, core_budget, costs)
+    logger.info(f"Recoding {len(video_files)} videos as {plan['jobs']} jobs x {plan['threads']} threads")
 
-    cmd.append(output_file)
+    def recode(video_file):
+        return process_video(os.path.dirname(video_file), os.path.basename(video_file), max_keyframe_distance,
+                             adjust_framerate, profile, plan['threads'])
 
-    subprocess.run(cmd)
+    with ThreadPoolExecutor(max_workers=plan['jobs']) as executor:
+        return list(executor.map(recode, video_files))
 
 
 def main_recode_pipeline():
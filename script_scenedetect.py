@@ -2,18 +2,29 @@ import pickle
 import os
 import glob
 import csv
+import time
+import queue
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import scenedetect
 
-# Note: Search for “Select Interpreter” and click on the “Python: Select Interpreter”
+from utils.pf_scene_detect import DETECTOR_PARAMS, PROXY_WIDTH, detect_scenes_proxy, detect_scenes_parallel
+from utils.pf_scene_metrics import load_scene_metrics, save_scene_metrics, replay_adaptive
+from utils.pf_scene_patterns import find_play_groups
+from utils.pf_angle_classifier import AngleClassifier, classify_scenes
+from utils.pf_progress import ProgressReporter
+from utils.pf_probe import get_video_info
+from utils.pf_scene_events import PlayEventStream, write_play_events
 
-# for the user selection of the path / file
-from tkinter import Tk
-from tkinter import filedialog
+# Note: Search for “Select Interpreter” and click on the “Python: Select Interpreter”
 
 
 def select_file():
+    # for the user selection of the path / file (imported here so the module loads headless)
+    from tkinter import Tk
+    from tkinter import filedialog
+
     # Create an instance of Tkinter's Tk class
     root = Tk()
 
@@ -35,8 +46,19 @@ def select_file():
     return file_path, file_name
 
 
-def scene_detection(full_video_path):
+def scene_detection(full_video_path, proxy=False, proxy_width=PROXY_WIDTH, frame_skip=0, workers=1,
+                    use_cached_metrics=True, detector_params=None, progress=None, on_cut=None):
     # use pyscenedetect to find the most probably splits to the video
+    # proxy=True decodes through a downscaled FFmpeg stream (optionally skipping frames),
+    # which is much faster on long games; the scene list still uses source frame numbers
+    # workers > 1 (or None for all cores) analyzes time ranges of the video in parallel
+    # (always with the proxy decode) and stitches them into the sequential result
+    # use_cached_metrics reuses the frame metrics of an earlier run (if they match the video)
+    # and only replays the detector over them, e.g. to try other detector_params
+    # progress (ProgressReporter) receives the detection progress of the proxy decodes
+    # (the full-resolution PySceneDetect run shows its own progress bar)
+    # on_cut is called with the frame number of every cut as soon as a proxy decode
+    # finds it (the cached metrics and the full-resolution run only return the scene list)
 
     # separate the path, and video name
     file_path, file_name = os.path.split(full_video_path)
@@ -46,24 +68,45 @@ def scene_detection(full_video_path):
     stats_file = os.path.join(file_path, video_name+"_stats.csv")
     scene_file = os.path.join(file_path, video_name + "_scene.csv")
 
-    # setup the scenedetect parameters
-    video_stream = scenedetect.open_video(full_video_path)
+    detector_params = dict(DETECTOR_PARAMS, **(detector_params or {}))
+
+    # cached metrics are only replayed if they come from the same kind of analysis
+    # (the full-resolution run neither downscales to proxy_width nor skips frames)
+    if workers != 1 or proxy:
+        analysis = {'proxy_width': proxy_width, 'frame_skip': frame_skip}
+    else:
+        analysis = {'proxy_width': None, 'frame_skip': 0}
+
+    if use_cached_metrics:
+        metrics = load_scene_metrics(full_video_path, **analysis)
+        if metrics is not None:
+            print(f"Using cached frame metrics of {file_name}")
+            return replay_adaptive(metrics, **detector_params), scene_file
+
     stats_manager = scenedetect.StatsManager()
-    scene_manager = scenedetect.SceneManager(stats_manager)
 
-    scene_manager.add_detector(
-        scenedetect.AdaptiveDetector(
-        adaptive_threshold=5,                               # experimental value of 5 seems optimal
-        window_width=5,                                     # average [int] frames before/after for running average 
-        min_scene_len=20,                                   # at least 30 frames (0.5 seconds at 60fps)
-        min_content_val=15))
+    if workers != 1:
+        scene_list = detect_scenes_parallel(full_video_path, workers=workers, proxy_width=proxy_width,
+                                            frame_skip=frame_skip, stats_manager=stats_manager,
+                                            detector_params=detector_params, progress=progress, on_cut=on_cut)
+    elif proxy:
+        scene_list = detect_scenes_proxy(full_video_path, proxy_width=proxy_width, frame_skip=frame_skip,
+                                         stats_manager=stats_manager, detector_params=detector_params,
+                                         progress=progress, on_cut=on_cut)
+    else:
+        # setup the scenedetect parameters (see DETECTOR_PARAMS for the values)
+        video_stream = scenedetect.open_video(full_video_path)
+        scene_manager = scenedetect.SceneManager(stats_manager)
+        scene_manager.add_detector(scenedetect.AdaptiveDetector(**detector_params))
 
-    # detect the scenes using the defined settings
-    scene_manager.detect_scenes(video=video_stream, show_progress=True)
-    scene_list = scene_manager.get_scene_list()
+        # detect the scenes using the defined settings
+        scene_manager.detect_scenes(video=video_stream, show_progress=True)
+        scene_list = scene_manager.get_scene_list()
 
-    # Store the frame metrics we calculated for the next time the program runs.
+    # Store the frame metrics we calculated for the next time the program runs
+    # (the binary copy is what later runs load)
     stats_manager.save_to_csv(csv_file=stats_file)
+    save_scene_metrics(full_video_path, stats_file, **analysis)
 
     return scene_list, scene_file
 
@@ -79,7 +122,9 @@ def print_scene_info(scene_list):
             [scene[1].get_frames()-scene[0].get_frames()]))
 
 
-def save_scene_list_to_csv(scene_list, csv_file):
+def save_scene_list_to_csv(scene_list, csv_file, labels=None):
+    # labels: optional angle per scene (e.g. from classify_scenes); without them
+    # the angles are assigned round-robin
 
     # specify the number of scenes each play has 
     # e.g. 3 if play clock, all22, then endzone
@@ -107,14 +152,20 @@ def save_scene_list_to_csv(scene_list, csv_file):
             end_time = scene[1].get_frames() / scene[0].get_framerate()
             duration_seconds = end_time - start_time
 
-           # Get the current angle value and update the index
-            angle_value = angle_values[angle_index]
-            angle_index = (angle_index + 1) % len(angle_values)
+            if labels is not None:
+                # a new play starts at every scene of the first angle
+                angle_value = labels[i - 1]
+                if i > 1 and angle_value == angle_values[0]:
+                    count += 1
+            else:
+               # Get the current angle value and update the index
+                angle_value = angle_values[angle_index]
+                angle_index = (angle_index + 1) % len(angle_values)
 
             writer.writerow([f"Play {count}", start_time, end_time, duration_seconds, angle_value])
 
             # Increment the count every "n" rounds of the loop
-            if i % angle_count == 0:
+            if labels is None and i % angle_count == 0:
                 count += 1
 
     # Print a success message
@@ -193,81 +244,148 @@ def explore_stats(video_file, scene_manager, video_stream):
         print(stats_data[i])
 
 
-def save_scene_list_to_pickle(video_file, scene_manager):
-    # pickle/save the original scene list
-    pickle_name = os.path.join(base_path, game_path, video_name+"_SceneManager.pkl")
-    pickle_file = open(pickle_name, 'wb')
-    pickle.dump(scene_manager, pickle_file)
-    pickle_file.close()
+def save_scene_list_to_pickle(video_file, scene_list):
+    # pickle/save the original scene list next to the video
+    pickle_name = os.path.splitext(video_file)[0] + "_scene_list.pkl"
+    with open(pickle_name, 'wb') as pickle_file:
+        pickle.dump(scene_list, pickle_file)
 
-    # load scene_list from pickled file
-    tmp = open(pickle_name, 'rb')
-    loaded_scene_list = pickle.load(tmp)
-    tmp.close()
+    return pickle_name
 
 
-def filter_expected_scenes(scene_list):
-    expected_scenes = []
+def load_scene_list_from_pickle(pickle_name):
+    # load scene_list from pickled file
+    with open(pickle_name, 'rb') as pickle_file:
+        return pickle.load(pickle_file)
 
-    # Loop through the detected scenes to match the expected pattern.
-    for i in range(len(scene_list) - 2):
-        scene_a = scene_list[i]
-        scene_b = scene_list[i + 1]
-        scene_c = scene_list[i + 2]
 
-        # Check if the scenes match the expected pattern.
-        if is_expected_scene_pattern(scene_a, scene_b, scene_c):
-            expected_scenes.append(scene_a)
-            expected_scenes.append(scene_b)
-            expected_scenes.append(scene_c)
+def filter_expected_scenes(scene_list, pattern='scoreboard'):
+    # keep only the scenes that form plays of the expected angle pattern
+    # (e.g. "short scene followed by two longer ones", see PLAY_PATTERNS);
+    # matched plays never share a scene, so no scene is returned twice
+    expected_scenes = []
+    for group in find_play_groups(scene_list, pattern):
+        expected_scenes.extend(group)
 
     return expected_scenes
 
 
-def is_expected_scene_pattern(scene_a, scene_b, scene_c):
-    # Check if the durations match the expected pattern.
-    max_short_scene_duration = 2.5  # Adjust as per your requirements.
-    max_duration_difference = 0.3  # Maximum difference in duration between scenes B and C.
-
-    duration_a = scene_a[1].get_seconds() - scene_a[0].get_seconds()
-    duration_b = scene_b[1].get_seconds() - scene_b[0].get_seconds()
-    duration_c = scene_c[1].get_seconds() - scene_c[0].get_seconds()
+def process_scenes(full_video_path, angle_model=None, progress=None, **detection_options):
+    # detect, label and save the scenes of one video (no dialogs, used by the CLI)
+    # detection_options are passed to scene_detection (proxy, frame_skip, workers, ...)
+    # angle_model: optional JSON model of AngleClassifier; without it the classifier
+    # is trained on the plays of this game that match the scoreboard pattern
+    # progress: ProgressReporter for the detection progress and the stage timings
+    progress = progress or ProgressReporter()
 
-    if (
-        duration_a < max_short_scene_duration and
-        abs(duration_b - duration_c) <= max_duration_difference * min(duration_b, duration_c)
-    ):
-        return True
+    # get the scene list
+    with progress.stage('detect') as stage:
+        scene_list, scene_file = scene_detection(full_video_path, progress=progress, **detection_options)
+        stage['scenes'] = len(scene_list)
 
-    return False
+    # print all the detected scenes start and stops
+    print_scene_info(scene_list)
 
+    # label the camera angle of every scene (None falls back to round-robin)
+    with progress.stage('classify'):
+        classifier = AngleClassifier.load(angle_model) if angle_model else None
+        labels = classify_scenes(full_video_path, scene_list, classifier)
 
-def main_pipeline():
-  
-    # choose the file to be split (somehow)
-    video_path, video_file = select_file()
+    with progress.stage('save'):
+        # save to a csv file for DF
+        save_scene_list_to_csv(scene_list, scene_file, labels)
 
-    # combine to (re)create full path
-    full_video_path = video_file = os.path.join(video_path, video_file)
+        # filter the scene_list to look for the pattern "short scene followed by two longer ones"
+        filtered_scenes = filter_expected_scenes(scene_list)
 
-    # get the scene list
-    scene_list, scene_file = scene_detection(full_video_path)
+        # save filtered
+        video_name = os.path.splitext(full_video_path)[0]
+        filtered_scene_file = video_name + "_filtered_scene.csv"
+        save_scene_list_to_csv(filtered_scenes, filtered_scene_file)
 
-    # print all the detected scenes start and stops
-    print_scene_info(scene_list)
+    return scene_list, scene_file
 
-    # save to a csv file for DF
-    save_scene_list_to_csv(scene_list, scene_file)
 
-    # filter the scene_list to look for the pattern "short scene followed by two longer ones"
-    filtered_scenes = filter_expected_scenes(scene_list)
+def detect_and_split(full_video_path, output_folder=None, pattern='scoreboard', angles=None, splitter_config=None,
+                     progress=None, **detection_options):
+    # detect the scenes and cut a clip of every play that matches the pattern, without a CSV in between:
+    # the plays become splitter events in memory, and a second thread cuts them while the
+    # detector is still working on the rest of the video (with the proxy decode; cached
+    # metrics and full-resolution runs hand over all plays at the end)
+    # output_folder: where the "<video> Clips" folder goes (default: next to the video)
+    # angles: angles of the pattern a clip covers, e.g. ["All 22", "Endzone"] (default: all)
+    # splitter_config: VideoSplitter configuration (workers, reencode, profile, ...)
+    # detection_options are passed to scene_detection (proxy, frame_skip, workers, ...)
+    # returns the summary of the split (like VideoSplitter.split_video) with the events
+    from video_splitter import VideoSplitter, merge_split_results
+
+    progress = progress or ProgressReporter()
+    info = get_video_info(full_video_path)
+    if info is None or not info['fps']:
+        raise ValueError(f"Cannot read the video properties of {full_video_path}")
+    output_folder = output_folder or os.path.dirname(os.path.abspath(full_video_path))
+
+    # the play numbers come from the detection, skipping events does not apply here
+    splitter = VideoSplitter(dict(splitter_config or {}, skip=0, progress=progress))
+    first_number = splitter.config['start_number']
+    ready = queue.Queue()
+    stream = PlayEventStream(info['fps'], pattern, angles, on_event=ready.put)
+
+    def cut_plays():
+        # cut the plays found so far in one go, until detection is done (None)
+        results = []
+        finished = False
+        while not finished:
+            batch = [ready.get()]
+            while True:
+                try:
+                    batch.append(ready.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                finished = True
+            if batch:
+                results.append(splitter.split_video(full_video_path, batch, output_folder,
+                                                    start_number=first_number + batch[0].index))
+        return results
+
+    split_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        cutting = executor.submit(cut_plays)
+        try:
+            with progress.stage('detect') as stage:
+                scene_list, scene_file = scene_detection(full_video_path, progress=progress, on_cut=stream.add_cut,
+                                                         **detection_options)
+                stage['scenes'] = len(scene_list)
+            # hand over the cuts that were not streamed, then close the last scene
+            for scene in scene_list[1:]:
+                stream.add_cut(scene[0].frame_num)
+            if scene_list:
+                stream.finish(scene_list[-1][1].frame_num)
+        finally:
+            ready.put(None)
+        results = cutting.result()
+
+    # the plays as an event CSV, e.g. for dartclips or another split later
+    plays_file = os.path.splitext(full_video_path)[0] + "_plays.csv"
+    write_play_events(stream.events, plays_file)
+    print(f"{len(stream.events)} plays of {len(scene_list)} scenes saved to {plays_file}")
+
+    summary = merge_split_results(results, time.perf_counter() - split_start, progress)
+    summary.update(events=stream.events, plays_file=plays_file, scene_file=scene_file)
+    return summary
+
+
+def main_pipeline(angle_model=None):
 
-    # save filtered
-    video_name = os.path.splitext(video_file)[0]
-    filtered_scene_file = os.path.join(video_path, video_name + "_filtered_scene.csv")
-    save_scene_list_to_csv(filtered_scenes, filtered_scene_file)
+    # choose the file to be split (somehow)
+    video_path, video_file = select_file()
 
+    # combine to (re)create full path
+    full_video_path = os.path.join(video_path, video_file)
 
+    scene_list, scene_file = process_scenes(full_video_path, angle_model)
 
     # scene_list[0][1].get_seconds() - scene_list[0][0].get_seconds()
-    scene_list[0][1].get_framerate()
\ No newline at end of file
+    scene_list[0][1].get_framerate()
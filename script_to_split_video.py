@@ -1,30 +1,18 @@
 #!/usr/bin/env python
 
 import os
-import csv
 import subprocess
 
 # own functions
 from utils.pf_helpers import select_folder
 from utils.pf_helpers import select_file
 from utils.pf_create_dartclip import create_dartclip
+from utils.pf_events import read_events, iter_events
 
 
 def extract_columns(full_times_path):
-    events = []
-
-    with open(full_times_path, 'r', encoding="utf-8-sig") as file:
-        reader = csv.DictReader(file)
-
-        # Check if the required columns exist in the CSV file
-        if 'Position' not in reader.fieldnames or 'Duration' not in reader.fieldnames:
-            raise ValueError("The 'Position' and 'Duration' columns are required but not found in the CSV file.")
-
-        # Iterate over each row in the CSV file
-        for row in reader:
-            events.append(row)
-
-    return events
+    # Position and Duration are checked case-insensitively and parsed to milliseconds once
+    return read_events(full_times_path)
 
 
 def split_direct_cmd(full_video_path, events):
@@ -48,13 +36,18 @@ def split_direct_cmd(full_video_path, events):
       os.makedirs(new_folder_path)
 
     # Loop for each clip
-    for index, time in enumerate(events):
+    for index, event in enumerate(events):
         # Skip some files...
         if index + 1 < flag_skip:
             continue
 
-        starttime = float(events[index]['Position']) / 1000 + time_offset
-        duration = float(events[index]['Duration']) / 1000 + 0.5  # Add 500ms at the end for a little buffer
+        # rows without a valid Position/Duration cannot be cut
+        if event.position is None or event.duration is None:
+            print(f"Skipping clip {index + 1}: invalid or missing Position/Duration in event: {dict(event)}")
+            continue
+
+        starttime = event.position / 1000 + time_offset
+        duration = event.duration / 1000 + 0.5  # Add 500ms at the end for a little buffer
 
         # Output name with leading zeros to 3 digits (001, 010, 100)
         output_file = f"Play_{index + 1:03d}.mp4"
@@ -62,7 +55,7 @@ def split_direct_cmd(full_video_path, events):
 
         # create a dartclip file from the events
         if flag_dartclip:
-            create_dartclip(events[index], output_name)
+            create_dartclip(event, output_name)
 
         if flag_reencode == 0:
             # Copy video and audio
@@ -112,8 +105,8 @@ def main_split_pipeline():
   full_video_path = os.path.join(video_path, video_name)
   full_times_path = os.path.join(times_path, times_name)
 
-  # get clip times from dartfish csv output
-  events = extract_columns(full_times_path)
+  # stream clip times from dartfish csv output (rows are parsed one at a time)
+  events = iter_events(full_times_path)
 
   # split into specified clips
   split_direct_cmd(full_video_path, events)
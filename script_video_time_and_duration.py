@@ -4,8 +4,8 @@
 import os
 import glob
 
-# nice wrapper for direct ffmpeg functions (must have ffmpeg installed directly)
-import ffmpeg
+# shared (cached) ffprobe wrapper
+from utils.pf_probe import get_video_info
 
 # --------------------------- #
 
@@ -20,9 +20,9 @@ working_path = os.path.join(base_path, r"Individual_Clips_GP8")
 file_list = glob.glob(working_path + "**/*.mp4", recursive=True)
 
 # probe video for info
-video_info = ffmpeg.probe(file_list[0])
-create_datetime = video_info['streams'][0]['tags']['creation_time']
-video_duration = video_info['streams'][0]['duration'] # in seconds
+video_info = get_video_info(file_list[0])
+create_datetime = video_info['creation_time']
+video_duration = video_info['duration'] # in seconds
 
 # get date a time separately
 create_date, create_time = create_datetime.split("T", 1)
\ No newline at end of file
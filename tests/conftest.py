@@ -0,0 +1,53 @@
+"""Shared fixtures: the repository root on sys.path, a private probe cache and small synthetic clips made with FFmpeg."""
+
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pf_probe import ProbeCache  # noqa: E402
+
+
+def has_ffmpeg():
+    return shutil.which('ffmpeg') is not None and shutil.which('ffprobe') is not None
+
+
+requires_ffmpeg = pytest.mark.skipif(not has_ffmpeg(), reason="needs ffmpeg and ffprobe")
+
+
+def reads_mpegts():
+    # some static FFmpeg builds crash when demuxing MPEG-TS; concat parts and smart cuts need it
+    if not has_ffmpeg():
+        return False
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "probe.ts")
+        make_clip(path, duration=0.2, codec_args=('-c:v', 'libx264', '-f', 'mpegts'))
+        return subprocess.run(['ffmpeg', '-v', 'error', '-i', path, '-f', 'null', '-'],
+                              capture_output=True).returncode == 0
+
+
+def make_clip(path, size='320x240', rate='30000/1001', duration=1.0, codec_args=('-c:v', 'libx264', '-pix_fmt', 'yuv420p')):
+    """Write a test pattern clip."""
+    subprocess.run(['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', f"testsrc2=size={size}:rate={rate}",
+                    '-t', str(duration)] + list(codec_args) + [str(path)], check=True)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def private_probe_cache(tmp_path, monkeypatch):
+    # keep the probe results of the test clips out of the user's cache
+    cache = ProbeCache(str(tmp_path / "probe_cache.json"))
+    monkeypatch.setattr('utils.pf_probe._default_cache', cache)
+    return cache
+
+
+@pytest.fixture
+def clip_factory(tmp_path):
+    def factory(name, **options):
+        return make_clip(tmp_path / name, **options)
+    return factory
@@ -0,0 +1,53 @@
+"""Shared CPU and I/O budget of batch jobs (utils/pf_batch.py)."""
+
+import threading
+
+from utils.pf_batch import ResourceBudget
+
+# seconds a blocked acquire is given before the test checks it is still waiting
+WAIT = 0.2
+
+
+def acquire_in_thread(budget, cpu, io):
+    acquired = threading.Event()
+
+    def run():
+        budget.acquire(cpu, io)
+        acquired.set()
+
+    threading.Thread(target=run, daemon=True).start()
+    return acquired
+
+
+def test_cost_larger_than_the_budget_is_clamped():
+    budget = ResourceBudget(cpu=4, io=2)
+    assert budget.acquire(16, 5) == (4, 2)
+    budget.release(4, 2)
+    assert budget.acquire(-1, 0) == (0, 0)
+
+
+def test_budget_is_at_least_one_slot_each():
+    budget = ResourceBudget(cpu=0, io=0)
+    assert (budget.cpu, budget.io) == (1, 1)
+
+
+def test_acquire_waits_for_a_release():
+    budget = ResourceBudget(cpu=2, io=2)
+    budget.acquire(2, 1)
+    acquired = acquire_in_thread(budget, 1, 1)
+    assert not acquired.wait(WAIT)
+    budget.release(2, 1)
+    assert acquired.wait(5)
+
+
+def test_waiting_job_holds_neither_resource():
+    budget = ResourceBudget(cpu=2, io=1)
+    budget.acquire(1, 1)
+    # waits for the I/O slot without taking a core in the meantime
+    waiting = acquire_in_thread(budget, 1, 1)
+    assert not waiting.wait(WAIT)
+    assert budget.acquire(1, 0) == (1, 0)
+
+    budget.release(1, 0)
+    budget.release(1, 1)
+    assert waiting.wait(5)
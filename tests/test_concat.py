@@ -0,0 +1,63 @@
+"""Concatenation planning and normalization (utils/pf_concat.py, concatenate_folder)."""
+
+import pytest
+
+from conftest import make_clip, reads_mpegts, requires_ffmpeg
+from utils.pf_concat import normalize_args, plan_concat
+
+MPEG4 = ('-c:v', 'mpeg4')
+
+
+def target(**values):
+    return dict({'codec': 'h264', 'profile': 'High', 'width': 320, 'height': 240, 'pix_fmt': 'yuv420p',
+                 'sample_aspect_ratio': '1:1', 'fps': 29.97, 'frame_rate': '30000/1001'}, **values)
+
+
+def test_normalize_keeps_the_rational_frame_rate():
+    args = normalize_args(target())
+    filters = args[args.index('-vf') + 1]
+    assert 'fps=30000/1001' in filters
+
+
+def test_normalize_hevc_uses_x265_params():
+    args = normalize_args(target(codec='hevc', profile='Main'), threads=4)
+    assert '-x264-params' not in args
+    assert args[args.index('-vcodec') + 1] == 'libx265'
+    assert args[args.index('-x265-params') + 1].startswith('pools=4:frame-threads=2')
+
+
+@requires_ffmpeg
+def test_plan_of_other_majority_codec_encodes_every_clip(tmp_path):
+    files = [make_clip(tmp_path / "a.mp4", duration=2, codec_args=MPEG4),
+             make_clip(tmp_path / "b.mp4", duration=2, codec_args=MPEG4),
+             make_clip(tmp_path / "c.mp4")]
+    plan = plan_concat(files)
+    assert plan['mode'] == 'parts'
+    assert plan['target']['codec'] == 'h264'
+    assert [clip['action'] for clip in plan['clips']] == ['encode', 'encode', 'encode']
+
+
+@requires_ffmpeg
+@pytest.mark.skipif(not reads_mpegts(), reason="this FFmpeg build cannot demux MPEG-TS")
+@pytest.mark.parametrize('outlier', [
+    {'size': '160x120'},  # a mismatched h264 clip
+    {'codec_args': MPEG4},  # h264 clips with an mpeg4 clip
+])
+def test_concatenate_folder_normalizes_mismatched_clips(tmp_path, outlier):
+    from script_concatenate_and_import_csv import concatenate_folder
+    from utils.pf_timeline import verify_timeline
+
+    folder = tmp_path / "clips"
+    folder.mkdir()
+    make_clip(folder / "Play_001.mp4", duration=2)
+    make_clip(folder / "Play_002.mp4", duration=2)
+    make_clip(folder / "Play_003.mp4", **outlier)
+    output = str(tmp_path / "joined.mp4")
+
+    timeline = concatenate_folder(str(folder), output, normalize=True)
+
+    total_us = sum(entry['duration_us'] for entry in timeline)
+    assert total_us == pytest.approx(5.005e6, abs=2e4)
+    for entry in verify_timeline(timeline, output):
+        assert entry['actual_ms'] is not None
+        assert abs(entry['drift_ms']) < 1.0
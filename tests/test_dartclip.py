@@ -0,0 +1,40 @@
+"""Template dartclip writer against the ElementTree writer (utils/pf_create_dartclip.py)."""
+
+import pytest
+
+from utils.pf_create_dartclip import create_dartclip, render_dartclip, write_dartclip
+from utils.pf_events import Event
+
+EVENTS = [
+    # standard categories in the usual header
+    {'Name': 'Play 1', 'Position': '1000', 'Duration': '27000', 'ODK': 'O', 'Down': '1',
+     'Play Type': 'Run', 'DIST': '10', 'RESULT': 'Gain'},
+    # other case, missing and extra columns
+    {'name': 'Play 2', 'position': '5000', 'Duration': '8000', 'odk': 'D', 'down': 'N/A', 'Formation': 'Trips'},
+    # characters that need escaping, non-ASCII text and empty values
+    {'Name': 'Play <3>', 'Position': '0', 'Duration': '100', 'ODK': 'K & "P"', 'Note\tx': 'a\nb > c',
+     'Team': 'Zürich Renegades', 'Empty': ''},
+    # timing columns only
+    {'Position': '0', 'Duration': '0'},
+]
+
+
+def element_tree_bytes(event, output_name):
+    create_dartclip(event, output_name)
+    with open(output_name + ".dartclip", 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('event', EVENTS)
+def test_template_writer_matches_element_tree(tmp_path, event):
+    # the clip name is written into the file, so both writers use the same name in their own folder
+    (tmp_path / "tree").mkdir()
+    (tmp_path / "template").mkdir()
+    expected = element_tree_bytes(event, str(tmp_path / "tree" / "Play_001"))
+    write_dartclip(event, str(tmp_path / "template" / "Play_001"))
+    assert (tmp_path / "template" / "Play_001.dartclip").read_bytes() == expected
+
+
+@pytest.mark.parametrize('event', EVENTS)
+def test_event_objects_render_like_row_dictionaries(event):
+    assert render_dartclip(Event.from_mapping(0, event), "Play_001") == render_dartclip(event, "Play_001")
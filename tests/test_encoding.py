@@ -0,0 +1,76 @@
+"""Named encoding profiles (utils/pf_encoding.py)."""
+
+import pytest
+
+from utils.pf_encoding import DEFAULT_PROFILE, ENCODING_PROFILES, encoder_args, get_profile
+from video_splitter import VideoSplitter
+
+# the re-encode options the splitter used before the profiles, in the same order
+ORIGINAL_REENCODE_ARGS = [
+    '-vf', 'crop=iw:ih-600',
+    '-bsf:v', 'h264_mp4toannexb',
+    '-preset', 'slow',
+    '-crf', '18',
+    '-x264-params', 'keyint=15:scenecut=0',
+    '-vcodec', 'libx264',
+    '-acodec', 'copy',
+]
+
+PROFILE_ARGS = {
+    'archive': ORIGINAL_REENCODE_ARGS,
+    'review-fast': ['-vf', 'scale=-2:720', '-preset', 'veryfast', '-crf', '23', '-x264-params', 'keyint=60',
+                    '-vcodec', 'libx264', '-acodec', 'copy'],
+    'proxy': ['-vf', 'scale=-2:360', '-r', '30', '-preset', 'ultrafast', '-crf', '28', '-tune', 'fastdecode',
+              '-x264-params', 'keyint=30', '-vcodec', 'libx264', '-an'],
+    # the keyframe recode script: keyint=15:min-keyint=1:no-scenecut
+    'dartfish-scrub': ['-preset', 'medium', '-crf', '18', '-x264-params', 'keyint=15:min-keyint=1:scenecut=0',
+                       '-vcodec', 'libx264', '-acodec', 'copy'],
+}
+
+
+def test_every_profile_has_fixed_arguments():
+    assert set(PROFILE_ARGS) == set(ENCODING_PROFILES)
+
+
+@pytest.mark.parametrize('name', sorted(PROFILE_ARGS))
+def test_profile_arguments(name):
+    assert encoder_args(name) == PROFILE_ARGS[name]
+    assert encoder_args(get_profile(name)) == PROFILE_ARGS[name]
+
+
+def test_default_profile_reproduces_the_original_reencode():
+    assert DEFAULT_PROFILE == 'archive'
+    assert encoder_args() == ORIGINAL_REENCODE_ARGS
+    assert VideoSplitter({'reencode': True})._codec_args() == ORIGINAL_REENCODE_ARGS
+    settings = get_profile()
+    assert (settings['preset'], settings['crf'], settings['keyint'], settings['filters']) == \
+        ('slow', 18, 15, ['crop=iw:ih-600'])
+
+
+def test_threads_are_passed_to_the_encoder():
+    assert encoder_args('archive', threads=4) == [
+        '-vf', 'crop=iw:ih-600', '-bsf:v', 'h264_mp4toannexb', '-preset', 'slow', '-crf', '18',
+        '-x264-params', 'threads=4:lookahead-threads=1:keyint=15:scenecut=0', '-threads', '4',
+        '-vcodec', 'libx264', '-acodec', 'copy']
+    assert encoder_args('dartfish-scrub', threads=8, codec='libx265') == [
+        '-preset', 'medium', '-crf', '18', '-x265-params', 'pools=8:frame-threads=3:keyint=15:min-keyint=1:scenecut=0',
+        '-threads', '8', '-vcodec', 'libx265', '-acodec', 'copy']
+    with pytest.raises(ValueError):
+        encoder_args('archive', codec='libvpx')
+
+
+def test_override_dictionary_and_filters():
+    override = {'base': 'review-fast', 'crf': 20, 'audio': None}
+    assert get_profile(override)['name'] == 'review-fast*'
+    assert encoder_args(override) == ['-vf', 'scale=-2:720', '-preset', 'veryfast', '-crf', '20',
+                                      '-x264-params', 'keyint=60', '-vcodec', 'libx264', '-an']
+    # other filters replace the crop of the profile; an empty list drops it
+    assert encoder_args('archive', ['crop=iw:ih-400'])[:2] == ['-vf', 'crop=iw:ih-400']
+    assert encoder_args('archive', []) == ORIGINAL_REENCODE_ARGS[2:]
+
+
+def test_unknown_profile_is_an_error():
+    with pytest.raises(ValueError):
+        get_profile('broadcast')
+    with pytest.raises(ValueError):
+        get_profile({'base': 'broadcast'})
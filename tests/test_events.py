@@ -0,0 +1,61 @@
+"""Event CSV parsing (utils/pf_events.py)."""
+
+import pytest
+
+from utils.pf_events import Event, EventColumns, parse_milliseconds, read_events
+
+
+@pytest.mark.parametrize('value, expected', [
+    ("1500", 1500),
+    ("1500.0", 1500),
+    ("1500.6", 1501),
+    (" 1500 ", 1500),
+    ("-250", -250),
+    ("", None),
+    ("abc", None),
+    (None, None),
+    ("nan", None),
+    ("inf", None),
+    ("-inf", None),
+    ("1e400", None),
+])
+def test_parse_milliseconds(value, expected):
+    assert parse_milliseconds(value) == expected
+
+
+def test_columns_prefer_the_exact_name():
+    columns = EventColumns(['position', 'Position', 'DURATION', 'Name'])
+    assert columns.position == 'Position'
+    assert columns.duration == 'DURATION'
+    assert columns.resolve('name') == 'Name'
+    assert columns.resolve('ODK') is None
+
+
+def test_columns_report_missing_required_columns():
+    assert EventColumns(['position', 'Name']).missing() == ['Duration']
+    assert EventColumns(['POSITION', 'duration']).missing() == []
+
+
+def test_event_parses_its_times_once():
+    event = Event.from_mapping(3, {'Name': 'Play 4', 'position': '12000', 'Duration': 'n/a', 'odk': 'O'})
+    assert event.index == 3
+    assert event.position == 12000
+    assert event.duration is None
+    assert event.field('ODK') == 'O'
+    assert event.field('Down', 'N/A') == 'N/A'
+    # the original row is unchanged
+    assert dict(event) == {'Name': 'Play 4', 'position': '12000', 'Duration': 'n/a', 'odk': 'O'}
+
+
+def test_read_events_strips_the_byte_order_mark(tmp_path):
+    path = tmp_path / "events.csv"
+    path.write_bytes("\ufeffPosition,Duration,Name\n1000,2000,A\n3000,inf,B\n".encode('utf-8'))
+    events = read_events(str(path))
+    assert [(event.position, event.duration) for event in events] == [(1000, 2000), (3000, None)]
+
+
+def test_read_events_requires_position_and_duration(tmp_path):
+    path = tmp_path / "events.csv"
+    path.write_text("Name,Position\nA,1000\n")
+    with pytest.raises(ValueError):
+        read_events(str(path))
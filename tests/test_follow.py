@@ -0,0 +1,144 @@
+"""Splitting a recording and an event CSV that are still being written (utils/pf_follow.py, follow_video)."""
+
+import os
+
+import pytest
+
+from conftest import make_clip, requires_ffmpeg
+from utils.pf_follow import RECORDED_MARGIN, REWIND, EventTail, RecordingWatcher
+from video_splitter import VideoSplitter
+
+# a fragmented MP4 can be read while it grows, with a keyframe every second
+FRAGMENTED = ('-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-g', '30', '-movflags', 'frag_keyframe+empty_moov')
+
+HEADER = "Name,Position,Duration\n"
+
+
+@pytest.fixture
+def recording(tmp_path):
+    # the complete recording, written to the followed file in parts by the tests
+    return make_clip(tmp_path / "full.mp4", rate='30', duration=12.0, codec_args=FRAGMENTED)
+
+
+def append_bytes(source, target, fraction):
+    data = open(source, 'rb').read()
+    done = os.path.getsize(target) if os.path.exists(target) else 0
+    with open(target, 'ab') as f:
+        f.write(data[done:int(len(data) * fraction)])
+
+
+def follow(video_path, csv_path, output_folder):
+    splitter = VideoSplitter({'create_dartclip': False})
+    # stops once neither file has grown for a moment
+    return splitter.follow_video(video_path, csv_path, output_folder, poll_interval=0.1, idle_timeout=0.5)
+
+
+@requires_ffmpeg
+def test_restarted_follow_skips_the_finished_clips(recording, tmp_path):
+    video_path = str(tmp_path / "Game.mp4")
+    csv_path = tmp_path / "Game.csv"
+
+    # first run: half of the game is recorded, two plays are tagged
+    append_bytes(recording, video_path, 0.5)
+    csv_path.write_text(HEADER + "Play 1,0,2000\nPlay 2,3000,2000\n")
+    first = follow(video_path, str(csv_path), str(tmp_path))
+    assert (first['clips_created'], first['clips_failed']) == (2, 0)
+    clips_folder = first['output_folder']
+    written = {name: os.path.getmtime(os.path.join(clips_folder, name)) for name in ("Play_001.mp4", "Play_002.mp4")}
+
+    # restart after the recording and the tagging went on
+    append_bytes(recording, video_path, 1.0)
+    with open(csv_path, 'a') as f:
+        f.write("Play 3,7000,2000\n")
+    second = follow(video_path, str(csv_path), str(tmp_path))
+
+    assert (second['clips_created'], second['clips_skipped'], second['clips_failed']) == (1, 2, 0)
+    assert os.path.exists(os.path.join(clips_folder, "Play_003.mp4"))
+    for name, mtime in written.items():
+        assert os.path.getmtime(os.path.join(clips_folder, name)) == mtime
+
+
+def test_event_tail_returns_complete_appended_rows(tmp_path):
+    csv_path = tmp_path / "Game.csv"
+    tail = EventTail(str(csv_path))
+    assert tail.read_new() == []
+
+    csv_path.write_text(HEADER + "Play 1,0,2000\nPlay 2,30")
+    assert [(event.index, event.position) for event in tail.read_new()] == [(0, 0)]
+    # the row being written is read once its line is complete
+    with open(csv_path, 'a') as f:
+        f.write("00,2000\n\nPlay 3,6000,2000\n")
+    assert [(event.index, event.position) for event in tail.read_new()] == [(1, 3000), (2, 6000)]
+    assert tail.read_new() == []
+
+
+def test_event_tail_requires_the_time_columns(tmp_path):
+    csv_path = tmp_path / "Game.csv"
+    csv_path.write_text("Name,Position\nPlay 1,0\n")
+    with pytest.raises(ValueError):
+        EventTail(str(csv_path)).read_new()
+
+
+@pytest.mark.parametrize('rewrite', ['replace', 'header', 'last_line', 'shrink'])
+def test_event_tail_reads_a_rewritten_file_again(tmp_path, rewrite):
+    csv_path = tmp_path / "Game.csv"
+    csv_path.write_text(HEADER + "Play 1,0,2000\nPlay 2,3000,2000\n")
+    tail = EventTail(str(csv_path))
+    assert len(tail.read_new()) == 2
+
+    if rewrite == 'replace':
+        # saved by a spreadsheet: a new file with other names and one more row
+        new_path = tmp_path / "Game.csv.new"
+        new_path.write_text(HEADER + "Play 01,0,2000\nPlay 02,3000,2000\nPlay 03,6000,2000\n")
+        os.replace(new_path, csv_path)
+        expected = [(2, 6000)]
+    elif rewrite == 'header':
+        # rewritten in place with another column and one more row
+        csv_path.write_text("Name,Position,Duration,ODK\nPlay 1,0,2000,O\nPlay 2,3000,2000,D\nPlay 3,6000,2000,O\n")
+        expected = [(2, 6000)]
+    elif rewrite == 'last_line':
+        # the last row was corrected in place and one more row was added
+        csv_path.write_text(HEADER + "Play 1,0,2000\nPlay 2,3000,250000\nPlay 3,6000,2000\n")
+        expected = [(2, 6000)]
+    else:
+        # saved again with shorter names, the file shrinks
+        csv_path.write_text(HEADER + "P1,0,2000\nP2,3000,2000\n")
+        expected = []
+
+    assert [(event.index, event.position) for event in tail.read_new()] == expected
+    # the rows already returned are not returned twice
+    with open(csv_path, 'a') as f:
+        f.write("Play 9,9000,1000\n")
+    assert [event.position for event in tail.read_new()] == [9000]
+
+
+@requires_ffmpeg
+def test_recording_watcher_follows_a_growing_file(recording, tmp_path):
+    video_path = str(tmp_path / "Game.mp4")
+    watcher = RecordingWatcher(video_path)
+    assert watcher.recorded_until() is None
+
+    recorded = []
+    for step in range(1, 11):
+        append_bytes(recording, video_path, step / 10)
+        recorded.append(watcher.recorded_until())
+    assert recorded == sorted(recorded)
+    # an event ending at 8s is only ready once the file has grown past it
+    half = recorded[4]
+    assert half is not None and half < 8.0 <= recorded[-1]
+    # the whole recording, less the margin for a fragment still being written
+    assert recorded[-1] == pytest.approx(12.0 - RECORDED_MARGIN, abs=0.05)
+    # unchanged files are not read again
+    assert watcher.recorded_until() == recorded[-1]
+
+
+@requires_ffmpeg
+def test_recording_watcher_reads_on_past_the_rewind(recording, tmp_path):
+    # a jump of more than REWIND seconds between two checks is read from the known end on
+    video_path = str(tmp_path / "Game.mp4")
+    append_bytes(recording, video_path, 0.1)
+    watcher = RecordingWatcher(video_path, margin=0.0)
+    first = watcher.recorded_until()
+    append_bytes(recording, video_path, 1.0)
+    assert 12.0 - first > REWIND
+    assert watcher.recorded_until() == pytest.approx(12.0, abs=0.05)
@@ -0,0 +1,76 @@
+"""Resumable split jobs (utils/pf_manifest.py)."""
+
+import os
+
+import pytest
+
+from conftest import make_clip, requires_ffmpeg
+from utils.pf_manifest import SplitManifest, event_hash, probe_duration
+
+EVENT = {'Name': 'Play 1', 'Position': '1000', 'Duration': '2000'}
+PARAMS = {'starttime': 1.0, 'duration': 2.0, 'split_mode': 'per_clip'}
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    # a clips folder with Play_001.mp4 recorded as created
+    folder = tmp_path / "Game Clips"
+    folder.mkdir()
+    clip = make_clip(folder / "Play_001.mp4", duration=1.0)
+    job_hash = event_hash(EVENT, PARAMS)
+    manifest = SplitManifest(str(folder), str(tmp_path / "Game.mp4"))
+    manifest.record(1, "Play_001.mp4", job_hash, PARAMS, 'created',
+                    size=os.path.getsize(clip), duration=probe_duration(clip))
+    return folder, clip, job_hash
+
+
+def test_event_hash_changes_with_the_event_and_the_parameters():
+    job_hash = event_hash(EVENT, PARAMS)
+    assert event_hash(dict(EVENT), dict(PARAMS)) == job_hash
+    assert event_hash(dict(EVENT, Duration='2500'), PARAMS) != job_hash
+    assert event_hash(EVENT, dict(PARAMS, duration=2.5)) != job_hash
+
+
+@requires_ffmpeg
+def test_recorded_clip_is_complete_after_a_reload(recorded, tmp_path):
+    folder, clip, job_hash = recorded
+    manifest = SplitManifest(str(folder), str(tmp_path / "Game.mp4"))
+    assert manifest.is_complete(1, job_hash)
+    assert manifest.is_complete("1", job_hash)
+
+
+@requires_ffmpeg
+def test_changed_event_or_other_clip_is_not_complete(recorded, tmp_path):
+    folder, clip, job_hash = recorded
+    manifest = SplitManifest(str(folder), str(tmp_path / "Game.mp4"))
+    assert not manifest.is_complete(1, event_hash(dict(EVENT, Duration='2500'), PARAMS))
+    assert not manifest.is_complete(2, job_hash)
+
+
+@requires_ffmpeg
+def test_missing_or_changed_clip_file_is_not_complete(recorded, tmp_path):
+    folder, clip, job_hash = recorded
+    manifest = SplitManifest(str(folder), str(tmp_path / "Game.mp4"))
+    with open(clip, 'ab') as f:
+        f.write(b"\0" * 16)
+    assert not manifest.is_complete(1, job_hash)
+    os.remove(clip)
+    assert not manifest.is_complete(1, job_hash)
+
+
+@requires_ffmpeg
+def test_failed_or_cut_off_clip_is_not_complete(recorded, tmp_path):
+    folder, clip, job_hash = recorded
+    manifest = SplitManifest(str(folder), str(tmp_path / "Game.mp4"))
+    size = os.path.getsize(clip)
+    manifest.record(1, "Play_001.mp4", job_hash, PARAMS, 'created', size=size, duration=5.0)
+    assert not manifest.is_complete(1, job_hash)
+    manifest.record(1, "Play_001.mp4", job_hash, PARAMS, 'failed', size=size, error="FFmpeg failed")
+    assert not manifest.is_complete(1, job_hash)
+
+
+def test_manifest_of_another_version_is_ignored(tmp_path):
+    (tmp_path / "split_manifest.json").write_text('{"version": 0, "clips": {"1": {"status": "created"}}}')
+    manifest = SplitManifest(str(tmp_path), str(tmp_path / "Game.mp4"))
+    assert manifest.data['clips'] == {}
+    assert not manifest.is_complete(1, "any")
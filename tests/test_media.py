@@ -0,0 +1,70 @@
+"""In-process access to video files (utils/pf_media.py)."""
+
+import json
+import subprocess
+
+import pytest
+
+from conftest import make_clip, requires_ffmpeg
+from utils.pf_media import MediaSource, default_backend
+
+# two B-frames between the references, a keyframe every second
+B_FRAMES = ('-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-g', '30', '-keyint_min', '30', '-sc_threshold', '0',
+            '-bf', '2')
+
+requires_pyav = pytest.mark.skipif(default_backend() != 'pyav', reason="needs PyAV")
+
+
+@pytest.fixture
+def game(tmp_path):
+    return make_clip(tmp_path / "Game.mp4", rate='30', duration=6.0, codec_args=B_FRAMES)
+
+
+def probe(path):
+    output = subprocess.run(['ffprobe', '-v', 'error', '-select_streams', 'v', '-show_entries',
+                             'stream=start_time,duration,nb_frames', '-show_entries', 'frame=pts_time,key_frame',
+                             '-read_intervals', '%+#1', '-of', 'json', path],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+@requires_ffmpeg
+@requires_pyav
+@pytest.mark.parametrize('start, end, keyframe', [(2.0, 3.5, 2.0), (2.4, 3.5, 2.0), (0.0, 1.2, 0.0)])
+def test_segment_of_a_b_frame_source_starts_on_its_keyframe(game, tmp_path, start, end, keyframe):
+    segment = str(tmp_path / "segment.mp4")
+    with MediaSource(game, backend='pyav') as source:
+        written = source.write_segment(segment, start, end)
+
+    probed = probe(segment)
+    stream, frame = probed['streams'][0], probed['frames'][0]
+    assert float(stream['start_time']) == 0.0
+    assert (frame['key_frame'], float(frame['pts_time'])) == (1, 0.0)
+    # packets decoded before the end: the frames up to the end and the B-frame delay
+    assert int(stream['nb_frames']) == written
+    assert end - keyframe <= float(stream['duration']) <= end - keyframe + 0.1
+
+
+@requires_ffmpeg
+@requires_pyav
+def test_segment_matches_an_ffmpeg_copy(game, tmp_path):
+    def frames(path):
+        return subprocess.run(['ffmpeg', '-v', 'error', '-i', path, '-map', '0:v', '-f', 'framemd5', '-'],
+                              capture_output=True, text=True, check=True).stdout.splitlines()[-50:]
+
+    copies = {}
+    for backend in ('pyav', 'ffmpeg'):
+        copies[backend] = str(tmp_path / f"{backend}.mp4")
+        with MediaSource(game, backend=backend) as source:
+            source.write_segment(copies[backend], 2.0, 3.5)
+    # the same decoded frames at the same times
+    assert frames(copies['pyav']) == frames(copies['ffmpeg'])
+
+
+@requires_pyav
+def test_segment_without_a_keyframe_is_an_error(game, tmp_path):
+    segment = tmp_path / "segment.mp4"
+    with MediaSource(game, backend='pyav') as source:
+        with pytest.raises(ValueError):
+            source.write_segment(str(segment), 2.0, 1.9)
+    assert not segment.exists()
@@ -0,0 +1,126 @@
+"""Progress records, metrics file and stage timings (utils/pf_progress.py)."""
+
+import json
+
+import pytest
+
+from conftest import requires_ffmpeg
+from utils.pf_progress import ProgressReporter, iter_progress_blocks, progress_record, run_ffmpeg
+
+# -progress pipe:1 output of a clip re-encode: a block while running, then the last one
+PROGRESS_OUTPUT = """\
+frame=184
+fps=61.20
+stream_0_0_q=28.0
+bitrate=2731.5kbits/s
+total_size=1048624
+out_time_us=3070000
+out_time_ms=3070000
+out_time=00:00:03.070000
+dup_frames=0
+drop_frames=0
+speed=2.04x
+progress=continue
+frame=300
+fps=60.80
+stream_0_0_q=-1.0
+bitrate=2684.0kbits/s
+total_size=1677721
+out_time_us=5000000
+out_time_ms=5000000
+out_time=00:00:05.000000
+dup_frames=0
+drop_frames=0
+speed=2.03x
+progress=end
+"""
+
+
+def metrics(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_progress_block_becomes_a_record():
+    blocks = list(iter_progress_blocks(PROGRESS_OUTPUT.splitlines(keepends=True)))
+    assert len(blocks) == 2
+    assert progress_record(blocks[0], duration=5.0) == {
+        'frame': 184, 'fps': 61.2, 'speed': 2.04, 'out_time': 3.07, 'total_size': 1048624,
+        'percent': 61.4, 'eta': 0.95, 'done': False}
+    assert progress_record(blocks[1], duration=5.0) == {
+        'frame': 300, 'fps': 60.8, 'speed': 2.03, 'out_time': 5.0, 'total_size': 1677721,
+        'percent': 100.0, 'eta': 0.0, 'done': True}
+
+
+def test_first_block_without_rates_uses_the_wall_time():
+    # FFmpeg writes N/A and a zero rate until the first second has passed
+    block = {'frame': '12', 'fps': '0.00', 'total_size': 'N/A', 'out_time_us': 'N/A', 'speed': 'N/A',
+             'progress': 'continue'}
+    assert progress_record(block, duration=5.0, wall_time=0.5) == {
+        'frame': 12, 'fps': 24.0, 'speed': None, 'out_time': None, 'total_size': None,
+        'percent': None, 'eta': None, 'done': False}
+    block.update(out_time_us='1000000', speed='N/A')
+    assert progress_record(block, duration=5.0, wall_time=0.5)['eta'] == 2.0
+    # without a duration there is no percent or ETA
+    assert progress_record(block)['percent'] is None
+
+
+def test_bound_reporters_write_through_the_metrics_file_of_the_root(tmp_path):
+    metrics_path = tmp_path / "metrics.jsonl"
+    root = ProgressReporter(str(metrics_path), job="batch")
+    first, second = root.bind("split Game1"), root.bind("split Game2")
+
+    first.emit('ffmpeg', clip=1)
+    second.emit('ffmpeg', clip=1)
+    with first.stage('clips', count=2):
+        pass
+    root.emit('batch', jobs=2)
+    # one handle for the run, held by the root
+    assert root._metrics_file is not None
+    assert first._metrics_file is None and second._metrics_file is None
+
+    first.close()
+    assert root._metrics_file is None
+    second.emit('ffmpeg', clip=2)
+    root.close()
+
+    records = metrics(metrics_path)
+    assert [(record['job'], record['event']) for record in records] == [
+        ("split Game1", 'ffmpeg'), ("split Game2", 'ffmpeg'), ("split Game1", 'stage'), ("batch", 'batch'),
+        ("split Game2", 'ffmpeg')]
+    assert records[2]['count'] == 2 and records[2]['status'] == 'done'
+    # the stage times of a job add to the root, not to the other jobs
+    assert root.stage_times()['clips']['count'] == 1
+    assert first.stage_times()['clips']['count'] == 1
+    assert second.stage_times() == {}
+
+
+def test_callbacks_receive_the_records_and_may_fail():
+    received = []
+
+    def broken(record):
+        raise RuntimeError("display closed")
+
+    reporter = ProgressReporter(callbacks=[broken, received.append], job="split")
+    with pytest.raises(KeyError):
+        with reporter.stage('clips'):
+            raise KeyError('Position')
+    assert [(record['event'], record['stage'], record['status']) for record in received] == [
+        ('stage', 'clips', 'failed')]
+    assert not ProgressReporter().active
+
+
+@requires_ffmpeg
+def test_run_ffmpeg_reports_until_the_end(tmp_path):
+    received = []
+    reporter = ProgressReporter(callbacks=[received.append])
+    cmd = ['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', 'testsrc2=size=320x240:rate=30', '-t', '2',
+           '-c:v', 'libx264', '-pix_fmt', 'yuv420p', str(tmp_path / "clip.mp4")]
+    returncode, stderr = run_ffmpeg(cmd, duration=2.0, reporter=reporter, stage='clip', clip=7)
+
+    assert (returncode, stderr) == (0, "")
+    assert received and all(record['clip'] == 7 and record['stage'] == 'clip' for record in received)
+    last = received[-1]
+    assert (last['done'], last['eta'], last['frame']) == (True, 0.0, 60)
+    # out_time is the time of the last packet muxed, a little short of the end
+    assert 1.5 < last['out_time'] <= 2.0
+    assert last['percent'] == round(100 * last['out_time'] / 2.0, 1)
@@ -0,0 +1,106 @@
+"""Scene detection replayed from cached frame metrics (utils/pf_scene_metrics.py)."""
+
+import os
+import subprocess
+
+import pytest
+import scenedetect
+
+from conftest import requires_ffmpeg
+from utils.pf_scene_detect import DETECTOR_PARAMS, detect_scenes_proxy
+from utils.pf_scene_metrics import load_scene_metrics, replay_adaptive, save_scene_metrics, stats_paths
+
+# five shots of different test sources with hard cuts at frames 60, 90, 135 and 150
+SHOTS = [
+    "testsrc2=size=320x240:rate=30:d=2",
+    "smptebars=size=320x240:rate=30:d=1",
+    "life=size=320x240:rate=30:mold=10:ratio=0.5:death_color=#C83232:life_color=#00ff00,trim=duration=1.5",
+    "rgbtestsrc=size=320x240:rate=30:d=0.5",
+    "testsrc=size=320x240:rate=30:d=2",
+]
+
+PARAMS = [
+    {},
+    {'min_scene_len': 10},
+    {'min_scene_len': 10, 'adaptive_threshold': 2.0, 'window_width': 3},
+    {'min_scene_len': 10, 'min_content_val': 30},
+    {'min_scene_len': 10, 'weights': scenedetect.ContentDetector.Components(1.0, 0.5, 1.0, 0.2)},
+]
+
+
+@pytest.fixture(scope='module')
+def cut_video(tmp_path_factory):
+    path = tmp_path_factory.mktemp("scenes") / "cuts.mp4"
+    cmd = ['ffmpeg', '-v', 'error', '-y']
+    for shot in SHOTS:
+        cmd += ['-f', 'lavfi', '-i', shot]
+    inputs = "".join(f"[{index}]" for index in range(len(SHOTS)))
+    cmd += ['-filter_complex', f"{inputs}concat=n={len(SHOTS)},format=yuv420p", '-c:v', 'libx264', '-g', '30', str(path)]
+    subprocess.run(cmd, check=True)
+    return str(path)
+
+
+def frames(scene_list):
+    return [(start.frame_num, end.frame_num) for start, end in scene_list]
+
+
+def live_adaptive(video_path, stats_manager=None, **params):
+    scene_manager = scenedetect.SceneManager(stats_manager)
+    scene_manager.add_detector(scenedetect.AdaptiveDetector(**dict(DETECTOR_PARAMS, **params)))
+    scene_manager.detect_scenes(video=scenedetect.open_video(video_path))
+    return scene_manager.get_scene_list()
+
+
+@pytest.fixture(scope='module')
+def full_stats(cut_video):
+    stats_manager = scenedetect.StatsManager()
+    live_adaptive(cut_video, stats_manager)
+    stats_file = stats_paths(cut_video)[0]
+    stats_manager.save_to_csv(csv_file=stats_file)
+    return stats_file
+
+
+@pytest.fixture
+def full_metrics(cut_video, full_stats):
+    # converted per test, so the video is probed through the private probe cache
+    return save_scene_metrics(cut_video, full_stats)
+
+
+@requires_ffmpeg
+@pytest.mark.parametrize('params', PARAMS)
+def test_replay_matches_a_live_adaptive_detector(cut_video, full_metrics, params):
+    live = frames(live_adaptive(cut_video, **params))
+    assert len(live) > 1
+    assert frames(replay_adaptive(full_metrics, **params)) == live
+
+
+@requires_ffmpeg
+def test_replay_matches_a_frame_skipping_proxy_run(cut_video, tmp_path):
+    params = {'min_scene_len': 10}
+    stats_manager = scenedetect.StatsManager()
+    live = detect_scenes_proxy(cut_video, proxy_width=160, frame_skip=1, stats_manager=stats_manager,
+                               detector_params=params)
+    stats_file = str(tmp_path / "proxy_stats.csv")
+    stats_manager.save_to_csv(csv_file=stats_file)
+    metrics = save_scene_metrics(cut_video, stats_file, proxy_width=160, frame_skip=1)
+    assert metrics['step'] == 2
+    assert frames(replay_adaptive(metrics, **params)) == frames(live)
+
+
+@requires_ffmpeg
+def test_metrics_of_another_analysis_are_a_cache_miss(cut_video, full_metrics):
+    assert load_scene_metrics(cut_video) is not None
+    assert load_scene_metrics(cut_video, proxy_width=160) is None
+    assert load_scene_metrics(cut_video, frame_skip=1) is None
+
+    save_scene_metrics(cut_video, proxy_width=160, frame_skip=1)
+    assert load_scene_metrics(cut_video, proxy_width=160, frame_skip=1) is not None
+    assert load_scene_metrics(cut_video) is None
+
+
+@requires_ffmpeg
+def test_stats_csv_is_only_converted_for_a_full_resolution_request(cut_video, full_metrics):
+    # the CSV does not record its analysis; without the binary cache it must be a full-resolution run
+    os.remove(stats_paths(cut_video)[1])
+    assert load_scene_metrics(cut_video, proxy_width=160) is None
+    assert load_scene_metrics(cut_video) is not None
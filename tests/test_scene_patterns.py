@@ -0,0 +1,51 @@
+"""Play pattern matching on scene durations (utils/pf_scene_patterns.py)."""
+
+import numpy as np
+import pytest
+
+from utils.pf_scene_patterns import PLAY_PATTERNS, PlayMatcher, match_play_pattern
+
+
+def test_scoreboard_plays_are_found_between_other_scenes():
+    # scoreboard, All 22, Endzone; a replay; scoreboard, All 22, Endzone
+    durations = [1.0, 10.0, 10.5, 5.0, 1.5, 8.0, 8.0]
+    groups = match_play_pattern(durations, 'scoreboard')
+    assert groups.tolist() == [[0, 1, 2], [4, 5, 6]]
+
+
+def test_rules_reject_long_scoreboards_and_different_angle_lengths():
+    assert match_play_pattern([3.0, 10.0, 10.0], 'scoreboard').shape == (0, 3)
+    assert match_play_pattern([1.0, 10.0, 20.0], 'scoreboard').shape == (0, 3)
+
+
+def test_groups_never_share_a_scene():
+    # every position matches the two-angle pattern; groups are taken greedily from the start
+    groups = match_play_pattern([5.0] * 5, 'two_angle')
+    assert groups.tolist() == [[0, 1], [2, 3]]
+
+
+def test_too_few_scenes_give_an_empty_result():
+    groups = match_play_pattern([1.0, 10.0], 'scoreboard')
+    assert groups.shape == (0, 3)
+    assert groups.dtype == np.int64
+
+
+def test_custom_pattern_dictionary():
+    pattern = dict(PLAY_PATTERNS['two_angle'], min_duration=[4.0, None])
+    assert match_play_pattern([3.0, 3.0, 6.0, 6.0], pattern).tolist() == [[2, 3]]
+
+
+@pytest.mark.parametrize('pattern', sorted(PLAY_PATTERNS))
+def test_play_matcher_finds_the_same_groups_as_the_batch_matcher(pattern):
+    rng = np.random.default_rng(7)
+    # short scoreboard shots, play-length angles and odd replays
+    durations = rng.choice([1.0, 2.0, 8.0, 8.5, 9.0, 14.0, 30.0], size=500)
+
+    matcher = PlayMatcher(pattern)
+    groups = []
+    for duration in durations:
+        groups.extend(matcher.add_scene(float(duration)))
+
+    expected = match_play_pattern(durations, pattern).tolist()
+    assert expected
+    assert groups == expected
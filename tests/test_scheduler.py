@@ -0,0 +1,69 @@
+"""Core budget planning for concurrent encodes (utils/pf_scheduler.py)."""
+
+import pytest
+
+from utils.pf_scheduler import encode_cost, encode_time, plan_encodes, simulate_makespan, x265_frame_threads
+
+
+@pytest.mark.parametrize('jobs, expected', [
+    (1, 10.0),
+    (2, 5.0),   # 4 | 3, then 2 after the 3 and 1 after the 4
+    (3, 4.0),
+    (8, 4.0),   # idle workers do not help
+    (0, 10.0),  # at least one worker
+])
+def test_simulate_makespan_runs_tasks_in_queue_order(jobs, expected):
+    assert simulate_makespan([4.0, 3.0, 2.0, 1.0], jobs) == expected
+
+
+def test_makespan_follows_the_queue_not_the_best_packing():
+    # a longest-first packing would give 6; the pool starts tasks in the given order
+    assert simulate_makespan([1.0, 1.0, 6.0], 2) == 7.0
+
+
+def test_plan_keeps_every_candidate_within_the_budget():
+    plan = plan_encodes([30.0] * 20, core_budget=8)
+    assert len(plan['candidates']) == 8
+    for candidate in plan['candidates']:
+        assert candidate['jobs'] * candidate['threads'] <= 8
+    assert plan['makespan'] == min(candidate['makespan'] for candidate in plan['candidates'])
+
+
+def test_many_short_clips_run_single_threaded():
+    plan = plan_encodes([5.0] * 100, core_budget=8)
+    assert (plan['jobs'], plan['threads']) == (8, 1)
+    assert plan['lookahead_threads'] == 1
+
+
+def test_one_long_clip_gets_all_threads():
+    plan = plan_encodes([600.0], core_budget=8)
+    assert (plan['jobs'], plan['threads']) == (1, 8)
+    assert plan['makespan'] == pytest.approx(encode_time(600.0, 8, 1.0))
+
+
+def test_fixed_jobs_share_the_budget():
+    plan = plan_encodes([60.0] * 4, core_budget=12, jobs=3)
+    assert (plan['jobs'], plan['threads']) == (3, 4)
+    assert len(plan['candidates']) == 1
+
+
+def test_clips_of_costlier_sources_take_longer():
+    durations = [60.0, 60.0]
+    uniform = plan_encodes(durations, core_budget=2, cost=1.0, jobs=2)
+    # a 4K60 angle next to a 1080p30 one
+    mixed = plan_encodes(durations, core_budget=2, cost=[1.0, 8.0], jobs=2)
+    assert mixed['makespan'] == pytest.approx(encode_time(60.0, 1, 8.0))
+    assert mixed['makespan'] > uniform['makespan']
+    assert plan_encodes(durations, core_budget=2, cost=[1.0, 1.0]) == plan_encodes(durations, core_budget=2)
+    with pytest.raises(ValueError):
+        plan_encodes(durations, core_budget=2, cost=[1.0])
+
+
+def test_encode_cost_scales_with_the_pixel_rate():
+    assert encode_cost(1.5) == 1.5
+    assert encode_cost(1.5, {'width': 3840, 'height': 2160, 'fps': 60.0}) == pytest.approx(12.0)
+    assert encode_cost(1.5, {'width': 1280, 'height': 720, 'fps': None}) == 1.5
+
+
+def test_x265_frame_threads_follow_the_pool_size():
+    assert [x265_frame_threads(threads) for threads in (1, 3, 4, 8, 16, 32, 64)] == [1, 1, 2, 3, 5, 6, 6]
@@ -0,0 +1,133 @@
+"""One event list cut from the recordings of several camera angles (VideoSplitter.split_angles)."""
+
+import os
+import subprocess
+
+import numpy as np
+import pytest
+
+from conftest import make_clip, requires_ffmpeg
+from utils.pf_media import MediaSource
+from video_splitter import VideoSplitter, angle_tag, merge_split_results
+
+# every frame a keyframe, so copied clips start exactly at the event
+ALL_INTRA = ('-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-g', '1')
+
+
+@pytest.fixture
+def angles(tmp_path):
+    # the end zone camera started 2 s after the all 22 camera and stopped 2 s before it
+    all22 = make_clip(tmp_path / "All22.mp4", rate='30', duration=10.0, codec_args=ALL_INTRA)
+    endzone = str(tmp_path / "Endzone.mp4")
+    subprocess.run(['ffmpeg', '-v', 'error', '-y', '-ss', '2', '-i', all22, '-t', '6', '-c', 'copy', endzone],
+                   check=True)
+    return [{'angle': 'All 22', 'video': all22, 'offset': 0.0},
+            {'angle': 'End zone', 'video': endzone, 'offset': -2.0}]
+
+
+def event(name, position_ms, duration_ms):
+    return {'Name': name, 'Position': str(position_ms), 'Duration': str(duration_ms)}
+
+
+EVENTS = [event("Play 1", 4000, 1000), event("Play 2", 8500, 1000), event("Play 3", 500, 1000)]
+
+
+def split(sources, tmp_path):
+    splitter = VideoSplitter({'create_dartclip': False})
+    return splitter.split_angles(sources, EVENTS, str(tmp_path), name="Game")
+
+
+def statuses(result):
+    return {clip['output_file']: clip['status'] for clip in result['clips']}
+
+
+def first_frame(path):
+    with MediaSource(path) as source:
+        return source.frames_at([0.0])[0].astype(int)
+
+
+@requires_ffmpeg
+def test_each_play_is_cut_from_every_angle(angles, tmp_path):
+    result = split(angles, tmp_path)
+
+    assert result['output_folder'] == os.path.join(str(tmp_path), "Game Clips")
+    assert [(clip['clip_number'], clip['angle']) for clip in result['clips']] == [
+        (1, 'All 22'), (1, 'End zone'), (2, 'All 22'), (2, 'End zone'), (3, 'All 22'), (3, 'End zone')]
+    assert statuses(result) == {
+        "Play_001_All22.mp4": 'created', "Play_001_Endzone.mp4": 'created',
+        "Play_002_All22.mp4": 'created', "Play_002_Endzone.mp4": 'skipped',
+        "Play_003_All22.mp4": 'created', "Play_003_Endzone.mp4": 'skipped',
+    }
+    assert (result['clips_created'], result['clips_skipped'], result['clips_failed']) == (4, 2, 0)
+    for name, status in statuses(result).items():
+        assert os.path.exists(os.path.join(result['output_folder'], name)) == (status == 'created')
+
+
+@requires_ffmpeg
+def test_events_outside_an_angle_are_skipped_with_the_reason(angles, tmp_path):
+    errors = {clip['output_file']: clip['error'] for clip in split(angles, tmp_path)['clips']}
+    # 8.5 s in the all 22 time is 6.5 s into the 6 s end zone recording
+    assert "after the recording Endzone.mp4 ends" in errors["Play_002_Endzone.mp4"]
+    # 0.5 s to 2 s (with the buffer) ends before the end zone recording starts
+    assert "before the recording Endzone.mp4 starts" in errors["Play_003_Endzone.mp4"]
+    assert errors["Play_001_All22.mp4"] is None
+
+
+@requires_ffmpeg
+def test_the_sync_offset_shows_the_same_moment_from_each_angle(angles, tmp_path):
+    folder = split(angles, tmp_path)['output_folder']
+    all22 = first_frame(os.path.join(folder, "Play_001_All22.mp4"))
+    endzone = first_frame(os.path.join(folder, "Play_001_Endzone.mp4"))
+    assert np.abs(all22 - endzone).mean() < 1.0
+
+    # without the offset the end zone clip shows a moment 2 s later
+    unsynced = [dict(angles[1], offset=0.0)]
+    folder = VideoSplitter({'create_dartclip': False}).split_angles(unsynced, EVENTS[:1], str(tmp_path / "unsynced"),
+                                                                     name="Game")['output_folder']
+    assert np.abs(all22 - first_frame(os.path.join(folder, "Play_001_Endzone.mp4"))).mean() > 5.0
+
+
+@requires_ffmpeg
+def test_resume_is_kept_per_angle(angles, tmp_path):
+    first = split(angles, tmp_path)
+    folder = first['output_folder']
+    written = {name: os.path.getmtime(os.path.join(folder, name))
+               for name, status in statuses(first).items() if status == 'created'}
+
+    second = split(angles, tmp_path)
+    assert (second['clips_created'], second['clips_skipped'], second['clips_failed']) == (0, 6, 0)
+
+    # a corrected offset re-cuts the clips of that angle only; play 3 now ends 0.5 s into its recording
+    resynced = [angles[0], dict(angles[1], offset=-1.5)]
+    third = split(resynced, tmp_path)
+    assert [name for name, status in statuses(third).items() if status == 'created'] == [
+        "Play_001_Endzone.mp4", "Play_003_Endzone.mp4"]
+    for name, mtime in written.items():
+        if name != "Play_001_Endzone.mp4":
+            assert os.path.getmtime(os.path.join(folder, name)) == mtime
+
+
+def test_angle_names_must_give_distinct_file_names(tmp_path):
+    assert angle_tag("All 22") == "All22"
+    assert angle_tag("End-zone (high)") == "End-zonehigh"
+
+    # the names are checked before the videos
+    video = str(tmp_path / "Game.mp4")
+    for sources in ([{'angle': "All 22", 'video': video}, {'angle': "All22", 'video': video}],
+                    [{'angle': "!!", 'video': video}],
+                    []):
+        with pytest.raises(ValueError):
+            VideoSplitter().split_angles(sources, EVENTS, str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        VideoSplitter().split_angles([{'angle': "All 22", 'video': video}], EVENTS, str(tmp_path))
+
+
+def test_merged_results_are_in_play_order():
+    def result(clip_numbers, created, skipped, failed):
+        return {'output_folder': "Game Clips", 'clips_created': created, 'clips_skipped': skipped,
+                'clips_failed': failed, 'clips': [{'clip_number': number} for number in clip_numbers]}
+
+    merged = merge_split_results([result([3, 4], 2, 0, 0), result([1, 2], 0, 1, 1)], wall_time=2.5)
+    assert [clip['clip_number'] for clip in merged['clips']] == [1, 2, 3, 4]
+    assert (merged['clips_created'], merged['clips_skipped'], merged['clips_failed']) == (2, 1, 1)
+    assert (merged['output_folder'], merged['wall_time'], merged['stage_times']) == ("Game Clips", 2.5, {})
@@ -0,0 +1,123 @@
+"""Cutting the clips of a video (VideoSplitter.split_video)."""
+
+import os
+import subprocess
+
+import numpy as np
+import pytest
+
+from conftest import make_clip, reads_mpegts, requires_ffmpeg
+from utils.pf_keyframes import keyframe_at_or_before, load_keyframe_index
+from utils.pf_media import MediaSource
+from video_splitter import VideoSplitter
+
+# a keyframe every second, with B-frames as from a camera
+GOP_30 = ('-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-g', '30', '-keyint_min', '30', '-sc_threshold', '0')
+
+EVENTS = [{'Name': f"Play {index}", 'Position': str(position), 'Duration': str(duration)}
+          for index, (position, duration) in enumerate([(1500, 1200), (3200, 800), (5000, 1000), (6400, 1500),
+                                                        (8100, 700), (9000, 900)], start=1)]
+
+# default time added after each event
+BUFFER = 0.5
+
+
+@pytest.fixture
+def game(tmp_path):
+    return make_clip(tmp_path / "Game.mp4", rate='30', duration=12.0, codec_args=GOP_30)
+
+
+def split(video_path, output_folder, **config):
+    splitter = VideoSplitter(dict({'create_dartclip': False, 'resume': False}, **config))
+    result = splitter.split_video(video_path, EVENTS, str(output_folder))
+    assert result['clips_created'] == len(EVENTS)
+    return result
+
+
+def packets(clip_path):
+    # timestamps, size and checksum of every video packet
+    output = subprocess.run(['ffmpeg', '-v', 'error', '-i', clip_path, '-map', '0:v', '-c', 'copy',
+                             '-f', 'framemd5', '-'], capture_output=True, text=True, check=True).stdout
+    return [line.split(',')[1:] for line in output.splitlines() if not line.startswith('#')]
+
+
+def first_frame(clip_path):
+    # timestamp and keyframe flag of the first displayed frame
+    output = subprocess.run(['ffprobe', '-v', 'error', '-select_streams', 'v', '-read_intervals', '%+#1',
+                             '-show_entries', 'frame=pts_time,key_frame', '-of', 'csv=p=0', clip_path],
+                            capture_output=True, text=True, check=True).stdout
+    key_frame, pts_time = output.split()[0].split(',')[:2]
+    return int(key_frame), float(pts_time)
+
+
+def image_at(video_path, time_sec):
+    with MediaSource(video_path) as source:
+        return source.frames_at([time_sec])[0].astype(int)
+
+
+def clip_packets(result):
+    return [packets(os.path.join(result['output_folder'], clip['output_file'])) for clip in result['clips']]
+
+
+# the archive profile crops 1080p sources; single-threaded x264 writes the same stream every time
+@requires_ffmpeg
+@pytest.mark.parametrize('config', [{}, {'reencode': True, 'video_filters': [], 'threads_per_job': 1}],
+                         ids=['copy', 'reencode'])
+def test_worker_pool_writes_the_clips_of_a_serial_run(game, tmp_path, config):
+    serial = split(game, tmp_path / "serial", workers=1, **config)
+    pooled = split(game, tmp_path / "pool", workers=4, **config)
+
+    assert [clip['output_file'] for clip in pooled['clips']] == [clip['output_file'] for clip in serial['clips']]
+    assert clip_packets(pooled) == clip_packets(serial)
+
+
+@requires_ffmpeg
+def test_keyframe_aligned_clips_start_on_an_indexed_keyframe(game, tmp_path):
+    result = split(game, tmp_path, keyframe_align=True)
+    keyframes = load_keyframe_index(game)['keyframes']
+
+    for event, clip in zip(EVENTS, result['clips']):
+        clip_path = os.path.join(result['output_folder'], clip['output_file'])
+        keyframe = keyframe_at_or_before(keyframes, int(event['Position']) / 1000)
+        # the clip shows the keyframe first, at the clip start
+        assert first_frame(clip_path) == (1, 0.0)
+        assert np.array_equal(image_at(clip_path, 0.0), image_at(game, keyframe))
+        # and keeps the end of the event (a copy may run on for the frames of the B-frame delay)
+        end = (int(event['Position']) + int(event['Duration'])) / 1000 + BUFFER
+        with MediaSource(clip_path) as source:
+            assert end - keyframe - 0.001 <= source.info['duration'] <= end - keyframe + 0.1
+
+
+@requires_ffmpeg
+@pytest.mark.skipif(not reads_mpegts(), reason="this FFmpeg build cannot demux MPEG-TS")
+def test_smart_cut_starts_at_the_requested_time(game, tmp_path):
+    result = split(game, tmp_path, smart_cut=True)
+
+    for event, clip in zip(EVENTS, result['clips']):
+        clip_path = os.path.join(result['output_folder'], clip['output_file'])
+        start = int(event['Position']) / 1000
+        assert first_frame(clip_path) == (1, 0.0)
+        # the re-encoded head shows the frame of the event start, not the keyframe before it
+        assert np.abs(image_at(clip_path, 0.0) - image_at(game, start)).mean() < 2.0
+        with MediaSource(clip_path) as source:
+            assert source.info['duration'] == pytest.approx(int(event['Duration']) / 1000 + BUFFER, abs=0.04)
+
+
+@requires_ffmpeg
+@pytest.mark.parametrize('batch', [50, 4])
+def test_single_pass_writes_the_clips_of_per_clip_runs(game, tmp_path, batch):
+    # copied single-pass clips start on the keyframe at or before the event, like aligned per-clip cuts
+    per_clip = split(game, tmp_path / "per_clip", keyframe_align=True)
+    single_pass = split(game, tmp_path / "single_pass", split_mode='single_pass', single_pass_batch=batch)
+
+    assert single_pass['split_mode'] == 'single_pass'
+    assert clip_packets(single_pass) == clip_packets(per_clip)
+
+
+@requires_ffmpeg
+@pytest.mark.parametrize('batch', [50, 4])
+def test_single_pass_reencodes_the_frames_of_per_clip_runs(game, tmp_path, batch):
+    config = {'reencode': True, 'video_filters': [], 'threads_per_job': 1}
+    per_clip = split(game, tmp_path / "per_clip", **config)
+    single_pass = split(game, tmp_path / "single_pass", split_mode='single_pass', single_pass_batch=batch, **config)
+    assert clip_packets(single_pass) == clip_packets(per_clip)
@@ -0,0 +1,63 @@
+"""Integer-microsecond concat timeline (utils/pf_timeline.py)."""
+
+from fractions import Fraction
+
+import pytest
+
+from conftest import make_clip, requires_ffmpeg
+from utils import pf_timeline
+from utils.pf_timeline import build_timeline, write_concat_list
+
+
+def fake_scans(monkeypatch, frames_per_clip, time_base=Fraction(1, 90000), frame_ticks=3003):
+    # clips of 29.97 fps frames in a 90 kHz time base, as from a camera
+    scans = {f"clip_{index}.mp4": {'time_base': time_base, 'start_pts': 1000, 'nb_packets': frames,
+                                   'end_pts': 1000 + frames * frame_ticks}
+             for index, frames in enumerate(frames_per_clip)}
+    monkeypatch.setattr(pf_timeline, 'scan_packets', lambda path: scans[path])
+    return list(scans)
+
+
+def test_clip_offsets_are_exact_integer_sums(monkeypatch):
+    files = fake_scans(monkeypatch, [451, 300, 1, 899] * 250)
+    timeline = build_timeline(files)
+
+    start_us = 0
+    for entry in timeline:
+        assert isinstance(entry['start_us'], int) and isinstance(entry['duration_us'], int)
+        assert entry['start_us'] == start_us
+        assert entry['start_ms'] == (start_us + 500) // 1000
+        start_us += entry['duration_us']
+    # every clip is rounded once to whole microseconds; the sum never drifts further
+    exact_us = Fraction(sum(entry['nb_packets'] for entry in timeline) * 3003 * 10 ** 6, 90000)
+    assert abs(start_us - exact_us) <= len(timeline) * Fraction(1, 2)
+
+
+def test_clip_durations_round_to_the_nearest_microsecond(monkeypatch):
+    # 1 frame = 33366.67 us, 3 frames = exactly 100100 us
+    files = fake_scans(monkeypatch, [1, 3])
+    assert [entry['duration_us'] for entry in build_timeline(files)] == [33367, 100100]
+    assert [entry['name'] for entry in build_timeline(files)] == ["play 1", "play 2"]
+
+
+def test_concat_list_uses_the_timeline_durations(monkeypatch, tmp_path):
+    files = fake_scans(monkeypatch, [30, 3])
+    list_path = tmp_path / "list.txt"
+    write_concat_list(build_timeline(files), str(list_path))
+    assert list_path.read_text().splitlines() == [
+        "file 'clip_0.mp4'", "duration 1.001000",
+        "file 'clip_1.mp4'", "duration 0.100100",
+    ]
+
+
+@requires_ffmpeg
+def test_timeline_of_real_clips(tmp_path):
+    files = [make_clip(tmp_path / f"Play_{index:03d}.mp4", duration=duration)
+             for index, duration in enumerate((1.0, 0.5, 2.0), start=1)]
+    timeline = build_timeline(files)
+
+    for entry in timeline:
+        # 30000/1001 fps: every frame lasts 1001/30 ms
+        assert entry['duration_us'] == round(entry['nb_packets'] * Fraction(1001 * 10 ** 6, 30000))
+    assert [entry['nb_packets'] for entry in timeline] == [30, 15, 60]
+    assert timeline[-1]['start_us'] + timeline[-1]['duration_us'] == pytest.approx(3.5035e6, abs=1)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+"""
+Camera-angle classification of detected scenes.
+
+Instead of rotating "Score Board" / "All 22" / "Endzone" through the scene
+list (where one missed cut mislabels every following play), every scene is
+labelled from its own content. A few frames per scene are decoded as small
+thumbnails (through utils/pf_media.py: with PyAV, every worker keeps the
+video open and walks through its share of the scenes; otherwise one FFmpeg
+process per scene, seeking each frame, many scenes in parallel), reduced to cheap features (colour histogram, edge density,
+field-green ratio, brightness) and assigned to the nearest class centroid.
+
+The centroids can be trained on any labelled scenes, and saved to and loaded
+from JSON. When no model exists, the scenes of the plays found by the play
+pattern matcher make a good training set for the rest of the same game.
+"""
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.pf_media import MediaSource, resolve_backend
+from utils.pf_scene_patterns import PLAY_PATTERNS, find_play_groups
+
+logger = logging.getLogger('pf_angle_classifier')
+
+THUMBNAIL_SIZE = (64, 36)
+HISTOGRAM_BINS = 8
+FEATURE_NAMES = ([f"hist_{channel}{index}" for channel in "rgb" for index in range(HISTOGRAM_BINS)] +
+                 ['edge_density', 'green_ratio', 'brightness'])
+
+
+def scene_sample_times(scene, frames_per_scene: int = 3) -> List[float]:
+    """Return evenly spread sample times (seconds) inside a scene, away from its cuts."""
+    start = scene[0].frame_num
+    end = scene[1].frame_num
+    fps = float(scene[0].framerate)
+    positions = [start + (end - start) * (index + 1) / (frames_per_scene + 1) for index in range(frames_per_scene)]
+    return [int(position) / fps for position in positions]
+
+
+def read_thumbnails(video_path: str, times: Sequence[float], size: Tuple[int, int] = THUMBNAIL_SIZE,
+                    backend: Optional[str] = None) -> np.ndarray:
+    """
+    Decode one small RGB frame at each of the given times.
+
+    Returns:
+        ndarray: uint8 array of shape (frames, height, width, 3); fewer frames if
+                 a time lies past the end of the video.
+    """
+    with MediaSource(video_path, backend) as source:
+        return source.frames_at(times, size)
+
+
+def frame_features(frames: np.ndarray) -> np.ndarray:
+    """
+    Compute the feature vector of a scene from its thumbnails (see FEATURE_NAMES).
+
+    Args:
+        frames (ndarray): uint8 RGB thumbnails of shape (frames, height, width, 3).
+
+    Returns:
+        ndarray: float64 features averaged over the frames (zeros if there are no frames).
+    """
+    if not len(frames):
+        return np.zeros(len(FEATURE_NAMES))
+
+    pixels = frames.reshape(-1, 3).astype(np.float64)
+    histogram = [np.histogram(pixels[:, channel], bins=HISTOGRAM_BINS, range=(0, 256))[0] / len(pixels)
+                 for channel in range(3)]
+
+    gray = frames.astype(np.float64).mean(axis=3)
+    gradient_x = np.abs(np.diff(gray, axis=2))[:, :-1, :]
+    gradient_y = np.abs(np.diff(gray, axis=1))[:, :, :-1]
+    edge_density = np.mean((gradient_x + gradient_y) > 40)
+
+    red, green, blue = pixels[:, 0], pixels[:, 1], pixels[:, 2]
+    green_ratio = np.mean((green > 60) & (green > red * 1.1) & (green > blue * 1.1))
+
+    return np.concatenate(histogram + [[edge_density, green_ratio, gray.mean() / 255.0]])
+
+
+def extract_scene_features(video_path: str, scene_list, frames_per_scene: int = 3,
+                           size: Tuple[int, int] = THUMBNAIL_SIZE, workers: int = 8,
+                           backend: Optional[str] = None) -> np.ndarray:
+    """
+    Compute the features of every scene of a scene list, many scenes at a time.
+
+    Args:
+        backend (str, optional): Media backend of utils/pf_media.py (default: PyAV if installed).
+
+    Returns:
+        ndarray: Features of shape (scenes, len(FEATURE_NAMES)).
+    """
+    if not scene_list:
+        return np.zeros((0, len(FEATURE_NAMES)))
+
+    if resolve_backend(backend) == 'ffmpeg':
+        # one FFmpeg run per scene
+        source = MediaSource(video_path, 'ffmpeg')
+
+        def scene_features(scene):
+            return frame_features(source.frames_at(scene_sample_times(scene, frames_per_scene), size))
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return np.array(list(executor.map(scene_features, scene_list)))
+
+    # every worker opens the video once and reads a consecutive run of scenes,
+    # so nearby sample times are reached by decoding on instead of seeking
+    chunk_size = -(-len(scene_list) // max(1, workers))
+    chunks = [scene_list[index:index + chunk_size] for index in range(0, len(scene_list), chunk_size)]
+
+    def chunk_features(chunk):
+        with MediaSource(video_path, backend) as chunk_source:
+            return [frame_features(chunk_source.frames_at(scene_sample_times(scene, frames_per_scene), size))
+                    for scene in chunk]
+
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        return np.array([features for chunk in executor.map(chunk_features, chunks) for features in chunk])
+
+
+class AngleClassifier:
+    """
+    Nearest-centroid classifier on standardized scene features.
+
+    Attributes:
+        labels (list): Class names (camera angles).
+        centroids (ndarray): Mean standardized feature vector per class.
+        mean (ndarray), scale (ndarray): Feature standardization.
+    """
+
+    def __init__(self, labels: Optional[List[str]] = None, centroids: Optional[np.ndarray] = None,
+                 mean: Optional[np.ndarray] = None, scale: Optional[np.ndarray] = None):
+        self.labels = labels or []
+        self.centroids = centroids
+        self.mean = mean
+        self.scale = scale
+
+    def fit(self, features: np.ndarray, labels: Sequence[str]) -> 'AngleClassifier':
+        """Compute the class centroids from labelled scene features."""
+        features = np.asarray(features, dtype=np.float64)
+        labels = np.asarray(labels)
+        self.mean = features.mean(axis=0)
+        # constant features (e.g. an empty histogram bin) must not divide by zero
+        self.scale = np.where(features.std(axis=0) > 1e-9, features.std(axis=0), 1.0)
+        standardized = (features - self.mean) / self.scale
+
+        self.labels = sorted(set(labels.tolist()))
+        self.centroids = np.array([standardized[labels == label].mean(axis=0) for label in self.labels])
+        return self
+
+    def predict(self, features: np.ndarray) -> List[str]:
+        """Return the label of the nearest centroid for every feature vector."""
+        if self.centroids is None:
+            raise ValueError("The classifier has not been fitted")
+        standardized = (np.asarray(features, dtype=np.float64) - self.mean) / self.scale
+        distances = ((standardized[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        return [self.labels[index] for index in distances.argmin(axis=1)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'features': FEATURE_NAMES,
+            'labels': self.labels,
+            'centroids': self.centroids.tolist(),
+            'mean': self.mean.tolist(),
+            'scale': self.scale.tolist(),
+        }
+
+    def save(self, path: str) -> None:
+        """Write the model to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> 'AngleClassifier':
+        """
+        Read a model written by save().
+
+        Raises:
+            ValueError: If the model was trained on other features.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('features') != FEATURE_NAMES:
+            raise ValueError(f"{path} was trained on different features")
+        return cls(data['labels'], np.array(data['centroids']), np.array(data['mean']), np.array(data['scale']))
+
+
+def fit_from_play_groups(scene_list, features: np.ndarray, pattern='scoreboard') -> Optional[AngleClassifier]:
+    """
+    Train a classifier on the scenes of the plays that match a play pattern.
+
+    Args:
+        scene_list (list): PySceneDetect scene list.
+        features (ndarray): Features of every scene (see extract_scene_features).
+        pattern (str or dict): Play pattern (see PLAY_PATTERNS).
+
+    Returns:
+        AngleClassifier or None: None if no play matched the pattern.
+    """
+    if isinstance(pattern, str):
+        pattern = PLAY_PATTERNS[pattern]
+    index_of = {id(scene): index for index, scene in enumerate(scene_list)}
+
+    indices = []
+    labels = []
+    for group in find_play_groups(scene_list, pattern):
+        for angle, scene in zip(pattern['angles'], group):
+            indices.append(index_of[id(scene)])
+            labels.append(angle)
+
+    if not indices:
+        return None
+    return AngleClassifier().fit(features[indices], labels)
+
+
+def classify_scenes(video_path: str, scene_list, classifier: Optional[AngleClassifier] = None,
+                    pattern='scoreboard', workers: int = 8) -> Optional[List[str]]:
+    """
+    Label every scene with its camera angle.
+
+    Args:
+        video_path (str): Path to the video file.
+        scene_list (list): PySceneDetect scene list.
+        classifier (AngleClassifier, optional): Trained model; if omitted, one is
+            trained on the plays of this game that match the pattern.
+        pattern (str or dict): Play pattern used for training without a model.
+        workers (int): Number of scenes decoded at the same time.
+
+    Returns:
+        list or None: One angle label per scene, or None if no model could be trained.
+    """
+    features = extract_scene_features(video_path, scene_list, workers=workers)
+    if classifier is None:
+        classifier = fit_from_play_groups(scene_list, features, pattern)
+        if classifier is None:
+            logger.warning("No play matched the pattern, cannot train the angle classifier")
+            return None
+    return classifier.predict(features)
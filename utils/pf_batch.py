@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+"""
+Batch runner for processing many games unattended.
+
+A batch manifest is a JSON file with a list of jobs, one CLI command each:
+
+    {
+        "defaults": {"split": {"workers": 2, "reencode": false}},
+        "jobs": [
+            {"command": "scenes", "video": "Game1/Game1.mp4", "proxy": true},
+            {"command": "split", "video": "Game1/Game1.mp4", "csv": "Game1/Game1.csv"},
+            {"command": "split-angles", "csv": "Game3/Game3.csv",
+             "videos": {"All 22": "Game3/All22.mp4", "Endzone": "Game3/Endzone.mp4"}, "sync": {"Endzone": -1.5}},
+            {"command": "concat", "folder": "Game2/Clips", "output": "Game2/Game2.mp4"}
+        ]
+    }
+
+The keys of a job are the long options of its CLI subcommand (with "_"
+instead of "-"); "defaults" holds options per command. Relative paths are
+resolved against the folder of the manifest.
+
+Jobs run concurrently under a global budget of CPU cores and I/O slots. Each
+job takes its cost (see JOB_COSTS, or "cpu" / "io" in the job) from both
+budgets at once before it starts, so a busy disk or a full CPU holds back
+new jobs instead of overloading the machine. A failed job is logged and
+recorded in the report; the remaining jobs keep running.
+
+With a ProgressReporter (utils/pf_progress.py), every job gets it bound to its
+name as the "progress" option, and the wall time of each job is reported as
+its 'job' stage.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.pf_progress import ProgressReporter
+
+logger = logging.getLogger('pf_batch')
+
+# (cpu cores, io slots) of one job per command; a job's "workers" option raises its CPU cost
+JOB_COSTS = {
+    'split': (1, 1),     # stream copy, mostly reading and writing
+    'split-angles': (1, 1),
+    'dartclip': (1, 0),  # small XML files only
+    'concat': (1, 1),
+    'scenes': (1, 1),
+    'detect-split': (1, 1),
+    'frames': (1, 1),
+}
+
+# job keys that hold paths (resolved against the manifest folder)
+PATH_KEYS = ('video', 'csv', 'folder', 'clips_folder', 'output', 'angle_model', 'inputs', 'videos')
+
+
+class ResourceBudget:
+    """
+    CPU cores and I/O slots shared by all jobs of a batch.
+
+    Both are taken in one step, so jobs waiting for one resource never hold the other.
+    """
+
+    def __init__(self, cpu: int, io: int):
+        self.cpu = max(1, int(cpu))
+        self.io = max(1, int(io))
+        self._free_cpu = self.cpu
+        self._free_io = self.io
+        self._condition = threading.Condition()
+
+    def acquire(self, cpu: int, io: int) -> Tuple[int, int]:
+        """Block until the cost is free and take it; returns the (clamped) cost taken."""
+        # a job larger than the whole budget runs alone instead of never
+        cpu = min(max(0, int(cpu)), self.cpu)
+        io = min(max(0, int(io)), self.io)
+        with self._condition:
+            self._condition.wait_for(lambda: self._free_cpu >= cpu and self._free_io >= io)
+            self._free_cpu -= cpu
+            self._free_io -= io
+        return cpu, io
+
+    def release(self, cpu: int, io: int) -> None:
+        with self._condition:
+            self._free_cpu += cpu
+            self._free_io += io
+            self._condition.notify_all()
+
+
+def load_batch_manifest(manifest_path: str) -> List[Dict[str, Any]]:
+    """
+    Read the jobs of a batch manifest.
+
+    Returns:
+        list: One option dictionary per job (with "command"), defaults applied
+              and paths made absolute.
+
+    Raises:
+        ValueError: If a job has no command.
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    # a bare list of jobs is accepted as well
+    if isinstance(data, list):
+        data = {'jobs': data}
+    defaults = data.get('defaults', {})
+    base_folder = os.path.dirname(os.path.abspath(manifest_path))
+
+    jobs = []
+    for index, entry in enumerate(data.get('jobs', []), start=1):
+        command = entry.get('command')
+        if not command:
+            raise ValueError(f"Job {index} of {manifest_path} has no command")
+        job = dict(defaults.get(command, {}), **entry)
+        for key in PATH_KEYS:
+            if isinstance(job.get(key), str):
+                job[key] = os.path.join(base_folder, os.path.expanduser(job[key]))
+            elif isinstance(job.get(key), list):
+                job[key] = [os.path.join(base_folder, os.path.expanduser(path)) for path in job[key]]
+            elif isinstance(job.get(key), dict):
+                # videos of split-angles: angle name -> path
+                job[key] = {name: os.path.join(base_folder, os.path.expanduser(path)) for name, path in job[key].items()}
+        jobs.append(job)
+    return jobs
+
+
+def job_cost(job: Dict[str, Any], cpu_budget: int) -> Tuple[int, int]:
+    """Return the (cpu, io) cost of a job."""
+    default_cpu, default_io = JOB_COSTS.get(job['command'], (1, 1))
+    if job.get('reencode'):
+        # the encodes of a re-encoding job share its core budget (all cores by default)
+        cpu = job.get('core_budget') or cpu_budget
+    elif job.get('core_budget'):
+        # a concat job only re-encodes incompatible clips, within its core budget
+        cpu = job['core_budget']
+    else:
+        # workers = 0 / None means one per core, i.e. the whole budget
+        workers = job.get('workers', 1)
+        cpu = max(default_cpu, workers if workers else cpu_budget)
+    return job.get('cpu', cpu), job.get('io', default_io)
+
+
+def job_name(job: Dict[str, Any]) -> str:
+    """Short name of a job for logs and reports."""
+    target = job.get('video') or job.get('folder') or job.get('clips_folder') or job.get('inputs') or job.get('csv') or ''
+    if isinstance(target, list):
+        target = target[0] if len(target) == 1 else f"{len(target)} inputs"
+    return f"{job['command']} {os.path.basename(os.path.normpath(target)) if target else ''}".strip()
+
+
+def run_batch(jobs: List[Dict[str, Any]], runner: Callable[[Dict[str, Any]], Any],
+              cpu_budget: Optional[int] = None, io_budget: int = 2,
+              report_path: Optional[str] = None,
+              progress: Optional[ProgressReporter] = None) -> List[Dict[str, Any]]:
+    """
+    Run batch jobs concurrently under a CPU and I/O budget.
+
+    Args:
+        jobs (list): Job dictionaries (see load_batch_manifest).
+        runner (callable): Runs one job; an exception marks the job as failed.
+        cpu_budget (int, optional): CPU cores shared by all jobs (default: all cores).
+        io_budget (int): Jobs that may read or write large files at the same time.
+        report_path (str, optional): JSON file for the results, rewritten after every job.
+        progress (ProgressReporter, optional): Bound to each job and passed to the runner
+                                               in the job's "progress" option.
+
+    Returns:
+        list: One dict per job in manifest order with the keys index, name,
+              command, status ('done' or 'failed'), wall_time (seconds), error
+              and stage_times (seconds per stage of the job, with a progress reporter).
+    """
+    budget = ResourceBudget(cpu_budget or os.cpu_count() or 1, io_budget)
+    results = [{'index': index, 'name': job_name(job), 'command': job['command'], 'status': 'pending',
+                'wall_time': 0.0, 'error': None} for index, job in enumerate(jobs, start=1)]
+    report_lock = threading.Lock()
+
+    def write_report():
+        if not report_path:
+            return
+        with report_lock:
+            tmp_path = report_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            os.replace(tmp_path, report_path)
+
+    def run_job(index):
+        job = jobs[index]
+        result = results[index]
+        cpu, io = budget.acquire(*job_cost(job, budget.cpu))
+        # the records of the job go to the shared sinks, under the name of the job
+        job_progress = progress.bind(result['name']) if progress is not None else None
+        logger.info(f"Starting {result['name']} ({cpu} cpu, {io} io)")
+        start = time.perf_counter()
+        try:
+            if job_progress is not None:
+                with job_progress.stage('job', command=job['command']):
+                    runner(dict(job, progress=job_progress))
+            else:
+                runner(job)
+            result['status'] = 'done'
+        except Exception as e:
+            logger.error(f"{result['name']} failed: {e}")
+            result['status'] = 'failed'
+            result['error'] = str(e)
+        finally:
+            budget.release(cpu, io)
+        if job_progress is not None:
+            result['stage_times'] = job_progress.stage_times()
+        result['wall_time'] = round(time.perf_counter() - start, 3)
+        logger.info(f"Finished {result['name']}: {result['status']} in {result['wall_time']:.1f}s")
+        write_report()
+
+    # at most one running job per core, further jobs wait in order
+    with ThreadPoolExecutor(max_workers=max(1, min(len(jobs), budget.cpu))) as executor:
+        list(executor.map(run_job, range(len(jobs))))
+
+    write_report()
+    return results
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+"""
+Concatenation planning for clips from different cameras or encoders.
+
+The concat demuxer can only stream-copy clips whose video streams are
+interchangeable. This module probes every clip and decides, per clip, the
+cheapest way to make it fit:
+
+- copy: all clips share the stream parameters and the codec extradata
+  (SPS/PPS), so they are concatenated directly, as before
+- remux: the stream parameters match the target but the extradata differs
+  (e.g. another encoder setting); the clip is rewritten to MPEG-TS with the
+  parameter sets in-band, without re-encoding
+- encode: resolution, frame rate, pixel format, codec or profile differ; only
+  these clips are re-encoded to the target parameters
+
+The target is the parameter set that covers the most playing time, so the
+least video is transcoded. When any clip needs more than a copy, all clips
+are written as MPEG-TS parts (like the smart cut of the splitter) and the
+parts are joined with a stream-copy concat.
+"""
+
+import os
+import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.pf_encoding import encoder_args, get_profile
+from utils.pf_probe import probe_videos
+from utils.pf_progress import ProgressReporter, run_ffmpeg
+from utils.pf_scheduler import encode_cost, plan_encodes
+
+logger = logging.getLogger('pf_concat')
+
+# stream parameters that must match for a stream-copy concat
+COMPAT_KEYS = ('codec', 'profile', 'width', 'height', 'pix_fmt', 'sample_aspect_ratio', 'fps')
+
+# bitstream filters that put the parameter sets in-band (MPEG-TS parts)
+ANNEXB_FILTERS = {'h264': 'h264_mp4toannexb', 'hevc': 'hevc_mp4toannexb'}
+
+# encoders and profile names for re-encoding outliers to the target codec; folders of
+# other codecs (e.g. MPEG-4 Part 2 or VP9) are re-encoded to H.264 as a whole
+ENCODERS = {'h264': 'libx264', 'hevc': 'libx265'}
+FALLBACK_CODEC = 'h264'
+X264_PROFILES = {'Constrained Baseline': 'baseline', 'Baseline': 'baseline', 'Main': 'main',
+                 'High': 'high', 'High 10': 'high10', 'High 4:2:2': 'high422', 'High 4:4:4 Predictive': 'high444'}
+
+# frame rates of cameras and broadcasts; probed average rates of short clips are snapped to them
+STANDARD_RATES = (23.976, 24, 25, 29.97, 30, 48, 50, 59.94, 60, 100, 119.88, 120)
+
+# quality of re-encoded outliers (visually lossless next to the copied clips)
+NORMALIZE_PROFILE = {'base': 'review-fast', 'name': 'concat-normalize', 'crf': 18, 'audio': None}
+
+
+def nominal_fps(fps: Optional[float]) -> Optional[float]:
+    """
+    Frame rate of a clip for the compatibility check.
+
+    The average rate of a short stream-copied clip is often a little off
+    (59.999 for a 60 fps source), so rates within 0.1% of a standard rate count as that rate.
+    """
+    if not fps:
+        return None
+    standard = min(STANDARD_RATES, key=lambda rate: abs(rate - fps))
+    return float(standard) if abs(standard - fps) <= standard * 0.001 else round(fps, 3)
+
+
+def stream_signature(info: Dict[str, Any]) -> Tuple:
+    """Return the stream parameters of a probed clip that decide concat compatibility."""
+    fps = nominal_fps(info.get('fps'))
+    sar = info.get('sample_aspect_ratio')
+    if sar in (None, '0:1', 'N/A'):
+        sar = '1:1'
+    values = dict(info, fps=fps, sample_aspect_ratio=sar)
+    return tuple(values.get(key) for key in COMPAT_KEYS)
+
+
+def probe_extradata(video_path: str) -> Optional[str]:
+    """Return a hash of the codec extradata (parameter sets) of the video stream."""
+    cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_data_hash', 'MD5',
+           '-show_entries', 'stream=extradata_hash', '-of', 'csv=p=0', video_path]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def plan_concat(file_list: List[str], workers: int = 8) -> Dict[str, Any]:
+    """
+    Decide how every clip is brought into the concatenation.
+
+    Args:
+        file_list (list): Clip paths in concatenation order.
+        workers (int): Number of clips probed concurrently.
+
+    Returns:
+        dict: mode ('copy' if all clips can be copied directly, otherwise 'parts'),
+              target (dict of COMPAT_KEYS and frame_rate, the probed rational rate of the
+              target clips) and clips (one dict per clip with file,
+              action ('copy', 'remux' or 'encode'), duration and the differing keys).
+
+    Raises:
+        ValueError: If a clip cannot be probed.
+    """
+    infos = probe_videos(file_list, workers=workers)
+    for file, info in zip(file_list, infos):
+        if info is None:
+            raise ValueError(f"Cannot probe {file}")
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        extradata = list(executor.map(probe_extradata, file_list))
+
+    # the parameter set with the most playing time is kept as is
+    signatures = [stream_signature(info) for info in infos]
+    playing_time = {}
+    for signature, info in zip(signatures, infos):
+        playing_time[signature] = playing_time.get(signature, 0.0) + (info['duration'] or 0.0)
+    target = max(playing_time, key=playing_time.get)
+
+    # clips are copied as is when they also carry the parameter sets of the first target clip
+    target_index = signatures.index(target)
+    target_extradata = extradata[target_index]
+    remuxable = target[0] in ANNEXB_FILTERS
+
+    clips = []
+    for file, info, signature, data in zip(file_list, infos, signatures, extradata):
+        differences = [key for key, value, wanted in zip(COMPAT_KEYS, signature, target) if value != wanted]
+        if differences:
+            action = 'encode'
+        elif data == target_extradata:
+            action = 'copy'
+        else:
+            action = 'remux' if remuxable else 'encode'
+            differences = ['extradata']
+        clips.append({'file': file, 'action': action, 'duration': info['duration'] or 0.0,
+                      'differences': differences, 'info': info})
+
+    mode = 'copy' if all(clip['action'] == 'copy' for clip in clips) else 'parts'
+    target = dict(zip(COMPAT_KEYS, target), frame_rate=infos[target_index].get('frame_rate'))
+    if mode == 'parts' and (target['codec'] not in ENCODERS or target['codec'] not in ANNEXB_FILTERS):
+        # no parts can be copied or re-encoded in this codec: re-encode every clip to H.264
+        logger.info(f"Cannot join {target['codec']} parts, re-encoding all clips to {FALLBACK_CODEC}")
+        for clip in clips:
+            if clip['action'] != 'encode':
+                clip['action'] = 'encode'
+                clip['differences'] = ['codec']
+        target.update(codec=FALLBACK_CODEC, profile=None)
+    return {'mode': mode, 'target': target, 'clips': clips}
+
+
+def normalize_args(target: Dict[str, Any], threads: Optional[int] = None) -> List[str]:
+    """FFmpeg output options that re-encode a clip to the target stream parameters."""
+    width, height = target['width'], target['height']
+    filters = [
+        # fit into the target frame without distortion, pad the rest
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease",
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2",
+        f"setsar={target['sample_aspect_ratio'].replace(':', '/')}",
+    ]
+    # the exact rate of the target clips (fps=59.94 would be read as 2997/50, not 60000/1001)
+    if target.get('frame_rate') and target['frame_rate'] != '0/0':
+        filters.append(f"fps={target['frame_rate']}")
+    elif target['fps']:
+        filters.append(f"fps={target['fps']}")
+    if target['pix_fmt']:
+        filters.append(f"format={target['pix_fmt']}")
+
+    codec = ENCODERS.get(target['codec'])
+    if codec is None:
+        raise ValueError(f"Cannot re-encode to {target['codec']}")
+    args = encoder_args(NORMALIZE_PROFILE, filters, threads, codec)
+    if codec == 'libx264' and target['profile'] in X264_PROFILES:
+        args += ['-profile:v', X264_PROFILES[target['profile']]]
+    return args
+
+
+def write_part(clip: Dict[str, Any], target: Dict[str, Any], part_path: str, threads: Optional[int] = None,
+               progress: Optional[ProgressReporter] = None) -> None:
+    """
+    Write one clip as an MPEG-TS part of the concatenation (remuxed or re-encoded).
+
+    With an active progress reporter, the FFmpeg progress of re-encodes is reported.
+
+    Raises:
+        subprocess.CalledProcessError: If FFmpeg fails.
+    """
+    cmd = ['ffmpeg', '-y', '-v', 'error', '-hide_banner']
+    if clip['action'] == 'encode':
+        if threads:
+            cmd += ['-threads', str(threads)]
+        cmd += ['-i', clip['file'], '-map', '0:v:0'] + normalize_args(target, threads)
+    else:
+        cmd += ['-i', clip['file'], '-map', '0:v:0', '-c:v', 'copy', '-bsf:v', ANNEXB_FILTERS[target['codec']]]
+    cmd += ['-f', 'mpegts', part_path]
+    if clip['action'] == 'encode' and progress is not None and progress.active:
+        returncode, stderr = run_ffmpeg(cmd, clip['duration'], progress, stage='normalize',
+                                        file=os.path.basename(clip['file']))
+        if returncode:
+            raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
+    else:
+        subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL, capture_output=True)
+
+
+def prepare_parts(plan: Dict[str, Any], parts_folder: str, core_budget: Optional[int] = None,
+                  progress: Optional[ProgressReporter] = None) -> List[str]:
+    """
+    Write the MPEG-TS parts of a 'parts' plan.
+
+    Remuxes are I/O bound and run side by side; the re-encodes share the core
+    budget as planned by utils/pf_scheduler.py.
+
+    Args:
+        plan (dict): Plan from plan_concat.
+        parts_folder (str): Folder for the parts.
+        core_budget (int, optional): Cores for the re-encodes (default: all).
+        progress (ProgressReporter, optional): Receives the progress of the re-encodes.
+
+    Returns:
+        list: Part paths in concatenation order.
+    """
+    target = plan['target']
+    clips = plan['clips']
+    part_paths = [os.path.join(parts_folder, f"part_{index:04d}.ts") for index in range(1, len(clips) + 1)]
+
+    encodes = [index for index, clip in enumerate(clips) if clip['action'] == 'encode']
+    remuxes = [index for index, clip in enumerate(clips) if clip['action'] != 'encode']
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda index: write_part(clips[index], target, part_paths[index]), remuxes))
+
+    if encodes:
+        cost = encode_cost(get_profile(NORMALIZE_PROFILE)['cost'], target)
+        schedule = plan_encodes([clips[index]['duration'] for index in encodes], core_budget, cost)
+        logger.info(f"Re-encoding {len(encodes)} of {len(clips)} clips "
+                    f"({schedule['jobs']} jobs x {schedule['threads']} threads)")
+        with ThreadPoolExecutor(max_workers=schedule['jobs']) as executor:
+            list(executor.map(lambda index: write_part(clips[index], target, part_paths[index],
+                                                       schedule['threads'], progress), encodes))
+    return part_paths
+
+
+def print_concat_plan(plan: Dict[str, Any]) -> None:
+    """Print the target parameters and every clip that is not copied directly."""
+    target = plan['target']
+    print(f"Target: {target['codec']} {target['profile']} {target['width']}x{target['height']} "
+          f"{target['pix_fmt']} @ {target['fps']} fps")
+    for clip in plan['clips']:
+        if clip['action'] != 'copy':
+            print(f"  {clip['action']:<6s} {os.path.basename(clip['file'])} ({', '.join(clip['differences'])})")
+    encoded = sum(clip['duration'] for clip in plan['clips'] if clip['action'] == 'encode')
+    total = sum(clip['duration'] for clip in plan['clips'])
+    print(f"Re-encoding {encoded:.1f}s of {total:.1f}s")
@@ -4,9 +4,12 @@
 import csv
 import os
 import xml.etree.ElementTree as ET
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 # own functions
 from utils.pf_helpers import select_file
+from utils.pf_events import get_field
 
 def create_dartclip(event, output_name):
     """
@@ -40,19 +43,9 @@ def create_dartclip(event, output_name):
     library_item.set("OUT", event['Duration'] + "0000")
     library_item.set("UNIT", "RefTime")
 
-    # Case-insensitive column lookup helper function
+    # Case-insensitive column lookup helper function (columns of an Event are resolved once)
     def get_column_value(column_name):
-        # First try exact match
-        if column_name in event:
-            return event[column_name]
-        
-        # Try case-insensitive match
-        for key in event:
-            if key.lower() == column_name.lower():
-                return event[key]
-        
-        # Return a default value if not found
-        return "N/A"
+        return get_field(event, column_name, "N/A")
 
     # Add CATEGORIES to the nested LIBRARY_ITEM
     categories = ET.SubElement(library_item, "CATEGORIES")
@@ -87,6 +80,149 @@ def create_dartclip(event, output_name):
     tree.write(output_path)
 
 
+# --------------------------- #
+# Batch writer
+#
+# Renders the exact bytes ElementTree writes for create_dartclip from a
+# precompiled template, without building a tree per play. The output is
+# byte-identical to create_dartclip (same element order, escaping, short
+# empty elements and us-ascii character references).
+
+# Standard categories, written first and in this order
+CATEGORY_NAMES = ["Down", "ODK", "Play Type", "DIST", "RESULT"]
+
+DARTCLIP_HEAD = ('<LIBRARY_ITEM><NAME>{name}</NAME><ID>0</ID><VERSION subversion="1">2.0</VERSION>'
+                 '<LIBRARY_ITEM Color="Color2" IN="0" ItemType="Marker.Event" OUT="{out}" UNIT="RefTime">')
+DARTCLIP_TAIL = ('</LIBRARY_ITEM><Library.MDProperties>{title}</Library.MDProperties>'
+                 '<LIBRARY_ITEM ItemType="GameTime"><ID>0</ID></LIBRARY_ITEM><TYPE>1</TYPE></LIBRARY_ITEM>')
+
+
+def _escape_text(text):
+    # same rules as ElementTree for character data
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def _escape_attrib(text):
+    # same rules as ElementTree for attribute values
+    text = _escape_text(text)
+    if "\"" in text:
+        text = text.replace("\"", "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return text
+
+
+def _element(start_tag, end_tag, text):
+    # ElementTree writes elements without text as <tag ... />
+    if not text:
+        return start_tag + " />"
+    return start_tag + ">" + _escape_text(text) + end_tag
+
+
+@lru_cache(maxsize=64)
+def _category_plan(keys):
+    """
+    Work out once per header which columns become categories.
+
+    Returns the (category, column) pairs of the standard categories found in the
+    header (exact match first, then case-insensitive) and the extra columns.
+    """
+    standard = []
+    for category in CATEGORY_NAMES:
+        if category in keys:
+            standard.append((category, category))
+            continue
+        for key in keys:
+            if key.lower() == category.lower():
+                standard.append((category, key))
+                break
+
+    # Skip Position and Duration as they are used for timing
+    extras = [key for key in keys
+              if key.lower() not in ['position', 'duration', 'name'] and key not in CATEGORY_NAMES]
+    return standard, extras
+
+
+def render_dartclip(event, file_name):
+    """
+    Render the .dartclip XML of an event as a string.
+
+    Args:
+        event (dict): Dictionary containing event metadata (or an Event)
+        file_name (str): Clip name without folder and extension (e.g. "Play_001")
+
+    Returns:
+        str: The XML, identical to what create_dartclip writes
+    """
+    standard, extras = _category_plan(tuple(event))
+
+    categories = []
+    for category, key in standard:
+        value = event[key]
+        if value != "N/A":  # Only add if we found a value
+            categories.append(_element('<CATEGORY name="' + _escape_attrib(category) + '"', "</CATEGORY>", value))
+    for key in extras:
+        categories.append(_element('<CATEGORY name="' + _escape_attrib(key) + '"', "</CATEGORY>", event[key]))
+
+    return (DARTCLIP_HEAD.format(name=_escape_text(file_name + '.mp4'),
+                                 out=_escape_attrib(event['Duration'] + "0000")) +
+            ("<CATEGORIES>" + "".join(categories) + "</CATEGORIES>" if categories else "<CATEGORIES />") +
+            DARTCLIP_TAIL.format(title=_element('<Property Name="Title"', "</Property>", file_name)))
+
+
+def write_dartclip(event, output_name):
+    """
+    Template-based replacement for create_dartclip (same arguments, same file).
+
+    Args:
+        event (dict): Dictionary containing event metadata (or an Event)
+        output_name (str): Base name for the output file (without extension)
+    """
+    file_name = os.path.splitext(os.path.basename(output_name))[0]
+    xml_text = render_dartclip(event, file_name)
+
+    # same encoding and newline handling as ElementTree.write
+    with open(output_name + ".dartclip", "w", encoding="us-ascii", errors="xmlcharrefreplace") as f:
+        f.write(xml_text)
+
+
+def create_dartclips(items, workers=1):
+    """
+    Write the .dartclip files for a whole collection of events in one go.
+
+    Args:
+        items (iterable): (event, output_name) pairs, output_name without extension
+        workers (int): Number of threads writing files (1 = write serially)
+
+    Returns:
+        list: One entry per item, in order: None if the file was written,
+              otherwise the error message
+    """
+    def write_item(item):
+        try:
+            write_dartclip(*item)
+            return None
+        except Exception as e:
+            return str(e)
+
+    items = list(items)
+    if workers is None or workers <= 1 or len(items) < 2:
+        return [write_item(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(write_item, items))
+
+
 def create_dartclip_v0(event, output_name):
     """
     Creates a single .dartclip file for the given event.
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""
+Named encoding profiles shared by the splitter and the recode scripts.
+
+Every re-encode goes through libx264 (and AAC / copy for audio), so a profile
+gives the same result on any machine with a standard FFmpeg build. A
+profile is picked by name per job ("profile" in the splitter configuration,
+--profile on the command line), or given as a dictionary that overrides
+the settings of a base profile:
+
+    {'base': 'review-fast', 'crf': 20}
+
+The profiles trade encoding speed against quality and size; run
+benchmarks/bench_encoding_profiles.py to measure them on your own footage.
+"""
+
+from typing import Any, Dict, List, Optional, Union
+
+from utils.pf_scheduler import lookahead_threads, x265_frame_threads
+
+DEFAULT_PROFILE = 'archive'
+
+# Profile settings:
+# - preset / crf / tune: libx264 speed, quality (0 best - 51 worst) and tuning
+# - keyint / min_keyint (frames): GOP length; scenecut False = keyframes only every keyint frames
+# - filters: video filters, in order (cropping, scaling)
+# - fps: output frame rate (None = keep)
+# - audio: 'copy', 'aac' or None (no audio)
+# - extra_args: further output options, placed before the codec options
+# - cost: single-thread encoding seconds per second of 1080p30 source, measured with
+#   benchmarks/bench_encoding_profiles.py; used to plan concurrent encodes (pf_scheduler)
+ENCODING_PROFILES = {
+    'archive': {
+        'description': "High quality, cropped broadcast frame (the original re-encode settings)",
+        'preset': 'slow',
+        'crf': 18,
+        'tune': None,
+        'keyint': 15,
+        'min_keyint': None,
+        'scenecut': False,
+        'filters': ['crop=iw:ih-600'],  # Crop 300 from top and bottom
+        'fps': None,
+        'audio': 'copy',
+        'extra_args': ['-bsf:v', 'h264_mp4toannexb'],
+        'cost': 1.9,
+    },
+    'review-fast': {
+        'description': "Quick 720p copy for watching and sharing",
+        'preset': 'veryfast',
+        'crf': 23,
+        'tune': None,
+        'keyint': 60,
+        'min_keyint': None,
+        'scenecut': True,
+        'filters': ['scale=-2:720'],
+        'fps': None,
+        'audio': 'copy',
+        'extra_args': [],
+        'cost': 0.75,
+    },
+    'proxy': {
+        'description': "Small, fast to encode and decode; for analysis and previews",
+        'preset': 'ultrafast',
+        'crf': 28,
+        'tune': 'fastdecode',
+        'keyint': 30,
+        'min_keyint': None,
+        'scenecut': True,
+        'filters': ['scale=-2:360'],
+        'fps': 30,
+        'audio': None,
+        'extra_args': [],
+        'cost': 0.33,
+    },
+    'dartfish-scrub': {
+        'description': "Keyframe every 15 frames for frame-accurate scrubbing in Dartfish",
+        'preset': 'medium',
+        'crf': 18,
+        'tune': None,
+        'keyint': 15,
+        'min_keyint': 1,
+        'scenecut': False,
+        'filters': [],
+        'fps': None,
+        'audio': 'copy',
+        'extra_args': [],
+        'cost': 2.5,
+    },
+}
+
+
+def get_profile(profile: Union[str, Dict[str, Any], None] = None) -> Dict[str, Any]:
+    """
+    Resolve a profile name or an override dictionary into the full settings.
+
+    Raises:
+        ValueError: If the profile (or the base of an override) does not exist.
+    """
+    if profile is None:
+        profile = DEFAULT_PROFILE
+    if isinstance(profile, str):
+        if profile not in ENCODING_PROFILES:
+            raise ValueError(f"Unknown encoding profile '{profile}' (choose from {', '.join(ENCODING_PROFILES)})")
+        return dict(ENCODING_PROFILES[profile], name=profile)
+
+    settings = get_profile(profile.get('base', DEFAULT_PROFILE))
+    settings.update({key: value for key, value in profile.items() if key != 'base'})
+    settings['name'] = profile.get('name', f"{settings['name']}*")
+    return settings
+
+
+def x264_params(settings: Dict[str, Any], threads: Optional[int] = None) -> Optional[str]:
+    """Return the -x264-params value of a profile (None if nothing is set)."""
+    params = []
+    if threads:
+        params.append(f"threads={threads}:lookahead-threads={lookahead_threads(threads)}")
+    return _gop_params(settings, params)
+
+
+def x265_params(settings: Dict[str, Any], threads: Optional[int] = None) -> Optional[str]:
+    """Return the -x265-params value of a profile (None if nothing is set)."""
+    params = []
+    if threads:
+        # x265 sizes its work with a thread pool and frame threads instead of threads
+        params.append(f"pools={threads}:frame-threads={x265_frame_threads(threads)}")
+    return _gop_params(settings, params)
+
+
+def _gop_params(settings: Dict[str, Any], params: List[str]) -> Optional[str]:
+    # GOP options have the same names in x264 and x265
+    if settings.get('keyint'):
+        params.append(f"keyint={settings['keyint']}")
+    if settings.get('min_keyint'):
+        params.append(f"min-keyint={settings['min_keyint']}")
+    if settings.get('scenecut') is False:
+        params.append("scenecut=0")
+    return ":".join(params) or None
+
+
+def encoder_args(profile: Union[str, Dict[str, Any], None] = None,
+                 filters: Optional[List[str]] = None, threads: Optional[int] = None,
+                 codec: str = 'libx264') -> List[str]:
+    """
+    Build the FFmpeg output options of a profile.
+
+    Args:
+        profile (str or dict): Profile name or override dictionary (see get_profile).
+        filters (list, optional): Video filters that replace the ones of the profile
+                                  (e.g. a different crop for another broadcast).
+        threads (int, optional): Encoder threads (see utils/pf_scheduler.py); None lets
+                                 x264 use all cores.
+        codec (str): 'libx264', or 'libx265' (the profile settings are passed as -x265-params).
+
+    Returns:
+        list: FFmpeg output options (video filters, codec and audio settings).
+    """
+    settings = get_profile(profile)
+    filters = settings['filters'] if filters is None else filters
+
+    args = []
+    if filters:
+        args += ['-vf', ",".join(filters)]
+    if settings.get('fps'):
+        args += ['-r', str(settings['fps'])]
+    args += list(settings.get('extra_args') or [])
+    args += ['-preset', settings['preset'], '-crf', str(settings['crf'])]
+    if settings.get('tune'):
+        args += ['-tune', settings['tune']]
+    if codec == 'libx265':
+        params = x265_params(settings, threads)
+        if params:
+            args += ['-x265-params', params]
+    elif codec == 'libx264':
+        params = x264_params(settings, threads)
+        if params:
+            args += ['-x264-params', params]
+    else:
+        raise ValueError(f"Unsupported encoder: {codec}")
+    if threads:
+        args += ['-threads', str(threads)]
+    args += ['-vcodec', codec]
+
+    if settings.get('audio') == 'copy':
+        args += ['-acodec', 'copy']
+    elif settings.get('audio'):
+        args += ['-acodec', settings['audio']]
+    else:
+        args += ['-an']
+    return args
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+"""
+Typed event records for breakdown CSV exports (Hudl, Dartfish).
+
+The column names of a CSV file are resolved once, when its header is read,
+instead of scanning every row case-insensitively for every field. Position
+and Duration are parsed to integer milliseconds once per event. Events can be
+streamed from a file with iter_events, so large season-wide exports are never
+held in memory as a whole.
+
+An Event still behaves like the original row dictionary (read-only), so code
+that iterates over the columns or looks up a column by name keeps working.
+"""
+
+import os
+import csv
+import logging
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger('pf_events')
+
+# Columns every event file must have (matched case-insensitively)
+REQUIRED_COLUMNS = ['Position', 'Duration']
+
+
+def parse_milliseconds(value: Optional[str]) -> Optional[int]:
+    """
+    Parse a millisecond value from the CSV ("1500", "1500.0", " 1500 ").
+
+    Returns:
+        int or None: Whole milliseconds, or None if the value is empty or not a finite number.
+    """
+    if value is None:
+        return None
+    try:
+        return int(round(float(value)))
+    except (ValueError, OverflowError):
+        # "nan" raises ValueError, "inf" OverflowError
+        return None
+
+
+class EventColumns:
+    """
+    Column names of an event file, resolved once from its header.
+
+    Lookups follow the same rules as the old per-row helper: an exact match
+    wins, otherwise the first column whose name matches case-insensitively.
+    """
+
+    __slots__ = ('fieldnames', '_exact', '_lower', 'position', 'duration')
+
+    def __init__(self, fieldnames: Sequence[str]):
+        self.fieldnames = list(fieldnames)
+        self._exact = set(self.fieldnames)
+        self._lower = {}
+        for name in self.fieldnames:
+            self._lower.setdefault(name.lower(), name)
+        self.position = self.resolve('Position')
+        self.duration = self.resolve('Duration')
+
+    def resolve(self, column_name: str) -> Optional[str]:
+        """Return the actual header name for a column, or None if the file does not have it."""
+        if column_name in self._exact:
+            return column_name
+        return self._lower.get(column_name.lower())
+
+    def missing(self, required: Sequence[str] = REQUIRED_COLUMNS) -> List[str]:
+        """Return the required columns that are not in the header."""
+        return [column for column in required if self.resolve(column) is None]
+
+
+class Event(Mapping):
+    """
+    One event (play) of a breakdown file.
+
+    Attributes:
+        index (int): Zero-based position of the event in the file.
+        position (int or None): Start time in milliseconds (None if the value is not a number).
+        duration (int or None): Length in milliseconds (None if the value is not a number).
+        row (dict): The original CSV row.
+        columns (EventColumns): Resolved column names shared by all events of the file.
+    """
+
+    __slots__ = ('index', 'position', 'duration', 'row', 'columns')
+
+    def __init__(self, index: int, row: Dict[str, str], columns: EventColumns):
+        self.index = index
+        self.row = row
+        self.columns = columns
+        self.position = parse_milliseconds(row.get(columns.position)) if columns.position else None
+        self.duration = parse_milliseconds(row.get(columns.duration)) if columns.duration else None
+
+    @classmethod
+    def from_mapping(cls, index: int, row: Dict[str, str]) -> 'Event':
+        """Create an event from a plain row dictionary (columns resolved from its keys)."""
+        return cls(index, row, EventColumns([key for key in row if isinstance(key, str)]))
+
+    def field(self, column_name: str, default: Optional[str] = None) -> Optional[str]:
+        """Return the value of a column (case-insensitive), or default if the file does not have it."""
+        key = self.columns.resolve(column_name)
+        if key is None:
+            return default
+        return self.row.get(key, default)
+
+    def __getitem__(self, key):
+        return self.row[key]
+
+    def __iter__(self):
+        return iter(self.row)
+
+    def __len__(self):
+        return len(self.row)
+
+    def __repr__(self):
+        return f"Event(index={self.index}, position={self.position}, duration={self.duration})"
+
+
+def as_event(event, index: int) -> Event:
+    """Return event as an Event, converting a plain row dictionary if needed."""
+    if isinstance(event, Event):
+        return event
+    return Event.from_mapping(index, event)
+
+
+def get_field(event, column_name: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Case-insensitive column lookup that works for Events and plain row dictionaries.
+
+    Args:
+        event (Event or dict): The event.
+        column_name (str): Column to look up.
+        default: Value returned if the column does not exist.
+    """
+    if isinstance(event, Event):
+        return event.field(column_name, default)
+    if column_name in event:
+        return event[column_name]
+    column_lower = column_name.lower()
+    for key in event:
+        if isinstance(key, str) and key.lower() == column_lower:
+            return event[key]
+    return default
+
+
+def iter_events(csv_path: str, required: Sequence[str] = REQUIRED_COLUMNS) -> Iterator[Event]:
+    """
+    Stream the events of a CSV file one row at a time.
+
+    Args:
+        csv_path (str): Path to the CSV file containing event data.
+        required (list): Columns that must be present (case-insensitive).
+
+    Yields:
+        Event: One event per data row, in file order.
+
+    Raises:
+        FileNotFoundError: If the CSV file does not exist.
+        ValueError: If required columns are missing from the CSV file.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"CSV file not found: {csv_path}")
+
+    with open(csv_path, 'r', encoding="utf-8-sig", newline='') as file:
+        reader = csv.DictReader(file)
+        columns = EventColumns(reader.fieldnames or [])
+
+        missing_columns = columns.missing(required)
+        if missing_columns:
+            raise ValueError(f"Required columns {missing_columns} not found in the CSV file.")
+
+        for index, row in enumerate(reader):
+            yield Event(index, row, columns)
+
+
+def read_events(csv_path: str, required: Sequence[str] = REQUIRED_COLUMNS) -> List[Event]:
+    """Read all events of a CSV file into a list (see iter_events)."""
+    return list(iter_events(csv_path, required))
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+"""
+Following a recording and its event CSV while both are still being written.
+
+On game day the recording is still running when the first clips are needed,
+and the taggers keep adding rows to the event CSV. Two watchers make this
+possible (used by VideoSplitter.follow_video):
+
+- EventTail reads the rows appended to a CSV since the last call. Only
+  complete lines are read, so a row being written is picked up on the next
+  call. If the file is rewritten (e.g. saved again by a spreadsheet), it is
+  read again from the start and the rows seen before are skipped. A rewrite
+  is noticed when the file shrinks, is replaced (new inode), or no longer
+  starts with the header or ends the read part with the last line read.
+- RecordingWatcher tells how far a growing recording has been written, from
+  the timestamps of its last packets. Only the end of the file is read on
+  every check, so this stays cheap for hours of video.
+
+The recording must be readable while it grows: fragmented MP4
+(``-movflags frag_keyframe+empty_moov``) or MPEG-TS. A regular MP4 only gets
+its index when the recording stops.
+"""
+
+import io
+import os
+import csv
+import time
+import logging
+from typing import List, Optional, Sequence
+
+from utils.pf_events import REQUIRED_COLUMNS, Event, EventColumns
+from utils.pf_media import MediaSource
+
+logger = logging.getLogger('pf_follow')
+
+# seconds before the end of the recording that count as safely written
+# (the last fragment or packet may still be incomplete)
+RECORDED_MARGIN = 0.5
+
+# seconds before the last known end from which the packets are read again on the next check
+REWIND = 10.0
+
+
+class EventTail:
+    """
+    Reads the events appended to a CSV file since the last call.
+
+    Args:
+        csv_path (str): Path to the event CSV (it may not exist yet).
+        required (list): Columns that must be present (case-insensitive).
+    """
+
+    def __init__(self, csv_path: str, required: Sequence[str] = REQUIRED_COLUMNS):
+        self.csv_path = csv_path
+        self.required = required
+        self.columns = None
+        self.rows_read = 0
+        self.last_growth = time.monotonic()
+        self._offset = 0
+        self._skip = 0
+        # identity of the part read so far: inode, header line and last line (bytes)
+        self._inode = None
+        self._header = b""
+        self._last_line = b""
+
+    def read_new(self) -> List[Event]:
+        """
+        Return the events of the rows completed since the last call.
+
+        Raises:
+            ValueError: If required columns are missing from the header.
+        """
+        try:
+            stat = os.stat(self.csv_path)
+        except OSError:
+            return []
+        size = stat.st_size
+        if self._offset and self._rewritten(stat):
+            # rewritten: read again, skipping the rows that were already returned
+            logger.info(f"{self.csv_path} was rewritten, reading it again")
+            self._offset = 0
+            self._skip = self.rows_read
+            self.columns = None
+        if size == self._offset:
+            return []
+        self.last_growth = time.monotonic()
+
+        with open(self.csv_path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+        # only complete lines; the rest is read again next time
+        end = data.rfind(b"\n")
+        if end < 0:
+            return []
+        encoding = 'utf-8-sig' if self._offset == 0 else 'utf-8'
+        if self._offset == 0:
+            self._inode = stat.st_ino
+            self._header = data[:data.find(b"\n") + 1]
+        self._last_line = data[data.rfind(b"\n", 0, end) + 1:end + 1]
+        self._offset += end + 1
+        text = data[:end + 1].decode(encoding, errors='replace')
+
+        rows = csv.reader(io.StringIO(text, newline=''))
+        if self.columns is None:
+            header = next(rows, None)
+            if not header:
+                return []
+            self.columns = EventColumns(header)
+            missing = self.columns.missing(self.required)
+            if missing:
+                raise ValueError(f"Required columns {missing} not found in {self.csv_path}")
+
+        events = []
+        for values in rows:
+            if not values:
+                # empty lines are no rows, like for csv.DictReader
+                continue
+            if self._skip:
+                self._skip -= 1
+                continue
+            row = dict(zip(self.columns.fieldnames, values))
+            events.append(Event(self.rows_read, row, self.columns))
+            self.rows_read += 1
+        return events
+
+    def _rewritten(self, stat: os.stat_result) -> bool:
+        # appending keeps the inode and every byte read so far; only the header and
+        # the last line read are compared, so the check stays cheap for long files
+        if stat.st_size < self._offset or stat.st_ino != self._inode:
+            return True
+        try:
+            with open(self.csv_path, 'rb') as f:
+                header = f.read(len(self._header))
+                f.seek(self._offset - len(self._last_line))
+                last_line = f.read(len(self._last_line))
+        except OSError:
+            return False
+        return header != self._header or last_line != self._last_line
+
+    def idle_seconds(self) -> float:
+        """Seconds since the file last grew."""
+        return time.monotonic() - self.last_growth
+
+
+class RecordingWatcher:
+    """
+    Tracks how much of a growing recording can be read.
+
+    Args:
+        video_path (str): Path to the recording (it may not exist yet).
+        backend (str, optional): Media backend of utils/pf_media.py (default: PyAV if installed).
+        margin (float): Seconds at the end that are not counted as written yet.
+    """
+
+    def __init__(self, video_path: str, backend: Optional[str] = None, margin: float = RECORDED_MARGIN):
+        self.video_path = video_path
+        self.backend = backend
+        self.margin = margin
+        self.end_time = None
+        self.last_growth = time.monotonic()
+        self._size = None
+        self._start_time = None
+
+    def recorded_until(self) -> Optional[float]:
+        """
+        Return the seconds of the recording (from its start) that are completely written,
+        or None if nothing can be read yet.
+        """
+        try:
+            size = os.path.getsize(self.video_path)
+        except OSError:
+            return None
+        if size == self._size:
+            return self._recorded()
+        self._size = size
+        self.last_growth = time.monotonic()
+
+        try:
+            with MediaSource(self.video_path, self.backend) as source:
+                time_base = float(source.info['time_base'])
+                if self._start_time is None:
+                    # times are counted from the first keyframe, like FFmpeg's -ss
+                    first = next((packet for packet in source.read_packets() if packet.keyframe), None)
+                    if first is None or first.pts is None:
+                        return None
+                    self._start_time = first.pts * time_base
+                # read on from a little before the last known end; the first time from the
+                # estimated duration, or from the start if that lies past the written packets
+                known_end = self.end_time if self.end_time is not None else source.info['duration'] or 0.0
+                for start in (max(0.0, known_end - REWIND), 0.0):
+                    for packet in source.read_packets(start=start + self._start_time):
+                        if packet.pts is not None:
+                            end = (packet.pts + packet.duration) * time_base - self._start_time
+                            self.end_time = end if self.end_time is None else max(self.end_time, end)
+                    if self.end_time is not None:
+                        break
+        except Exception as e:
+            # e.g. the header of the recording has not been written yet
+            logger.debug(f"Cannot read {self.video_path} yet: {e}")
+        return self._recorded()
+
+    def _recorded(self) -> Optional[float]:
+        if self.end_time is None:
+            return None
+        return max(0.0, self.end_time - self.margin)
+
+    def idle_seconds(self) -> float:
+        """Seconds since the recording last grew."""
+        return time.monotonic() - self.last_growth
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+Frame datasets stored as a memory-mapped NumPy array.
+
+Sampled frames are written straight into one preallocated ".npy" file of
+shape (frames, height, width, 3) with dtype uint8 (RGB), instead of one PNG
+per frame. FFmpeg decodes every video once, scales the selected frames to the
+dataset resolution and pipes them as raw RGB into their rows of the array.
+Videos are decoded in parallel; every worker opens the array in r+ mode and
+only writes its own rows.
+
+A companion "<dataset>.index.csv" holds one line per row with the video path,
+frame number and timestamp. load_frame_dataset maps the array read-only, so a
+training loop reads frames zero-copy without decoding any images.
+"""
+
+import os
+import csv
+import logging
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger('pf_frame_dataset')
+
+INDEX_COLUMNS = ['row', 'video_path', 'frame_number', 'timestamp', 'valid']
+
+
+def index_path_for(dataset_path: str) -> str:
+    """Return the path of the index file that belongs to a dataset."""
+    return os.path.splitext(dataset_path)[0] + ".index.csv"
+
+
+def select_expression(frame_numbers: Sequence[int]) -> str:
+    """Build an FFmpeg select expression that keeps the given (zero-based) frame numbers."""
+    return "+".join(f"eq(n\\,{frame_number})" for frame_number in frame_numbers)
+
+
+def _decode_into_rows(video_path: str, frame_numbers: List[int], first_row: int,
+                      dataset_path: str, width: int, height: int) -> int:
+    # Worker: decode the selected frames of one video into rows first_row.. of the dataset
+    frames = np.load(dataset_path, mmap_mode='r+')
+    cmd = [
+        'ffmpeg',
+        '-hide_banner',
+        '-loglevel', 'error',
+        '-i', video_path,
+        '-map', '0:v:0',
+        '-vf', f"select={select_expression(frame_numbers)},scale={width}:{height}",
+        '-vsync', '0',
+        '-frames:v', str(len(frame_numbers)),
+        '-f', 'rawvideo',
+        '-pix_fmt', 'rgb24',
+        'pipe:1'
+    ]
+    process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    written = 0
+    try:
+        for row in range(first_row, first_row + len(frame_numbers)):
+            # read the raw frame directly into the mapped row (no intermediate copy)
+            buffer = memoryview(frames[row]).cast('B')
+            filled = 0
+            while filled < len(buffer):
+                count = process.stdout.readinto(buffer[filled:])
+                if not count:
+                    break
+                filled += count
+            if filled < len(buffer):
+                break
+            written += 1
+    finally:
+        process.stdout.close()
+        process.wait()
+        frames.flush()
+        del frames
+
+    return written
+
+
+def create_frame_dataset(samples: Sequence[Tuple[str, List[int], float]], dataset_path: str,
+                         width: int = 640, height: int = 360, workers: int = None) -> Dict[str, Any]:
+    """
+    Decode sampled frames of many videos into a memory-mapped .npy dataset.
+
+    Args:
+        samples (list): (video_path, frame_numbers, fps) per video; frame numbers are
+                        zero-based and sorted, fps is used for the timestamps in the index.
+        dataset_path (str): Path of the .npy file to create (overwritten if it exists).
+        width (int): Width of the stored frames.
+        height (int): Height of the stored frames.
+        workers (int, optional): Number of videos decoded at the same time (default: CPU count).
+
+    Returns:
+        dict: dataset_path, index_path, shape, frames_written and frames_missing.
+    """
+    total_rows = sum(len(frame_numbers) for _, frame_numbers, _ in samples)
+
+    # preallocate the whole tensor on disk; workers fill in their rows
+    frames = np.lib.format.open_memmap(dataset_path, mode='w+', dtype=np.uint8,
+                                       shape=(total_rows, height, width, 3))
+    shape = frames.shape
+    del frames
+
+    jobs = []
+    first_row = 0
+    for video_path, frame_numbers, _ in samples:
+        if frame_numbers:
+            jobs.append((video_path, list(frame_numbers), first_row, dataset_path, width, height))
+        first_row += len(frame_numbers)
+
+    if workers == 1 or len(jobs) < 2:
+        written = [_decode_into_rows(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            written = list(executor.map(_decode_into_rows, *zip(*jobs)))
+    written_by_video = {job[2]: count for job, count in zip(jobs, written)}
+
+    index_path = index_path_for(dataset_path)
+    frames_missing = 0
+    with open(index_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(INDEX_COLUMNS)
+        row = 0
+        for video_path, frame_numbers, fps in samples:
+            count = written_by_video.get(row, 0)
+            if count < len(frame_numbers):
+                logger.warning(f"Only {count} of {len(frame_numbers)} frames decoded from {video_path}")
+                frames_missing += len(frame_numbers) - count
+            for position, frame_number in enumerate(frame_numbers):
+                timestamp = round(frame_number / fps, 6) if fps else ''
+                writer.writerow([row, video_path, frame_number, timestamp, int(position < count)])
+                row += 1
+
+    return {
+        'dataset_path': dataset_path,
+        'index_path': index_path,
+        'shape': shape,
+        'frames_written': total_rows - frames_missing,
+        'frames_missing': frames_missing,
+    }
+
+
+def load_frame_dataset(dataset_path: str) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    """
+    Open a frame dataset for reading.
+
+    Args:
+        dataset_path (str): Path of the .npy file.
+
+    Returns:
+        tuple: (frames, index) where frames is a read-only memory map of shape
+               (rows, height, width, 3) and index is a list of dicts (row, video_path,
+               frame_number, timestamp, valid), one per row.
+    """
+    frames = np.load(dataset_path, mmap_mode='r')
+    index = []
+    with open(index_path_for(dataset_path), 'r', newline='') as f:
+        for entry in csv.DictReader(f):
+            index.append({
+                'row': int(entry['row']),
+                'video_path': entry['video_path'],
+                'frame_number': int(entry['frame_number']),
+                'timestamp': float(entry['timestamp']) if entry['timestamp'] else None,
+                'valid': entry['valid'] == '1',
+            })
+    return frames, index
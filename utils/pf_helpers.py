@@ -1,8 +1,10 @@
 # pf_helpers.py
 
-from tkinter import Tk, filedialog
 import os
 
+# tkinter is imported inside the dialogs, so the modules that use them also
+# load on headless machines (CLI / batch runs never open a dialog)
+
 def select_file(title="Select a File"):
   """
     Opens a file dialog for selecting a file.
@@ -15,6 +17,8 @@ def select_file(title="Select a File"):
                If no file is selected (user clicks "Cancel"), returns (None, None).
     """
   
+  from tkinter import Tk, filedialog
+
   # Create an instance of Tkinter's Tk class
   root = Tk()
 
@@ -38,6 +42,8 @@ def select_file(title="Select a File"):
 
 
 def select_folder(title="Select a Folder"):
+    from tkinter import Tk, filedialog
+
     # Create an instance of Tkinter's Tk class
     root = Tk()
 
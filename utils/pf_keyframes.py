@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""
+Keyframe index for fast, accurate stream-copy cuts.
+
+A stream copy can only start on a keyframe. Instead of letting FFmpeg seek
+blindly for every clip, the packet headers of the source are read once
+(utils/pf_media.py, no decoding) and the keyframe timestamps are stored in a sidecar cache
+("<video>.keyframes.json"). The cache is keyed by file size and modification
+time, so it is rebuilt automatically when the source changes. A recording
+that is still being written keeps its index in memory instead and only scans
+the packets appended since the last keyframe (update_keyframe_index).
+"""
+
+import os
+import json
+import bisect
+import logging
+from typing import List, Dict, Any, Optional
+
+from utils.pf_media import MediaSource
+from utils.pf_probe import get_video_info
+
+logger = logging.getLogger('pf_keyframes')
+
+# ffprobe prints timestamps rounded to microseconds, so seek a little past the
+# keyframe to make sure FFmpeg lands on it and not on the keyframe before.
+SEEK_EPSILON = 0.001
+
+INDEX_VERSION = 1
+
+
+def keyframe_index_path(video_path: str) -> str:
+    """Return the path of the sidecar cache for a video file."""
+    return video_path + ".keyframes.json"
+
+
+def build_keyframe_index(video_path: str, backend: Optional[str] = None,
+                         codec: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Scan the packets of the first video stream and collect the keyframe timestamps.
+
+    Only the packet headers are read (no decoding), so this is I/O bound and
+    much faster than real-time.
+
+    Args:
+        video_path (str): Path to the video file.
+        backend (str, optional): Media backend of utils/pf_media.py (default: PyAV if installed).
+        codec (str, optional): Codec of the video stream, if known (otherwise it is probed).
+
+    Returns:
+        dict: Index with the keys version, size, mtime, codec and keyframes
+              (sorted list of keyframe presentation times in seconds).
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails (ffmpeg backend).
+    """
+    logger.info(f"Building keyframe index for {video_path}")
+    stat = os.stat(video_path)
+
+    if codec is None:
+        info = get_video_info(video_path)
+        codec = info['codec'] if info else None
+
+    with MediaSource(video_path, backend) as source:
+        keyframes = _scan_keyframes(source)
+
+    logger.info(f"Found {len(keyframes)} keyframes in {video_path}")
+    return {
+        'version': INDEX_VERSION,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'codec': codec,
+        'keyframes': keyframes,
+    }
+
+
+def load_keyframe_index(video_path: str, rebuild: bool = False) -> Dict[str, Any]:
+    """
+    Load the keyframe index of a video, building and caching it if needed.
+
+    Args:
+        video_path (str): Path to the video file.
+        rebuild (bool): Ignore an existing cache and scan the file again.
+
+    Returns:
+        dict: Keyframe index (see build_keyframe_index).
+    """
+    cache_path = keyframe_index_path(video_path)
+    stat = os.stat(video_path)
+
+    if not rebuild and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r') as f:
+                index = json.load(f)
+            if (index.get('version') == INDEX_VERSION and
+                    index.get('size') == stat.st_size and
+                    index.get('mtime') == stat.st_mtime):
+                return index
+            logger.info(f"Keyframe index for {video_path} is out of date")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read keyframe index {cache_path}: {e}")
+
+    index = build_keyframe_index(video_path)
+    try:
+        with open(cache_path, 'w') as f:
+            json.dump(index, f)
+    except OSError as e:
+        # A read-only source folder only costs us the cache, not the index
+        logger.warning(f"Could not write keyframe index {cache_path}: {e}")
+    return index
+
+
+def update_keyframe_index(video_path: str, index: Optional[Dict[str, Any]] = None,
+                          backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Bring the in-memory keyframe index of a growing recording up to date.
+
+    Only the packets from the last known keyframe on are scanned, so following
+    a recording for hours costs one short scan per poll instead of reading the
+    whole file again. The index is not written to the sidecar cache (it would
+    be out of date on the next poll). A file that got smaller was replaced and
+    is scanned from the start.
+
+    Args:
+        video_path (str): Path to the recording.
+        index (dict, optional): Index of the previous call (None: scan the whole file).
+        backend (str, optional): Media backend of utils/pf_media.py (default: PyAV if installed).
+
+    Returns:
+        dict: Keyframe index (see build_keyframe_index).
+    """
+    stat = os.stat(video_path)
+    if index is None or stat.st_size < index['size']:
+        return build_keyframe_index(video_path, backend)
+    if stat.st_size == index['size'] and stat.st_mtime == index['mtime']:
+        return index
+
+    keyframes = index['keyframes']
+    start = keyframes[-1] if keyframes else None
+    with MediaSource(video_path, backend) as source:
+        scanned = _scan_keyframes(source, start)
+    if start is not None:
+        # the scan starts on the last known keyframe
+        keyframes = [keyframe for keyframe in keyframes if keyframe < start - SEEK_EPSILON]
+        scanned = [keyframe for keyframe in scanned if keyframe >= start - SEEK_EPSILON]
+    return dict(index, size=stat.st_size, mtime=stat.st_mtime, keyframes=keyframes + scanned)
+
+
+def _scan_keyframes(source: MediaSource, start: Optional[float] = None) -> List[float]:
+    keyframes = [packet.time for packet in source.read_packets(start=start)
+                 if packet.keyframe and packet.time is not None]
+    keyframes.sort()
+    return keyframes
+
+
+def keyframe_at_or_before(keyframes: List[float], time_sec: float) -> Optional[float]:
+    """Return the last keyframe at or before time_sec, or None if there is none."""
+    position = bisect.bisect_right(keyframes, time_sec + SEEK_EPSILON)
+    return keyframes[position - 1] if position else None
+
+
+def keyframe_after(keyframes: List[float], time_sec: float) -> Optional[float]:
+    """Return the first keyframe strictly after time_sec, or None if there is none."""
+    position = bisect.bisect_right(keyframes, time_sec + SEEK_EPSILON)
+    return keyframes[position] if position < len(keyframes) else None
+
+
+def is_keyframe(keyframes: List[float], time_sec: float) -> bool:
+    """Check whether a keyframe sits at time_sec (within the timestamp rounding)."""
+    keyframe = keyframe_at_or_before(keyframes, time_sec)
+    return keyframe is not None and abs(keyframe - time_sec) <= SEEK_EPSILON
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+"""
+Persistent job manifest for resumable split jobs.
+
+The manifest is a JSON file ("split_manifest.json") in the "<video> Clips"
+folder. It records, for every clip, a hash of the event and of the split
+parameters together with the status, size and duration of the written file.
+A rerun of the same split skips the clips that are complete and still match,
+and regenerates only the clips whose event or parameters changed.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional, Union
+
+from utils.pf_probe import get_video_info
+
+logger = logging.getLogger('pf_manifest')
+
+MANIFEST_NAME = "split_manifest.json"
+MANIFEST_VERSION = 1
+
+# Allowed difference between the recorded and the probed clip duration (seconds)
+DURATION_TOLERANCE = 0.05
+
+
+def probe_duration(video_path: str) -> Optional[float]:
+    """
+    Return the container duration of a video file in seconds.
+
+    Args:
+        video_path (str): Path to the video file.
+
+    Returns:
+        float or None: Duration in seconds, or None if the file cannot be read
+                       (e.g. a clip that was cut off before FFmpeg finished it).
+    """
+    # The caller saves the probe cache once per run, not once per clip
+    info = get_video_info(video_path)
+    return info['format_duration'] if info else None
+
+
+def event_hash(event: Dict[str, Any], params: Dict[str, Any]) -> str:
+    """
+    Hash an event together with the parameters used to cut it.
+
+    Args:
+        event (dict): Event row from the CSV.
+        params (dict): Split parameters of the clip (times, encoding, source identity).
+
+    Returns:
+        str: Hex digest that changes whenever the event or the parameters change.
+    """
+    payload = json.dumps({'event': dict(event), 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class SplitManifest:
+    """
+    Job manifest of one "<video> Clips" folder.
+
+    The manifest is saved after every recorded clip (write to a temporary file,
+    then rename), so an interrupted run loses at most the clips in progress.
+    Recording is thread-safe, so clips cut on a worker pool can report directly.
+    """
+
+    def __init__(self, clips_folder: str, video_path: str):
+        """
+        Load the manifest of a clips folder, or start an empty one.
+
+        Args:
+            clips_folder (str): The "<video> Clips" folder.
+            video_path (str): Path to the source video file.
+        """
+        self.path = os.path.join(clips_folder, MANIFEST_NAME)
+        self.clips_folder = clips_folder
+        self._lock = threading.Lock()
+        self.data = {'version': MANIFEST_VERSION, 'source': os.path.abspath(video_path), 'clips': {}}
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self.data['clips'] = data.get('clips', {})
+                else:
+                    logger.warning(f"Ignoring manifest with unknown version: {self.path}")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read manifest {self.path}, starting a new one: {e}")
+
+    def is_complete(self, clip_number: Union[int, str], job_hash: str) -> bool:
+        """
+        Check whether a clip was completed with the same event and parameters.
+
+        The clip file must still exist with the recorded size and duration.
+
+        Args:
+            clip_number (int or str): Clip number (Play_NNN), or "<number> <angle>" for a multi-angle split.
+            job_hash (str): Current hash of the event and its parameters.
+
+        Returns:
+            bool: True if the clip can be skipped.
+        """
+        entry = self.data['clips'].get(str(clip_number))
+        if not entry or entry.get('status') != 'created' or entry.get('event_hash') != job_hash:
+            return False
+
+        output_path = os.path.join(self.clips_folder, entry['output_file'])
+        try:
+            if os.path.getsize(output_path) != entry.get('size'):
+                return False
+        except OSError:
+            return False
+
+        duration = probe_duration(output_path)
+        return duration is not None and abs(duration - entry.get('duration', -1)) <= DURATION_TOLERANCE
+
+    def record(self, clip_number: Union[int, str], output_file: str, job_hash: str, params: Dict[str, Any],
+               status: str, size: Optional[int] = None, duration: Optional[float] = None,
+               error: Optional[str] = None) -> None:
+        """
+        Record the outcome of a clip and save the manifest.
+
+        Args:
+            clip_number (int or str): Clip number (Play_NNN), or "<number> <angle>" for a multi-angle split.
+            output_file (str): File name of the clip.
+            job_hash (str): Hash of the event and its parameters.
+            params (dict): Split parameters of the clip.
+            status (str): 'created' or 'failed'.
+            size (int, optional): Size of the written file in bytes.
+            duration (float, optional): Probed duration of the written file in seconds.
+            error (str, optional): Error message of a failed clip.
+        """
+        with self._lock:
+            self.data['clips'][str(clip_number)] = {
+                'output_file': output_file,
+                'event_hash': job_hash,
+                'params': params,
+                'status': status,
+                'size': size,
+                'duration': duration,
+                'error': error,
+                'updated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            }
+            self.save()
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
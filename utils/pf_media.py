@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+"""
+In-process access to video files.
+
+Most tools here start an FFmpeg or ffprobe process for every unit of work:
+one per clip to cut, per clip to measure, per scene to look at. For short
+clips, process start-up and parsing the container cost more than the work
+itself. A MediaSource opens a video once and serves all requests on it:
+
+- info: stream properties (codec, size, frame rate, time base, duration)
+- read_packets(): packet timestamps, durations and keyframe flags (no decoding)
+- read_frames() / frames_at(): decoded RGB frames, optionally scaled
+- write_segment(): stream-copy a time range into a new file
+
+With PyAV installed (pip install av) the container stays open in the
+process. Without it, MediaSource falls back to FFmpeg / ffprobe processes
+with the same results, so PyAV is an optional speed-up and never required.
+A MediaSource is not thread safe; use one per thread.
+
+    with MediaSource("Game.mp4") as source:
+        keyframes = [packet.time for packet in source.read_packets() if packet.keyframe]
+        thumbnails = source.frames_at([12.0, 95.5], size=(64, 36))
+"""
+
+import os
+import logging
+import subprocess
+from fractions import Fraction
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.pf_probe import get_video_info
+
+try:
+    import av
+except ImportError:  # optional, see the module docstring
+    av = None
+
+logger = logging.getLogger('pf_media')
+
+BACKENDS = ('pyav', 'ffmpeg')
+
+# frames_at decodes forward instead of seeking when the next time is at most this far ahead (seconds)
+SEEK_THRESHOLD = 2.0
+
+
+class Packet(NamedTuple):
+    """Header of a video packet; pts, dts and duration are in time base units."""
+    pts: Optional[int]
+    dts: Optional[int]
+    duration: int
+    time: Optional[float]  # pts in seconds
+    keyframe: bool
+    size: int
+
+
+def default_backend() -> str:
+    """'pyav' if PyAV is installed, otherwise 'ffmpeg'."""
+    return 'pyav' if av is not None else 'ffmpeg'
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """
+    Check a backend name (None = default_backend()).
+
+    Raises:
+        ValueError: If the backend is unknown.
+        ImportError: If 'pyav' is requested but PyAV is not installed.
+    """
+    backend = backend or default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown media backend '{backend}' (choose from {', '.join(BACKENDS)})")
+    if backend == 'pyav' and av is None:
+        raise ImportError("The 'pyav' media backend needs PyAV (pip install av)")
+    return backend
+
+
+class MediaSource:
+    """
+    An opened video file (first video stream).
+
+    Args:
+        path (str): Path to the video file.
+        backend (str, optional): 'pyav' (container kept open in the process) or
+                                 'ffmpeg' (FFmpeg / ffprobe processes); default: PyAV if installed.
+
+    Raises:
+        ValueError: If the file has no video stream (or cannot be probed).
+    """
+
+    def __init__(self, path: str, backend: Optional[str] = None):
+        self.path = path
+        self.backend = resolve_backend(backend)
+        self._container = None
+        self._stream = None
+        self._info = None
+        # time (seconds) of the last frame decoded by frames_at, to decode on instead of seeking
+        self._position = None
+        self._frames = None
+
+        if self.backend == 'pyav':
+            self._container = av.open(path)
+            if not self._container.streams.video:
+                self.close()
+                raise ValueError(f"No video stream found in {path}")
+            self._stream = self._container.streams.video[0]
+
+    def __enter__(self) -> 'MediaSource':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._container is not None:
+            self._container.close()
+            self._container = None
+            self._frames = None
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        """codec, width, height, fps, time_base (Fraction) and duration (seconds) of the video stream."""
+        if self._info is None:
+            if self.backend == 'pyav':
+                stream = self._stream
+                duration = None
+                if stream.duration is not None:
+                    duration = float(stream.duration * stream.time_base)
+                elif self._container.duration is not None:
+                    duration = self._container.duration / av.time_base
+                self._info = {
+                    'codec': stream.codec_context.name,
+                    'width': stream.codec_context.width,
+                    'height': stream.codec_context.height,
+                    'fps': float(stream.average_rate or stream.base_rate or 0) or None,
+                    'time_base': stream.time_base,
+                    'duration': duration,
+                }
+            else:
+                probed = get_video_info(self.path)
+                if probed is None:
+                    raise ValueError(f"Cannot read the video properties of {self.path}")
+                self._info = {
+                    'codec': probed['codec'],
+                    'width': probed['width'],
+                    'height': probed['height'],
+                    'fps': probed['fps'],
+                    'time_base': Fraction(probed['time_base']) if probed.get('time_base') else None,
+                    'duration': probed['duration'],
+                }
+        return self._info
+
+    # --- packets ---
+
+    def read_packets(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Packet]:
+        """
+        Iterate over the packet headers of the video stream in decoding order.
+
+        Args:
+            start (float, optional): Begin at the keyframe at or before this time (seconds).
+            end (float, optional): Stop before the first packet decoded at or after this time.
+        """
+        if self.backend == 'pyav':
+            yield from self._read_packets_pyav(start, end)
+        else:
+            yield from self._read_packets_ffprobe(start, end)
+
+    def _read_packets_pyav(self, start, end):
+        stream = self._stream
+        time_base = stream.time_base
+        self._seek(start)
+        for packet in self._container.demux(stream):
+            if packet.dts is None and packet.pts is None:
+                continue  # flush packet at the end of the stream
+            if end is not None and packet.dts is not None and packet.dts * time_base >= end:
+                break
+            yield Packet(packet.pts, packet.dts, packet.duration or 0,
+                         float(packet.pts * time_base) if packet.pts is not None else None,
+                         bool(packet.is_keyframe), packet.size)
+
+    def _read_packets_ffprobe(self, start, end):
+        time_base = self.info['time_base']
+        cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+               '-show_entries', 'packet=pts,dts,duration,size,flags', '-of', 'csv=p=0']
+        if start is not None or end is not None:
+            # read a little past the end, packets are cut by their decoding time below
+            cmd += ['-read_intervals', f"{start or ''}%{end + 1 if end is not None else ''}"]
+        # read the packet lines as ffprobe writes them, so a caller that stops early stops ffprobe too
+        process = subprocess.Popen(cmd + [self.path], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL, text=True)
+
+        def number(value):
+            return int(value) if value not in ('', 'N/A') else None
+
+        finished = False
+        try:
+            for line in process.stdout:
+                fields = line.strip().split(',')
+                if len(fields) < 5:
+                    continue
+                pts, dts, duration, size = (number(value) for value in fields[:4])
+                if end is not None and dts is not None and time_base and dts * time_base >= end:
+                    break
+                yield Packet(pts, dts, duration or 0,
+                             float(pts * time_base) if pts is not None and time_base else None,
+                             'K' in fields[4], size or 0)
+            else:
+                finished = True
+        finally:
+            if not finished:
+                process.kill()
+            process.stdout.close()
+            returncode = process.wait()
+        if finished and returncode:
+            raise subprocess.CalledProcessError(returncode, cmd)
+
+    # --- frames ---
+
+    def read_frames(self, start: Optional[float] = None, end: Optional[float] = None,
+                    size: Optional[Tuple[int, int]] = None) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Decode the frames from start (inclusive) to end (exclusive).
+
+        Args:
+            start (float, optional): First frame time (seconds); default: the beginning.
+            end (float, optional): End time (seconds); default: the end of the video.
+            size (tuple, optional): (width, height) to scale to; default: the stream size.
+
+        Yields:
+            tuple: (time in seconds, uint8 RGB array of shape (height, width, 3)).
+        """
+        if self.backend == 'pyav':
+            self._seek(start)
+            self._position = None
+            for frame in self._container.decode(self._stream):
+                if frame.time is None or (start is not None and frame.time < start - 1e-6):
+                    continue
+                if end is not None and frame.time >= end - 1e-6:
+                    break
+                yield frame.time, self._to_rgb(frame, size)
+        else:
+            yield from self._read_frames_ffmpeg(start, end, size)
+
+    def _read_frames_ffmpeg(self, start, end, size):
+        width, height = size or (self.info['width'], self.info['height'])
+        fps = self.info['fps']
+        cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error']
+        if start:
+            cmd += ['-ss', f"{start:.6f}"]
+        cmd += ['-i', self.path, '-map', '0:v:0']
+        if end is not None:
+            cmd += ['-t', f"{end - (start or 0):.6f}"]
+        cmd += ['-vf', f"scale={width}:{height}", '-vsync', '0', '-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1']
+
+        frame_bytes = width * height * 3
+        process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            index = 0
+            while True:
+                data = process.stdout.read(frame_bytes)
+                if len(data) < frame_bytes:
+                    break
+                # the pipe carries no timestamps; frames follow each other at the stream rate
+                yield (start or 0) + index / fps, np.frombuffer(data, np.uint8).reshape(height, width, 3)
+                index += 1
+        finally:
+            process.stdout.close()
+            process.kill()
+            process.wait()
+
+    def frames_at(self, times: Sequence[float], size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """
+        Decode the first frame at or after each of the given times (like FFmpeg's -ss).
+
+        Times close after each other are reached by decoding on instead of seeking again.
+
+        Args:
+            times (list): Times in seconds.
+            size (tuple, optional): (width, height) to scale to; default: the stream size.
+
+        Returns:
+            ndarray: uint8 array of shape (frames, height, width, 3); fewer frames if
+                     a time lies past the end of the video.
+        """
+        width, height = size or (self.info['width'], self.info['height'])
+        if self.backend == 'ffmpeg':
+            return self._frames_at_ffmpeg(times, (width, height))
+
+        frames = []
+        for time_sec in times:
+            frame = self._decode_at(time_sec)
+            if frame is None:
+                break
+            frames.append(self._to_rgb(frame, (width, height)))
+        if not frames:
+            return np.zeros((0, height, width, 3), np.uint8)
+        return np.stack(frames)
+
+    def _decode_at(self, time_sec):
+        # decode on from the last frame if the time is a little ahead, otherwise seek first
+        if self._position is None or not (self._position < time_sec <= self._position + SEEK_THRESHOLD):
+            self._seek(time_sec)
+            self._frames = self._container.decode(self._stream)
+        for frame in self._frames:
+            if frame.time is None:
+                continue
+            self._position = frame.time
+            if frame.time >= time_sec - 1e-6:
+                return frame
+        self._position = None
+        return None
+
+    def _frames_at_ffmpeg(self, times, size):
+        # one FFmpeg run: every time is a separately seeked input, their first frames are joined
+        width, height = size
+        cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error']
+        for time_sec in times:
+            cmd += ['-threads', '1', '-ss', f"{time_sec:.6f}", '-i', self.path]
+        chains = [f"[{index}:v:0]trim=end_frame=1,scale={width}:{height},setsar=1,format=rgb24[v{index}]"
+                  for index in range(len(times))]
+        joined = "".join(f"[v{index}]" for index in range(len(times)))
+        chains.append(f"{joined}concat=n={len(times)}:v=1:a=0[out]")
+        cmd += ['-filter_complex', ";".join(chains), '-map', '[out]', '-vsync', '0',
+                '-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1']
+
+        result = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True)
+        frame_bytes = width * height * 3
+        count = len(result.stdout) // frame_bytes
+        return np.frombuffer(result.stdout[:count * frame_bytes], np.uint8).reshape(count, height, width, 3)
+
+    @staticmethod
+    def _to_rgb(frame, size):
+        if size is None:
+            return frame.to_ndarray(format='rgb24')
+        # bicubic like FFmpeg's scale filter
+        return frame.to_ndarray(format='rgb24', width=size[0], height=size[1], interpolation='BICUBIC')
+
+    def _seek(self, time_sec):
+        # seek to the keyframe at or before the time (the start of the stream if None);
+        # a microsecond of slack, so a keyframe time read back from seconds is not missed
+        stream = self._stream
+        self._container.seek(int(((time_sec or 0) + 1e-6) / stream.time_base), stream=stream,
+                             backward=True, any_frame=False)
+
+    # --- segments ---
+
+    def write_segment(self, output_path: str, start: float, end: float) -> Optional[int]:
+        """
+        Stream-copy the video from the keyframe at or before start up to end into a new file.
+
+        The segment starts on that keyframe at time 0, like an FFmpeg copy from a
+        keyframe-aligned start; packets decoded at or after end are left out.
+        Audio is not copied.
+
+        Returns:
+            int or None: Number of packets written (None with the ffmpeg backend).
+
+        Raises:
+            ValueError: If there is no keyframe in the range.
+            subprocess.CalledProcessError: If FFmpeg fails (ffmpeg backend).
+        """
+        if self.backend == 'ffmpeg':
+            cmd = ['ffmpeg', '-y', '-v', 'error', '-hide_banner', '-ss', f"{start:.6f}", '-i', self.path,
+                   '-t', f"{end - start:.6f}", '-map', '0:v:0', '-c:v', 'copy', '-an', output_path]
+            subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL, capture_output=True)
+            return None
+
+        # the first keyframe at or before start
+        stream = self._stream
+        time_base = stream.time_base
+        self._seek(start)
+        self._position = None
+        output = None
+        written = 0
+        try:
+            for packet in self._container.demux(stream):
+                if packet.dts is None or packet.pts is None:
+                    continue
+                if output is None:
+                    if not packet.is_keyframe:
+                        continue
+                    # Timestamps count from the decoding time of the keyframe, so none is negative
+                    # with B-frames; the muxer moves them back by the reorder delay, so the keyframe
+                    # is shown at time 0 (an edit list in MP4, as in an FFmpeg copy)
+                    offset = packet.dts
+                    delay = float((packet.pts - packet.dts) * time_base)
+                    options = {'output_ts_offset': f"{-delay:.6f}"} if delay else {}
+                    output = av.open(output_path, 'w', options=options)
+                    output_stream = output.add_stream_from_template(stream)
+                # like FFmpeg's -t for a stream copy: stop at the first packet decoded at the end
+                if packet.dts * time_base >= end:
+                    break
+                packet.pts -= offset
+                packet.dts -= offset
+                packet.stream = output_stream
+                output.mux(packet)
+                written += 1
+        finally:
+            if output is not None:
+                output.close()
+        if not written:
+            # the muxer writes nothing before the first packet
+            if output is not None and os.path.exists(output_path):
+                os.remove(output_path)
+            raise ValueError(f"No keyframe between {start:.3f}s and {end:.3f}s in {self.path}")
+        return written
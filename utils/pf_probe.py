@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+"""
+Shared video probing with a persistent cache.
+
+All scripts that need clip metadata (duration, frame rate, frame count,
+codec, creation time) go through this module. ffprobe runs once per file
+version: results are stored in an on-disk cache keyed by (path, size,
+mtime), and many files can be probed concurrently, so re-importing a season
+folder of thousands of clips only probes the new or changed ones. New
+entries are written in batches (after probe_videos, and the shared cache
+when the process exits), not after every probe.
+"""
+
+import os
+import json
+import atexit
+import logging
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger('pf_probe')
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".pyfootballvideo", "probe_cache.json")
+CACHE_VERSION = 2
+
+
+def _parse_rate(rate: Optional[str]) -> Optional[float]:
+    # ffprobe rates look like "60000/1001" ("0/0" if unknown)
+    if not rate:
+        return None
+    num, _, denom = rate.partition('/')
+    try:
+        num = float(num)
+        denom = float(denom) if denom else 1.0
+    except ValueError:
+        return None
+    return num / denom if num and denom else None
+
+
+def _parse_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def probe_video(video_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Run ffprobe on a video file (no cache) and return its main properties.
+
+    Args:
+        video_path (str): Path to the video file.
+
+    Returns:
+        dict or None: Video info with the keys duration (s), fps, frame_rate (ffprobe's
+                      r_frame_rate, e.g. "60000/1001"), nb_frames, codec,
+                      creation_time, width, height, pix_fmt, profile, time_base,
+                      sample_aspect_ratio and format_duration, or None if the file
+                      cannot be probed.
+    """
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-select_streams', 'v:0',
+        '-print_format', 'json',
+        '-show_streams',
+        '-show_format',
+        video_path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        data = json.loads(result.stdout)
+    except (subprocess.CalledProcessError, ValueError, OSError) as e:
+        logger.error(f"ffprobe failed for {video_path}: {e}")
+        return None
+
+    streams = data.get('streams') or []
+    if not streams:
+        logger.error(f"No video stream found in {video_path}")
+        return None
+    stream = streams[0]
+    container = data.get('format', {})
+
+    format_duration = _parse_float(container.get('duration'))
+    duration = _parse_float(stream.get('duration'))
+    if duration is None:
+        duration = format_duration
+
+    fps = _parse_rate(stream.get('avg_frame_rate')) or _parse_rate(stream.get('r_frame_rate'))
+
+    nb_frames = stream.get('nb_frames')
+    if nb_frames is not None:
+        nb_frames = int(nb_frames)
+    elif duration and fps:
+        # Containers like MKV or MPEG-TS do not store a frame count
+        nb_frames = int(round(duration * fps))
+
+    tags = stream.get('tags', {})
+    creation_time = tags.get('creation_time') or container.get('tags', {}).get('creation_time')
+
+    return {
+        'duration': duration,
+        'format_duration': format_duration,
+        'fps': fps,
+        'frame_rate': stream.get('r_frame_rate'),
+        'nb_frames': nb_frames,
+        'codec': stream.get('codec_name'),
+        'profile': stream.get('profile'),
+        'width': stream.get('width'),
+        'height': stream.get('height'),
+        'pix_fmt': stream.get('pix_fmt'),
+        'time_base': stream.get('time_base'),
+        'sample_aspect_ratio': stream.get('sample_aspect_ratio'),
+        'creation_time': creation_time,
+    }
+
+
+class ProbeCache:
+    """
+    On-disk cache of probe results, keyed by (path, size, mtime).
+
+    Lookups and updates are thread-safe. Call save() to write the cache back.
+    """
+
+    def __init__(self, cache_path: str = DEFAULT_CACHE_PATH):
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = False
+
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_VERSION:
+                    self._entries = data.get('entries', {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read probe cache {cache_path}: {e}")
+
+    @staticmethod
+    def _key(video_path: str):
+        stat = os.stat(video_path)
+        return os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns
+
+    def get(self, video_path: str) -> Optional[Dict[str, Any]]:
+        """Return the cached info of a file, or None if it is unknown or changed."""
+        path, size, mtime = self._key(video_path)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry and entry['size'] == size and entry['mtime'] == mtime:
+            return entry['info']
+        return None
+
+    def put(self, video_path: str, info: Dict[str, Any]) -> None:
+        """Store the info of a file under its current size and mtime."""
+        path, size, mtime = self._key(video_path)
+        with self._lock:
+            self._entries[path] = {'size': size, 'mtime': mtime, 'info': info}
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache to disk (atomically) if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+                tmp_path = self.cache_path + f".{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'version': CACHE_VERSION, 'entries': self._entries}, f)
+                os.replace(tmp_path, self.cache_path)
+                self._dirty = False
+            except OSError as e:
+                logger.warning(f"Could not write probe cache {self.cache_path}: {e}")
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache() -> ProbeCache:
+    """Return the process-wide probe cache (loaded on first use, saved at exit)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ProbeCache()
+            atexit.register(_default_cache.save)
+        return _default_cache
+
+
+def get_video_info(video_path: str, cache: Optional[ProbeCache] = None, save: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Return the info of a video file, probing it only if the cache has no current entry.
+
+    Args:
+        video_path (str): Path to the video file.
+        cache (ProbeCache, optional): Cache to use (default: the shared on-disk cache).
+        save (bool): Write the cache back right after a new probe (otherwise it is
+                     written in a batch, see the module docstring).
+
+    Returns:
+        dict or None: Video info (see probe_video), or None if the file cannot be probed.
+    """
+    cache = cache or default_cache()
+    try:
+        info = cache.get(video_path)
+    except OSError as e:
+        logger.error(f"Cannot access {video_path}: {e}")
+        return None
+    if info is not None:
+        return info
+
+    info = probe_video(video_path)
+    if info is not None:
+        cache.put(video_path, info)
+        if save:
+            cache.save()
+    return info
+
+
+def probe_videos(video_paths: List[str], workers: int = 8, cache: Optional[ProbeCache] = None,
+                 on_progress: Optional[Callable[[int, int], None]] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Probe many video files concurrently, using and updating the cache.
+
+    Args:
+        video_paths (list): Paths of the video files.
+        workers (int): Number of ffprobe processes run at the same time.
+        cache (ProbeCache, optional): Cache to use (default: the shared on-disk cache).
+        on_progress (callable, optional): Called as on_progress(done, total) after each file.
+
+    Returns:
+        list: Video info per path (see probe_video), in the order of video_paths.
+              Entries are None for files that could not be probed.
+    """
+    cache = cache or default_cache()
+    total = len(video_paths)
+    done = 0
+    done_lock = threading.Lock()
+
+    def probe_one(video_path):
+        nonlocal done
+        info = get_video_info(video_path, cache)
+        if on_progress is not None:
+            with done_lock:
+                done += 1
+                on_progress(done, total)
+        return info
+
+    if workers <= 1 or total < 2:
+        results = [probe_one(video_path) for video_path in video_paths]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(probe_one, video_paths))
+
+    cache.save()
+    return results
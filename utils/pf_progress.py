@@ -0,0 +1,328 @@
+#!/usr/bin/env python
+"""
+Progress and throughput reporting for long-running jobs.
+
+FFmpeg writes machine-readable progress with ``-progress pipe:1``: a block
+of key=value lines (frame, fps, out_time_us, total_size, speed, ...) about
+twice a second, closed by ``progress=continue`` or ``progress=end``.
+run_ffmpeg starts FFmpeg with that option, turns every block into a record
+(fps, speed multiplier, bytes written, position, percent and ETA) and hands
+it to a ProgressReporter.
+
+A ProgressReporter passes every record to its callbacks and, optionally,
+appends it to a JSON-lines metrics file. It also times the stages of a run
+(``with reporter.stage('concat'): ...``), so the metrics file of a night's
+batch shows where the time went:
+
+    {"time": 1760800000.2, "job": "split Game1", "event": "ffmpeg", "stage": "clip",
+     "clip": 12, "frame": 184, "fps": 61.2, "speed": 2.04, "out_time": 3.07,
+     "total_size": 1048624, "percent": 61.4, "eta": 0.95, "done": false}
+    {"time": 1760800002.9, "job": "split Game1", "event": "stage", "stage": "clips",
+     "seconds": 95.3, "status": "done"}
+
+A reporter without callbacks or metrics file only collects the stage times;
+FFmpeg then runs exactly as without progress reporting.
+"""
+
+import sys
+import copy
+import json
+import time
+import logging
+import threading
+import subprocess
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger('pf_progress')
+
+# lines of FFmpeg's stderr kept for the error message of a failed run
+STDERR_TAIL = 50
+
+
+class ProgressReporter:
+    """
+    Receives progress records and stage timings of a run (thread safe).
+
+    Args:
+        metrics_path (str, optional): JSON-lines file the records are appended to.
+        callbacks (list, optional): Functions called with every record (a dict).
+        job (str, optional): Name of the job, added to every record.
+    """
+
+    def __init__(self, metrics_path: Optional[str] = None,
+                 callbacks: Optional[List[Callable[[Dict[str, Any]], None]]] = None,
+                 job: Optional[str] = None):
+        self.metrics_path = metrics_path
+        self.job = job
+        self._callbacks = list(callbacks or [])
+        self._lock = threading.Lock()
+        self._metrics_file = None
+        self._stage_times = {}
+        self._parent = None
+
+    @property
+    def active(self) -> bool:
+        """True if the records go anywhere (callbacks or a metrics file)."""
+        return bool(self._callbacks or self.metrics_path)
+
+    def bind(self, job: str) -> 'ProgressReporter':
+        """
+        Reporter for a job of this run: shares the callbacks and the metrics file, and
+        keeps its own stage times, which also add to the stage times of this reporter.
+        The metrics file stays open in the root reporter, so closing that one closes it.
+        """
+        reporter = copy.copy(self)
+        reporter.job = job
+        reporter._stage_times = {}
+        reporter._parent = self
+        return reporter
+
+    def add_callback(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        self._callbacks.append(callback)
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """Send a record to the callbacks and the metrics file."""
+        if not self.active:
+            return
+        record = {'time': round(time.time(), 3), 'job': self.job, 'event': event}
+        record.update(fields)
+        root = self._root()
+        with self._lock:
+            if root.metrics_path:
+                # one handle for the run: bound reporters write through the root reporter
+                if root._metrics_file is None:
+                    root._metrics_file = open(root.metrics_path, 'a', encoding='utf-8')
+                root._metrics_file.write(json.dumps(record) + "\n")
+                root._metrics_file.flush()
+            for callback in self._callbacks:
+                try:
+                    callback(record)
+                except Exception as e:
+                    # a broken display must not stop the encode
+                    logger.warning(f"Progress callback failed: {e}")
+
+    @contextmanager
+    def stage(self, name: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time a stage of the run and report it when it ends.
+
+        Yields a dict; fields added to it (e.g. a count) are reported with the stage.
+        """
+        details = dict(fields)
+        status = 'failed'
+        start = time.perf_counter()
+        try:
+            yield details
+            status = 'done'
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                reporter = self
+                while reporter is not None:
+                    count, total = reporter._stage_times.get(name, (0, 0.0))
+                    reporter._stage_times[name] = (count + 1, total + seconds)
+                    reporter = reporter._parent
+            self.emit('stage', stage=name, seconds=round(seconds, 3), status=status, **details)
+
+    def stage_times(self) -> Dict[str, Dict[str, float]]:
+        """Total seconds and number of runs per stage (including those of the bound jobs)."""
+        with self._lock:
+            return {name: {'count': count, 'seconds': round(total, 3)}
+                    for name, (count, total) in self._stage_times.items()}
+
+    def close(self) -> None:
+        """Close the metrics file (it is reopened by the next record)."""
+        root = self._root()
+        with self._lock:
+            if root._metrics_file is not None:
+                root._metrics_file.close()
+                root._metrics_file = None
+
+    def _root(self) -> 'ProgressReporter':
+        reporter = self
+        while reporter._parent is not None:
+            reporter = reporter._parent
+        return reporter
+
+
+def _number(value: Optional[str], cast: Callable = float) -> Optional[Any]:
+    # FFmpeg writes N/A (and "1.5x" for the speed) until the value is known
+    if value is None:
+        return None
+    value = value.strip().rstrip('x')
+    try:
+        return cast(value)
+    except ValueError:
+        return None
+
+
+def iter_progress_blocks(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """Group the key=value lines of ``-progress`` output into one dict per update."""
+    block = {}
+    for line in lines:
+        key, separator, value = line.strip().partition('=')
+        if not separator:
+            continue
+        block[key] = value
+        if key == 'progress':
+            yield block
+            block = {}
+
+
+def progress_record(block: Dict[str, str], duration: Optional[float] = None,
+                    wall_time: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Convert a ``-progress`` block into a progress record.
+
+    Args:
+        block (dict): key=value pairs of one update.
+        duration (float, optional): Expected output length (seconds), for percent and ETA.
+        wall_time (float, optional): Seconds since FFmpeg started, for the ETA without a speed.
+
+    Returns:
+        dict: frame, fps, speed (multiple of real time), out_time (seconds written),
+              total_size (bytes written), percent, eta (seconds) and done.
+    """
+    out_time_us = _number(block.get('out_time_us'), int)
+    out_time = out_time_us / 1e6 if out_time_us is not None and out_time_us >= 0 else None
+    speed = _number(block.get('speed'))
+    done = block.get('progress') == 'end'
+    frame = _number(block.get('frame'), int)
+    fps = _number(block.get('fps'))
+    if not fps and frame and wall_time:
+        # FFmpeg only reports its rate after the first second
+        fps = round(frame / wall_time, 2)
+
+    percent = eta = None
+    if duration and out_time is not None:
+        remaining = max(0.0, duration - out_time)
+        percent = round(min(100.0, 100.0 * out_time / duration), 1)
+        if done:
+            eta = 0.0
+        elif speed:
+            eta = round(remaining / speed, 2)
+        elif wall_time and out_time > 0:
+            eta = round(wall_time * remaining / out_time, 2)
+
+    return {
+        'frame': frame,
+        'fps': fps,
+        'speed': speed,
+        'out_time': round(out_time, 3) if out_time is not None else None,
+        'total_size': _number(block.get('total_size'), int),
+        'percent': percent,
+        'eta': eta,
+        'done': done,
+    }
+
+
+def rate_record(done: int, total: Optional[int], elapsed: float, fps: Optional[float] = None,
+                finished: bool = False) -> Dict[str, Any]:
+    """
+    Progress record of work counted in frames (e.g. frames analyzed by a detector).
+
+    Args:
+        done (int): Frames processed so far.
+        total (int, optional): Frames in total, for percent and ETA.
+        elapsed (float): Seconds since the work started.
+        fps (float, optional): Frame rate of the source, for the speed multiplier.
+        finished (bool): The work is complete.
+    """
+    rate = done / elapsed if elapsed > 0 else None
+    percent = round(min(100.0, 100.0 * done / total), 1) if total else None
+    eta = None
+    if finished:
+        eta = 0.0
+    elif total and rate:
+        eta = round(max(0, total - done) / rate, 2)
+    return {
+        'frame': done,
+        'fps': round(rate, 2) if rate is not None else None,
+        'speed': round(rate / fps, 3) if rate is not None and fps else None,
+        'percent': percent,
+        'eta': eta,
+        'done': finished,
+    }
+
+
+def run_ffmpeg(cmd: List[str], duration: Optional[float] = None, reporter: Optional[ProgressReporter] = None,
+               stage: str = 'ffmpeg', **fields: Any) -> Tuple[int, str]:
+    """
+    Run an FFmpeg command and report its progress.
+
+    ``-progress pipe:1 -nostats`` is added to the command, so the command itself
+    must not write to stdout. stdin is closed, so FFmpeg cannot block on a prompt.
+
+    Args:
+        cmd (list): FFmpeg command line (starting with the executable).
+        duration (float, optional): Expected output length (seconds), for percent and ETA.
+        reporter (ProgressReporter, optional): Receives an 'ffmpeg' record per update.
+        stage (str): Stage name added to the records.
+        **fields: Further fields added to the records (e.g. clip=12).
+
+    Returns:
+        tuple: (return code, stderr of FFmpeg; the last lines only).
+    """
+    cmd = [cmd[0], '-progress', 'pipe:1', '-nostats'] + list(cmd[1:])
+    process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, text=True, errors='replace')
+
+    # read stderr alongside, a full pipe would stall FFmpeg
+    stderr_tail = deque(maxlen=STDERR_TAIL)
+    stderr_thread = threading.Thread(target=lambda: stderr_tail.extend(process.stderr), daemon=True)
+    stderr_thread.start()
+
+    start = time.perf_counter()
+    for block in iter_progress_blocks(process.stdout):
+        if reporter is not None:
+            record = progress_record(block, duration, time.perf_counter() - start)
+            reporter.emit('ffmpeg', stage=stage, **fields, **record)
+
+    returncode = process.wait()
+    stderr_thread.join()
+    return returncode, "".join(stderr_tail)
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def print_progress(record: Dict[str, Any], stream=None) -> None:
+    """Callback that shows FFmpeg progress on one console line and prints finished stages."""
+    stream = stream or sys.stdout
+    prefix = f"{record['job']} " if record.get('job') else ""
+    if record['event'] in ('ffmpeg', 'frames'):
+        if record.get('clip') is not None:
+            prefix += f"[clip {record['clip']}] "
+        elif record.get('file'):
+            prefix += f"[{record['file']}] "
+        percent = f"{record['percent']:5.1f}% " if record.get('percent') is not None else ""
+        fps = f"{record['fps']:.0f} fps" if record.get('fps') is not None else "- fps"
+        speed = f"{record['speed']:.2f}x" if record.get('speed') is not None else "-x"
+        size = f"{record['total_size'] / 1e6:.1f} MB " if record.get('total_size') is not None else ""
+        stream.write(f"\r{prefix}{record['stage']}: {percent}{fps} {speed} {size}"
+                     f"ETA {format_eta(record.get('eta'))}   ")
+        if record.get('done'):
+            stream.write("\n")
+        stream.flush()
+    elif record['event'] == 'follow':
+        recorded = format_eta(record['recorded']) if record.get('recorded') is not None else "--:--"
+        stream.write(f"\r{prefix}follow: recorded {recorded}, {record['clips']} clips, "
+                     f"{record['pending']} events waiting   ")
+        stream.flush()
+    elif record['event'] == 'stage':
+        stream.write(f"{prefix}{record['stage']}: {record['status']} in {record['seconds']:.1f}s\n")
+        stream.flush()
+
+
+def print_stage_times(reporter: ProgressReporter) -> None:
+    """Print the total time per stage, longest first."""
+    stage_times = reporter.stage_times()
+    for name, times in sorted(stage_times.items(), key=lambda item: -item[1]['seconds']):
+        print(f"  {name:<16s} {times['seconds']:9.1f}s  ({times['count']}x)")
@@ -0,0 +1,406 @@
+#!/usr/bin/env python
+"""
+Fast scene detection through a downscaled proxy stream.
+
+PySceneDetect decodes every frame at full resolution with OpenCV and only
+then scales it down (to about 256 pixels wide) for the detector. For a full
+game at 1080p60 the decode alone is slower than real time. Here FFmpeg
+decodes with all its threads, scales to the detector resolution and pipes
+raw BGR frames straight into AdaptiveDetector.process_frame, optionally
+keeping only every (frame_skip + 1)-th frame.
+
+Every proxy frame carries the number of its source frame, so the cuts, the
+scene list and the StatsManager metrics refer to source frame numbers and
+timecodes, exactly like a full-resolution run.
+
+detect_scenes_parallel splits a long game into frame ranges that are analyzed
+in worker processes and stitched into the result of a sequential run.
+
+Both report every cut through an optional on_cut callback as soon as it is
+final, so later stages can start on the beginning of a game while the rest
+is still being analyzed (see script_scenedetect.detect_and_split).
+"""
+
+import os
+import time
+import logging
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scenedetect
+from scenedetect import FrameTimecode
+
+from utils.pf_probe import get_video_info
+from utils.pf_progress import ProgressReporter, rate_record
+
+logger = logging.getLogger('pf_scene_detect')
+
+# Detector settings of script_scenedetect.scene_detection
+DETECTOR_PARAMS = {
+    'adaptive_threshold': 5,                            # experimental value of 5 seems optimal
+    'window_width': 5,                                  # average [int] frames before/after for running average
+    'min_scene_len': 20,                                # at least 30 frames (0.5 seconds at 60fps)
+    'min_content_val': 15,
+}
+
+# seconds between two progress records of a detection run
+PROGRESS_INTERVAL = 2.0
+
+# PySceneDetect downscales frames to this width before detection by default
+PROXY_WIDTH = 256
+
+
+def make_detector(frame_skip: int = 0, **params) -> scenedetect.AdaptiveDetector:
+    """
+    Create the AdaptiveDetector used for a (proxy) detection run.
+
+    The rolling window counts processed frames, so with frame skipping it is
+    shrunk to cover about the same time span. min_scene_len is compared with
+    source frame numbers and needs no adjustment.
+
+    Args:
+        frame_skip (int): Number of source frames skipped after every processed frame.
+        **params: Detector settings overriding DETECTOR_PARAMS.
+    """
+    settings = dict(DETECTOR_PARAMS, **params)
+    settings['window_width'] = max(1, round(settings['window_width'] / (frame_skip + 1)))
+    return scenedetect.AdaptiveDetector(**settings)
+
+
+def proxy_frame_size(width: int, height: int, proxy_width: int = PROXY_WIDTH) -> Tuple[int, int]:
+    """Return the proxy (width, height) for a source size, never upscaling."""
+    if width <= proxy_width:
+        return width, height
+    return proxy_width, max(1, round(height * proxy_width / width))
+
+
+def iter_proxy_frames(video_path: str, size: Tuple[int, int], fps: float, frame_skip: int = 0,
+                      start_frame: int = 0, num_frames: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Decode a video through FFmpeg into small BGR frames.
+
+    Args:
+        video_path (str): Path to the video file.
+        size (tuple): Proxy (width, height).
+        fps (float): Frame rate of the source, used to seek to start_frame.
+        frame_skip (int): Keep one frame, then skip this many.
+        start_frame (int): First source frame to decode.
+        num_frames (int, optional): Number of source frames to cover (default: until the end).
+
+    Yields:
+        tuple: (source frame number, frame as uint8 array of shape (height, width, 3)).
+    """
+    width, height = size
+    step = frame_skip + 1
+
+    filters = []
+    if step > 1:
+        filters.append(f"select=not(mod(n\\,{step}))")
+    filters.append(f"scale={width}:{height}:flags=bilinear")
+
+    # the deblocking filter makes no difference after downscaling, but costs decode time
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-skip_loop_filter', 'all']
+    if start_frame:
+        # input seeking still decodes from the previous keyframe, so the first
+        # frame out of FFmpeg is exactly start_frame
+        cmd += ['-ss', f"{start_frame / fps:.6f}"]
+    cmd += ['-i', video_path, '-map', '0:v:0', '-vf', ",".join(filters), '-vsync', '0']
+    if num_frames is not None:
+        cmd += ['-frames:v', str((num_frames + step - 1) // step)]
+    cmd += ['-f', 'rawvideo', '-pix_fmt', 'bgr24', 'pipe:1']
+
+    frame_bytes = width * height * 3
+    process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, bufsize=frame_bytes * 4)
+    try:
+        index = 0
+        while True:
+            data = process.stdout.read(frame_bytes)
+            if len(data) < frame_bytes:
+                break
+            yield start_frame + index * step, np.frombuffer(data, np.uint8).reshape(height, width, 3)
+            index += 1
+    finally:
+        process.stdout.close()
+        process.kill()
+        process.wait()
+
+
+def scenes_from_cuts(cut_frames: Sequence[int], start_frame: int, end_frame: int,
+                     fps: float) -> List[Tuple[FrameTimecode, FrameTimecode]]:
+    """
+    Build a PySceneDetect style scene list from cut frame numbers.
+
+    Args:
+        cut_frames (list): Source frame numbers where a new scene starts.
+        start_frame (int): First frame of the analyzed range.
+        end_frame (int): Frame after the last analyzed frame.
+        fps (float): Frame rate of the source.
+
+    Returns:
+        list: (start, end) FrameTimecode pairs; empty if there are no cuts,
+              like SceneManager.get_scene_list().
+    """
+    cuts = sorted(set(frame for frame in cut_frames if start_frame < frame < end_frame))
+    if not cuts:
+        return []
+    boundaries = [start_frame] + cuts + [end_frame]
+    return [(FrameTimecode(start, fps), FrameTimecode(end, fps))
+            for start, end in zip(boundaries[:-1], boundaries[1:])]
+
+
+def detect_cuts_proxy(video_path: str, fps: float, size: Tuple[int, int], frame_skip: int = 0,
+                      start_frame: int = 0, num_frames: Optional[int] = None,
+                      stats_manager: Optional[scenedetect.StatsManager] = None,
+                      detector_params: Optional[Dict[str, Any]] = None,
+                      progress: Optional[ProgressReporter] = None,
+                      total_frames: Optional[int] = None,
+                      on_cut: Optional[Callable[[int], None]] = None) -> Tuple[List[int], int]:
+    """
+    Run the detector over the proxy frames of a frame range.
+
+    With a progress reporter, a 'frames' record (source frames covered, fps,
+    speed, ETA against total_frames) is sent every PROGRESS_INTERVAL seconds.
+    on_cut is called with the frame number of every cut when the detector reports it.
+
+    Returns:
+        tuple: (cut frame numbers, end of the analyzed range as source frame number).
+    """
+    detector = make_detector(frame_skip, **(detector_params or {}))
+    if stats_manager is not None:
+        detector.stats_manager = stats_manager
+        stats_manager.register_metrics(detector.get_metrics())
+
+    cuts = []
+    last_frame = None
+    start = last_report = time.perf_counter()
+    for frame_number, frame in iter_proxy_frames(video_path, size, fps, frame_skip, start_frame, num_frames):
+        timecode = FrameTimecode(frame_number, fps)
+        new_cuts = [cut.frame_num for cut in detector.process_frame(timecode, frame)]
+        if on_cut is not None:
+            for cut in new_cuts:
+                on_cut(cut)
+        cuts += new_cuts
+        last_frame = timecode
+        if progress is not None and time.perf_counter() - last_report >= PROGRESS_INTERVAL:
+            last_report = time.perf_counter()
+            progress.emit('frames', stage='detect',
+                          **rate_record(frame_number - start_frame, total_frames, last_report - start, fps))
+
+    if last_frame is None:
+        return cuts, start_frame
+    new_cuts = [cut.frame_num for cut in detector.post_process(last_frame)]
+    if on_cut is not None:
+        for cut in new_cuts:
+            on_cut(cut)
+    cuts += new_cuts
+    # the skipped frames after the last analyzed one still belong to the range
+    end_frame = last_frame.frame_num + frame_skip + 1
+    if num_frames is not None:
+        end_frame = min(end_frame, start_frame + num_frames)
+    return cuts, end_frame
+
+
+def detect_scenes_proxy(video_path: str, proxy_width: int = PROXY_WIDTH, frame_skip: int = 0,
+                        stats_manager: Optional[scenedetect.StatsManager] = None,
+                        detector_params: Optional[Dict[str, Any]] = None,
+                        progress: Optional[ProgressReporter] = None,
+                        on_cut: Optional[Callable[[int], None]] = None) -> List[Tuple[FrameTimecode, FrameTimecode]]:
+    """
+    Detect the scenes of a video on a downscaled, optionally frame-skipping proxy stream.
+
+    Args:
+        video_path (str): Path to the video file.
+        proxy_width (int): Width of the proxy frames (the default matches PySceneDetect).
+        frame_skip (int): Number of frames skipped after every analyzed frame.
+        stats_manager (StatsManager, optional): Receives the per-frame metrics (source frame numbers).
+        detector_params (dict, optional): Detector settings overriding DETECTOR_PARAMS.
+        progress (ProgressReporter, optional): Receives the detection progress.
+        on_cut (callable, optional): Called with the source frame number of every cut as it is found.
+
+    Returns:
+        list: Scene list of (start, end) FrameTimecode pairs in source frames.
+
+    Raises:
+        ValueError: If the video cannot be probed.
+    """
+    info = get_video_info(video_path)
+    if info is None or not info['fps']:
+        raise ValueError(f"Cannot read the video properties of {video_path}")
+
+    fps = info['fps']
+    size = proxy_frame_size(info['width'], info['height'], proxy_width)
+    logger.info(f"Proxy scene detection at {size[0]}x{size[1]}, frame skip {frame_skip}")
+
+    cuts, end_frame = detect_cuts_proxy(video_path, fps, size, frame_skip, stats_manager=stats_manager,
+                                        detector_params=detector_params, progress=progress,
+                                        total_frames=info['nb_frames'], on_cut=on_cut)
+    if info['nb_frames']:
+        end_frame = min(end_frame, info['nb_frames'])
+    return scenes_from_cuts(cuts, 0, end_frame, fps)
+
+
+def min_scene_len_frames(min_scene_len, fps: float) -> int:
+    # min_scene_len may be given in frames, seconds or as a timecode string
+    if isinstance(min_scene_len, int):
+        return min_scene_len
+    return FrameTimecode(min_scene_len, fps).frame_num
+
+
+def _detect_chunk(video_path: str, fps: float, size: Tuple[int, int], frame_skip: int,
+                  decode_start: int, decode_end: int, own_start: int, own_end: int,
+                  detector_params: Dict[str, Any]) -> Tuple[List[int], Dict[int, Dict[str, float]], int]:
+    # Worker: candidate cuts and metrics of the frames owned by one chunk.
+    # min_scene_len is disabled here (it depends on the previous cut, which may
+    # lie in another chunk) and applied again when the chunks are stitched.
+    stats_manager = scenedetect.StatsManager()
+    params = dict(detector_params, min_scene_len=0)
+    cuts, end_frame = detect_cuts_proxy(video_path, fps, size, frame_skip, decode_start, decode_end - decode_start,
+                                        stats_manager=stats_manager, detector_params=params)
+    end_frame = min(end_frame, own_end)
+
+    keys = sorted(stats_manager.metric_keys)
+    metrics = {}
+    for frame_number in range(own_start, end_frame, frame_skip + 1):
+        values = stats_manager.get_metrics(FrameTimecode(frame_number, fps), keys)
+        frame_metrics = {key: value for key, value in zip(keys, values) if value is not None}
+        if frame_metrics:
+            metrics[frame_number] = frame_metrics
+
+    return [cut for cut in cuts if own_start <= cut < own_end], metrics, end_frame
+
+
+def detect_scenes_parallel(video_path: str, workers: Optional[int] = None, chunks: Optional[int] = None,
+                           proxy_width: int = PROXY_WIDTH, frame_skip: int = 0,
+                           stats_manager: Optional[scenedetect.StatsManager] = None,
+                           detector_params: Optional[Dict[str, Any]] = None,
+                           progress: Optional[ProgressReporter] = None,
+                           on_cut: Optional[Callable[[int], None]] = None) -> List[Tuple[FrameTimecode, FrameTimecode]]:
+    """
+    Detect the scenes of a video in parallel frame ranges (proxy decode per range).
+
+    Every chunk decodes window_width + 1 analyzed frames before its own range
+    and window_width after it, so each owned frame sees exactly the neighbours
+    it has in a sequential run. Workers report every frame that passes the
+    thresholds; min_scene_len is then applied over the whole video in order.
+    The scene list and the merged metrics match detect_scenes_proxy.
+
+    Args:
+        video_path (str): Path to the video file.
+        workers (int, optional): Number of worker processes (default: CPU count).
+        chunks (int, optional): Number of frame ranges (default: one per worker).
+        proxy_width (int): Width of the proxy frames.
+        frame_skip (int): Number of frames skipped after every analyzed frame.
+        stats_manager (StatsManager, optional): Receives the merged per-frame metrics.
+        detector_params (dict, optional): Detector settings overriding DETECTOR_PARAMS.
+        progress (ProgressReporter, optional): Receives a 'frames' record per finished chunk.
+        on_cut (callable, optional): Called with the source frame number of every cut,
+            chunk by chunk in video order.
+
+    Returns:
+        list: Scene list of (start, end) FrameTimecode pairs in source frames.
+
+    Raises:
+        ValueError: If the video cannot be probed.
+    """
+    info = get_video_info(video_path)
+    if info is None or not info['fps']:
+        raise ValueError(f"Cannot read the video properties of {video_path}")
+
+    workers = workers or os.cpu_count() or 1
+    chunks = chunks or workers
+    total_frames = info['nb_frames']
+    if chunks < 2 or not total_frames:
+        return detect_scenes_proxy(video_path, proxy_width, frame_skip, stats_manager, detector_params, progress,
+                                   on_cut)
+
+    fps = info['fps']
+    size = proxy_frame_size(info['width'], info['height'], proxy_width)
+    params = dict(DETECTOR_PARAMS, **(detector_params or {}))
+    step = frame_skip + 1
+    window = make_detector(frame_skip, **params).window_width
+
+    # chunk borders sit on the frame grid of a sequential run (multiples of step)
+    grid_frames = (total_frames + step - 1) // step
+    borders = [round(grid_frames * index / chunks) * step for index in range(chunks + 1)]
+    jobs = []
+    for own_start, own_end in zip(borders[:-1], borders[1:]):
+        if own_end <= own_start:
+            continue
+        decode_start = max(0, own_start - (window + 1) * step)
+        decode_end = own_end + window * step
+        jobs.append((video_path, fps, size, frame_skip, decode_start, decode_end, own_start, own_end, params))
+    logger.info(f"Scene detection in {len(jobs)} chunks on {workers} workers")
+
+    # apply min_scene_len exactly like the detector does in a sequential run; the chunks
+    # come back in video order, so every cut is final as soon as its chunk is done
+    min_scene_len = min_scene_len_frames(params['min_scene_len'], fps)
+    cuts = []
+    last_cut = 0
+    end_frame = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for done_chunks, (candidates, metrics, chunk_end) in enumerate(executor.map(_detect_chunk, *zip(*jobs)), 1):
+            for cut in sorted(candidates):
+                if cut - last_cut >= min_scene_len:
+                    cuts.append(cut)
+                    last_cut = cut
+                    if on_cut is not None:
+                        on_cut(cut)
+            end_frame = max(end_frame, chunk_end)
+            if stats_manager is not None:
+                for frame_number, frame_metrics in metrics.items():
+                    stats_manager.set_metrics(FrameTimecode(frame_number, fps), frame_metrics)
+            if progress is not None:
+                done = sum(own_end - own_start for *_, own_start, own_end, _ in jobs[:done_chunks])
+                progress.emit('frames', stage='detect', chunk=done_chunks, chunks=len(jobs),
+                              **rate_record(done, total_frames, time.perf_counter() - start, fps,
+                                            done_chunks == len(jobs)))
+
+    if stats_manager is not None:
+        stats_manager.register_metrics(make_detector(frame_skip, **params).get_metrics())
+
+    if info['nb_frames']:
+        end_frame = min(end_frame, info['nb_frames'])
+    return scenes_from_cuts(cuts, 0, end_frame, fps)
+
+
+def compare_scene_lists(reference, candidate, tolerance_frames: int = 2) -> Dict[str, Any]:
+    """
+    Compare the scene starts of two scene lists (e.g. full resolution and proxy).
+
+    A reference cut counts as found if the candidate has a cut within
+    tolerance_frames of it (each candidate cut is matched at most once).
+
+    Returns:
+        dict: reference_cuts, candidate_cuts, matched, missed (frame numbers),
+              extra (frame numbers), max_offset, mean_offset (frames), precision and recall.
+    """
+    reference_cuts = sorted(scene[0].frame_num for scene in reference[1:])
+    candidate_cuts = sorted(scene[0].frame_num for scene in candidate[1:])
+
+    unmatched = list(candidate_cuts)
+    offsets = []
+    missed = []
+    for cut in reference_cuts:
+        best = min(unmatched, key=lambda frame: abs(frame - cut), default=None)
+        if best is not None and abs(best - cut) <= tolerance_frames:
+            unmatched.remove(best)
+            offsets.append(best - cut)
+        else:
+            missed.append(cut)
+
+    matched = len(offsets)
+    return {
+        'reference_cuts': len(reference_cuts),
+        'candidate_cuts': len(candidate_cuts),
+        'matched': matched,
+        'missed': missed,
+        'extra': unmatched,
+        'max_offset': max((abs(offset) for offset in offsets), default=0),
+        'mean_offset': sum(abs(offset) for offset in offsets) / matched if matched else 0.0,
+        'precision': matched / len(candidate_cuts) if candidate_cuts else 1.0,
+        'recall': matched / len(reference_cuts) if reference_cuts else 1.0,
+    }
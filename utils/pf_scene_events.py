@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+Play events from detected scenes, in the event model of the splitter.
+
+The scene CSV of script_scenedetect.py lists every scene with its Start
+Time and End Time in seconds, while VideoSplitter cuts Events with Position
+and Duration in milliseconds. This module converts the plays found by the
+play pattern matcher directly into Events, so detection and splitting can be
+chained without a CSV in between.
+
+PlayEventStream does the same for cuts that arrive while the detector is
+still running: every play is turned into an Event as soon as the cut after
+its last scene is known.
+"""
+
+import csv
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from utils.pf_events import Event, EventColumns
+from utils.pf_scene_patterns import PLAY_PATTERNS, PlayMatcher, find_play_groups, scene_arrays
+
+logger = logging.getLogger('pf_scene_events')
+
+# columns of the play events (written by write_play_events)
+EVENT_COLUMNS = ['Name', 'Position', 'Duration', 'Angles']
+
+
+def _pattern(pattern: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return PLAY_PATTERNS[pattern] if isinstance(pattern, str) else pattern
+
+
+def play_event(index: int, scenes: Sequence[Tuple[int, int]], fps: float,
+               pattern: Union[str, Dict[str, Any]] = 'scoreboard',
+               angles: Optional[Sequence[str]] = None) -> Event:
+    """
+    Create the event of one play.
+
+    Args:
+        index (int): Zero-based play number (the event is named "Play <index + 1>").
+        scenes (list): (start frame, end frame) of the scenes of the play, in angle order.
+        fps (float): Frame rate of the video.
+        pattern (str or dict): Play pattern the scenes matched.
+        angles (list, optional): Angles the clip covers (default: all angles of the play).
+            The clip runs from the first to the last of them.
+
+    Returns:
+        Event: Position and Duration in milliseconds, like a row of a Hudl export.
+    """
+    names = _pattern(pattern)['angles']
+    selected = [angle for angle, name in enumerate(names) if angles is None or name in angles]
+    if not selected:
+        raise ValueError(f"None of the angles {list(angles)} is part of the play pattern {names}")
+
+    start_frame = scenes[selected[0]][0]
+    end_frame = scenes[selected[-1]][1]
+    position = round(start_frame * 1000 / fps)
+    row = {
+        'Name': f"Play {index + 1}",
+        'Position': str(position),
+        'Duration': str(round(end_frame * 1000 / fps) - position),
+        'Angles': ", ".join(names[angle] for angle in selected),
+    }
+    return Event(index, row, EventColumns(EVENT_COLUMNS))
+
+
+def play_events(scene_list, pattern: Union[str, Dict[str, Any]] = 'scoreboard',
+                angles: Optional[Sequence[str]] = None) -> List[Event]:
+    """
+    Convert the plays of a PySceneDetect scene list into splitter events.
+
+    Returns:
+        list: One Event per play that matches the pattern, in video order.
+    """
+    fps = scene_arrays(scene_list)[2]
+    events = []
+    for index, group in enumerate(find_play_groups(scene_list, pattern)):
+        scenes = [(scene[0].frame_num, scene[1].frame_num) for scene in group]
+        events.append(play_event(index, scenes, fps, pattern, angles))
+    return events
+
+
+def write_play_events(events: Sequence[Event], csv_path: str) -> None:
+    """Write play events as an event CSV (Position and Duration in milliseconds)."""
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=EVENT_COLUMNS)
+        writer.writeheader()
+        for event in events:
+            writer.writerow(event.row)
+
+
+class PlayEventStream:
+    """
+    Turns cuts into play events while the detection is still running.
+
+    Feed the cut frames in video order with add_cut (e.g. as the on_cut callback
+    of the detectors in utils/pf_scene_detect.py) and call finish with the end of
+    the video. The events are the same as play_events on the final scene list.
+
+    Args:
+        fps (float): Frame rate of the video.
+        pattern (str or dict): Play pattern (see PLAY_PATTERNS).
+        angles (list, optional): Angles the clips cover (see play_event).
+        on_event (callable, optional): Called with every new Event.
+    """
+
+    def __init__(self, fps: float, pattern: Union[str, Dict[str, Any]] = 'scoreboard',
+                 angles: Optional[Sequence[str]] = None, on_event: Optional[Callable[[Event], None]] = None):
+        self.fps = fps
+        self.pattern = pattern
+        self.angles = angles
+        self.on_event = on_event
+        self.events = []
+        self._matcher = PlayMatcher(pattern)
+        self._scenes = []
+        self._last_cut = 0
+
+    def add_cut(self, frame: int) -> List[Event]:
+        """
+        Add the next cut (first frame of a new scene); the scene before it is complete.
+
+        Returns:
+            list: The events of the plays completed by this cut.
+        """
+        if frame <= self._last_cut:
+            # a repeated cut, or a cut at the first frame (which starts no new scene)
+            return []
+        scene = (self._last_cut, frame)
+        self._last_cut = frame
+        return self._add_scene(scene)
+
+    def finish(self, end_frame: int) -> List[Event]:
+        """
+        Close the last scene at the end of the video (like scenes_from_cuts, a video
+        without cuts has no scenes).
+
+        Returns:
+            list: The events of the plays completed by the last scene.
+        """
+        if not self._scenes or end_frame <= self._last_cut:
+            return []
+        scene = (self._last_cut, end_frame)
+        self._last_cut = end_frame
+        return self._add_scene(scene)
+
+    def _add_scene(self, scene):
+        self._scenes.append(scene)
+        new_events = []
+        for group in self._matcher.add_scene((scene[1] - scene[0]) / self.fps):
+            event = play_event(len(self.events), [self._scenes[index] for index in group],
+                               self.fps, self.pattern, self.angles)
+            self.events.append(event)
+            new_events.append(event)
+            logger.info(f"{event['Name']} found at {event.position / 1000:.1f}s ({event.duration / 1000:.1f}s)")
+            if self.on_event is not None:
+                self.on_event(event)
+        return new_events
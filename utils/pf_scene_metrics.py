@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+"""
+Scene detection from cached frame metrics, without decoding the video.
+
+scene_detection stores the per-frame metrics of the StatsManager in
+"<video>_stats.csv". The content detectors only need those numbers to decide
+where the cuts are, so a new threshold or window can be tried by replaying
+the detector logic over the stored metrics instead of decoding the game
+again. The replay is vectorized with NumPy and gives the same cuts as
+AdaptiveDetector on the same metrics.
+
+The CSV is parsed once and kept as "<video>_stats.npz" (columnar, binary),
+keyed by the size and modification time of the video and by the settings of
+the analysis (detector, proxy width and frame skip), so later sweeps load in
+milliseconds and never replay over metrics of another kind of run.
+"""
+
+import os
+import csv
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scenedetect
+from scenedetect import FrameTimecode
+
+from utils.pf_probe import get_video_info
+from utils.pf_scene_detect import DETECTOR_PARAMS, min_scene_len_frames, scenes_from_cuts
+
+logger = logging.getLogger('pf_scene_metrics')
+
+CACHE_VERSION = 2
+
+# the only detector scene_detection runs (and replay_adaptive replays)
+DETECTOR_KIND = 'adaptive'
+
+# ContentDetector score components, in the order the detector sums them
+COMPONENT_KEYS = ['delta_hue', 'delta_sat', 'delta_lum', 'delta_edges']
+CONTENT_KEY = 'content_val'
+
+
+def stats_paths(video_path: str) -> Tuple[str, str]:
+    """Return the (csv, npz) paths of the stats files of a video."""
+    base = os.path.splitext(video_path)[0]
+    return base + "_stats.csv", base + "_stats.npz"
+
+
+def load_stats_csv(stats_file: str) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Read a StatsManager CSV into columns.
+
+    Returns:
+        tuple: (frames, metrics) with the zero-based frame numbers (int64) and one
+               float64 array per metric (NaN where the metric was not set).
+    """
+    with open(stats_file, 'r', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        keys = header[2:]
+        frames = []
+        columns = [[] for _ in keys]
+        for row in reader:
+            if not row:
+                continue
+            frames.append(int(row[0]) - 1)
+            for column, value in zip(columns, row[2:]):
+                column.append(float(value) if value not in ('', 'None') else np.nan)
+
+    return np.array(frames, dtype=np.int64), {key: np.array(column, dtype=np.float64)
+                                              for key, column in zip(keys, columns)}
+
+
+def save_scene_metrics(video_path: str, stats_file: Optional[str] = None, proxy_width: Optional[int] = None,
+                       frame_skip: int = 0, detector: str = DETECTOR_KIND) -> Optional[Dict[str, Any]]:
+    """
+    Convert the stats CSV of a video into the binary cache and return the loaded metrics.
+
+    Args:
+        video_path (str): Path to the video file.
+        stats_file (str, optional): Stats CSV (default: "<video>_stats.csv").
+        proxy_width (int, optional): Proxy width of the analysis (None: full-resolution run).
+        frame_skip (int): Source frames skipped after every analyzed frame.
+        detector (str): Detector that computed the metrics.
+
+    Returns:
+        dict or None: Metrics (see load_scene_metrics), or None if the video cannot be probed
+                      or the stats do not cover the whole video.
+    """
+    csv_path, npz_path = stats_paths(video_path)
+    stats_file = stats_file or csv_path
+    info = get_video_info(video_path)
+    if info is None or not info['fps']:
+        return None
+
+    frames, metrics = load_stats_csv(stats_file)
+    if CONTENT_KEY not in metrics or not len(frames):
+        logger.info(f"{stats_file} has no frame scores")
+        return None
+    step = int(np.diff(frames).min()) if len(frames) > 1 else 1
+    if info['nb_frames'] and abs(int(frames[-1]) + 1 - info['nb_frames']) > step:
+        # stats of a partial run (or of another file with the same name)
+        logger.info(f"{stats_file} does not cover the whole video")
+        return None
+
+    stat = os.stat(video_path)
+    meta = {
+        'version': CACHE_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'fps': info['fps'],
+        'nb_frames': info['nb_frames'],
+        'detector': detector,
+        'proxy_width': proxy_width,
+        'frame_skip': frame_skip,
+    }
+
+    tmp_path = npz_path + ".tmp.npz"
+    np.savez(tmp_path, frames=frames, meta=np.array(json.dumps(meta)),
+             **{f"metric:{key}": values for key, values in metrics.items()})
+    os.replace(tmp_path, npz_path)
+    return _metrics_dict(frames, metrics, meta)
+
+
+def _metrics_dict(frames: np.ndarray, metrics: Dict[str, np.ndarray], meta: Dict[str, Any]) -> Dict[str, Any]:
+    # The first analyzed frame has no score (nothing to compare with), so it has
+    # no row in the stats file. Add it back with a score of 0, like the detector.
+    steps = np.diff(frames)
+    step = int(steps.min()) if len(steps) else 1
+    if len(frames) and frames[0] > 0:
+        frames = np.concatenate(([frames[0] - step], frames))
+        metrics = {key: np.concatenate(([np.nan], values)) for key, values in metrics.items()}
+
+    end_frame = int(frames[-1]) + step if len(frames) else 0
+    if meta.get('nb_frames'):
+        end_frame = min(end_frame, meta['nb_frames'])
+
+    return {'frames': frames, 'metrics': metrics, 'fps': meta['fps'], 'step': step, 'end_frame': end_frame}
+
+
+def load_scene_metrics(video_path: str, proxy_width: Optional[int] = None, frame_skip: int = 0,
+                       detector: str = DETECTOR_KIND) -> Optional[Dict[str, Any]]:
+    """
+    Load the cached frame metrics of a video if they match the current file and analysis.
+
+    The binary cache is used if its size and mtime match the video and it was
+    computed with the same detector, proxy width and frame skip; any other
+    cache is a miss. Without a binary cache, a stats CSV that is newer than
+    the video and covers all its frames is converted, but only for a
+    full-resolution request: the CSV does not record its settings, and every
+    proxy run writes the binary cache next to it.
+
+    Args:
+        video_path (str): Path to the video file.
+        proxy_width (int, optional): Proxy width of the analysis (None: full-resolution run).
+        frame_skip (int): Source frames skipped after every analyzed frame.
+        detector (str): Detector that computed the metrics.
+
+    Returns:
+        dict or None: frames (analyzed frame numbers), metrics (column arrays),
+                      fps, step (frames between analyzed frames) and end_frame,
+                      or None if there are no usable metrics.
+    """
+    csv_path, npz_path = stats_paths(video_path)
+    stat = os.stat(video_path)
+
+    if os.path.exists(npz_path):
+        try:
+            with np.load(npz_path) as data:
+                meta = json.loads(str(data['meta']))
+                if (meta.get('version') == CACHE_VERSION and meta.get('size') == stat.st_size and
+                        meta.get('mtime_ns') == stat.st_mtime_ns):
+                    if (meta.get('detector'), meta.get('proxy_width'), meta.get('frame_skip')) == \
+                            (detector, proxy_width, frame_skip):
+                        metrics = {key[len("metric:"):]: data[key] for key in data.files
+                                   if key.startswith("metric:")}
+                        return _metrics_dict(data['frames'], metrics, meta)
+                    logger.info(f"Metrics cache {npz_path} is of another analysis "
+                                f"({meta.get('detector')}, proxy width {meta.get('proxy_width')}, "
+                                f"frame skip {meta.get('frame_skip')})")
+                    return None
+            logger.info(f"Metrics cache {npz_path} does not match the video")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not read metrics cache {npz_path}: {e}")
+
+    if proxy_width is not None or frame_skip or detector != DETECTOR_KIND:
+        return None
+    if not os.path.exists(csv_path) or os.path.getmtime(csv_path) < stat.st_mtime:
+        return None
+
+    return save_scene_metrics(video_path, csv_path)
+
+
+def content_scores(metrics: Dict[str, Any], weights: Optional[Sequence[float]] = None) -> np.ndarray:
+    """
+    Return the frame scores (content_val) of the analyzed frames.
+
+    With weights, the scores are recomputed from the stored components the same
+    way ContentDetector does; otherwise the stored content_val is used.
+    """
+    columns = metrics['metrics']
+    if weights is None or list(weights) == list(scenedetect.ContentDetector.DEFAULT_COMPONENT_WEIGHTS):
+        scores = columns[CONTENT_KEY]
+    else:
+        scores = 0
+        for key, weight in zip(COMPONENT_KEYS, weights):
+            component = columns.get(key)
+            scores = scores + (component * weight if component is not None else 0.0)
+        scores = scores / sum(abs(weight) for weight in weights)
+    return np.nan_to_num(scores, nan=0.0)
+
+
+def replay_adaptive(metrics: Dict[str, Any], **params) -> List[Tuple[FrameTimecode, FrameTimecode]]:
+    """
+    Re-run AdaptiveDetector over cached metrics.
+
+    Args:
+        metrics (dict): Metrics from load_scene_metrics.
+        **params: AdaptiveDetector settings (adaptive_threshold, window_width,
+                  min_scene_len, min_content_val, weights) overriding DETECTOR_PARAMS.
+
+    Returns:
+        list: Scene list of (start, end) FrameTimecode pairs.
+    """
+    settings = dict(DETECTOR_PARAMS, **params)
+    frames = metrics['frames']
+    scores = content_scores(metrics, settings.get('weights'))
+    # the window counts analyzed frames (see make_detector for frame skipping)
+    window = max(1, round(settings['window_width'] / metrics['step']))
+    count = len(scores)
+    if count < 2 * window + 1:
+        return []
+
+    targets = np.arange(window, count - window)
+    target_scores = scores[targets]
+    # add the neighbours in the same order as the detector, for bit-identical averages
+    window_sum = np.zeros(len(targets))
+    for offset in range(-window, window + 1):
+        if offset:
+            window_sum = window_sum + scores[targets + offset]
+    average = window_sum / (2.0 * window)
+
+    min_content_val = settings['min_content_val']
+    average_is_zero = np.abs(average) < 0.00001
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(average_is_zero, 0.0, np.minimum(target_scores / average, 255.0))
+    ratio = np.where(average_is_zero & (target_scores >= min_content_val), 255.0, ratio)
+
+    above = (ratio >= settings['adaptive_threshold']) & (target_scores >= min_content_val)
+    candidates = frames[targets[above]]
+
+    min_scene_len = min_scene_len_frames(settings['min_scene_len'], metrics['fps'])
+    cuts = []
+    last_cut = int(frames[0])
+    for cut in candidates:
+        if cut - last_cut >= min_scene_len:
+            cuts.append(int(cut))
+            last_cut = int(cut)
+
+    return scenes_from_cuts(cuts, int(frames[0]), metrics['end_frame'], metrics['fps'])
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+Play pattern matching on detected scene lists.
+
+A broadcast or Hudl-style feed shows every play as a fixed sequence of camera
+angles, e.g. a short scoreboard shot followed by All-22 and Endzone views of
+about the same length. The matcher works on the start/end frame arrays of a
+scene list: every rule of a pattern is evaluated for all positions at once
+with NumPy, and the matching positions are then taken greedily from the
+start, so the returned play groups never share a scene. This stays fast for
+season-long scene lists with tens of thousands of cuts.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+# Angle sequences of the feeds we get. Durations are in seconds (None = no limit);
+# the scenes listed in same_length must not differ by more than
+# max_duration_difference (relative to the shorter one).
+PLAY_PATTERNS = {
+    'scoreboard': {
+        'angles': ["Score Board", "All 22", "Endzone"],
+        'min_duration': [None, None, None],
+        'max_duration': [2.5, None, None],
+        'same_length': [1, 2],
+        'max_duration_difference': 0.3,
+    },
+    'two_angle': {
+        'angles': ["All 22", "Endzone"],
+        'min_duration': [None, None],
+        'max_duration': [None, None],
+        'same_length': [0, 1],
+        'max_duration_difference': 0.3,
+    },
+}
+
+
+def scene_arrays(scene_list) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Convert a PySceneDetect scene list into frame arrays.
+
+    Returns:
+        tuple: (start frames, end frames, fps); fps is 0.0 for an empty list.
+    """
+    if not scene_list:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), 0.0
+    starts = np.fromiter((scene[0].frame_num for scene in scene_list), dtype=np.int64, count=len(scene_list))
+    ends = np.fromiter((scene[1].frame_num for scene in scene_list), dtype=np.int64, count=len(scene_list))
+    return starts, ends, float(scene_list[0][0].framerate)
+
+
+def match_play_pattern(durations: np.ndarray, pattern: Union[str, Dict[str, Any]] = 'scoreboard') -> np.ndarray:
+    """
+    Find the non-overlapping groups of consecutive scenes that match a play pattern.
+
+    Args:
+        durations (ndarray): Scene durations in seconds, in scene order.
+        pattern (str or dict): Name in PLAY_PATTERNS or a pattern dictionary.
+
+    Returns:
+        ndarray: Scene indices of shape (groups, len(angles)); row g holds the
+                 scenes of play g in angle order.
+    """
+    if isinstance(pattern, str):
+        pattern = PLAY_PATTERNS[pattern]
+    size = len(pattern['angles'])
+    durations = np.asarray(durations, dtype=np.float64)
+    positions = len(durations) - size + 1
+    if positions <= 0:
+        return np.zeros((0, size), dtype=np.int64)
+
+    # column j holds the duration of the j-th scene of the group starting at each position
+    window = np.lib.stride_tricks.sliding_window_view(durations, size)
+    matches = np.ones(positions, dtype=bool)
+
+    for column, (low, high) in enumerate(zip(pattern['min_duration'], pattern['max_duration'])):
+        if low is not None:
+            matches &= window[:, column] >= low
+        if high is not None:
+            matches &= window[:, column] < high
+
+    same_length = pattern.get('same_length') or []
+    for first, second in zip(same_length[:-1], same_length[1:]):
+        a = window[:, first]
+        b = window[:, second]
+        matches &= np.abs(a - b) <= pattern['max_duration_difference'] * np.minimum(a, b)
+
+    # take matches from the start; a group blocks the next size - 1 positions
+    groups = []
+    next_free = 0
+    for position in np.flatnonzero(matches):
+        if position >= next_free:
+            groups.append(position)
+            next_free = position + size
+
+    starts = np.array(groups, dtype=np.int64)
+    return starts[:, None] + np.arange(size, dtype=np.int64)
+
+
+def find_play_groups(scene_list, pattern: Union[str, Dict[str, Any]] = 'scoreboard') -> List[List[Tuple[Any, Any]]]:
+    """
+    Group a PySceneDetect scene list into plays that follow a pattern.
+
+    Returns:
+        list: One list of scenes per play, in angle order (see PLAY_PATTERNS).
+    """
+    starts, ends, fps = scene_arrays(scene_list)
+    if not fps:
+        return []
+    groups = match_play_pattern((ends - starts) / fps, pattern)
+    return [[scene_list[index] for index in group] for group in groups.tolist()]
+
+
+def play_group_labels(groups: Sequence[Sequence[Any]], pattern: Union[str, Dict[str, Any]] = 'scoreboard',
+                      first_play: int = 1) -> List[Tuple[str, str]]:
+    """Return (play name, angle) for every scene of the play groups, in order."""
+    if isinstance(pattern, str):
+        pattern = PLAY_PATTERNS[pattern]
+    return [(f"Play {play}", angle)
+            for play, group in enumerate(groups, start=first_play)
+            for angle, _ in zip(pattern['angles'], group)]
+
+
+class PlayMatcher:
+    """
+    Incremental version of match_play_pattern for scenes that arrive one at a time.
+
+    A play is reported as soon as its last scene is complete. The groups are
+    the same as those of match_play_pattern over the whole list, since the
+    greedy matching only looks at the scenes of a position and at earlier matches.
+
+    Args:
+        pattern (str or dict): Name in PLAY_PATTERNS or a pattern dictionary.
+    """
+
+    def __init__(self, pattern: Union[str, Dict[str, Any]] = 'scoreboard'):
+        self.pattern = PLAY_PATTERNS[pattern] if isinstance(pattern, str) else pattern
+        self.size = len(self.pattern['angles'])
+        self.durations = []
+        self._next_position = 0
+
+    def add_scene(self, duration: float) -> List[List[int]]:
+        """
+        Add the duration (seconds) of the next complete scene.
+
+        Returns:
+            list: Scene indices of the plays completed by this scene (zero or one group).
+        """
+        self.durations.append(duration)
+        groups = []
+        while self._next_position + self.size <= len(self.durations):
+            window = self.durations[self._next_position:self._next_position + self.size]
+            if len(match_play_pattern(window, self.pattern)):
+                groups.append(list(range(self._next_position, self._next_position + self.size)))
+                self._next_position += self.size
+            else:
+                self._next_position += 1
+        return groups
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Core budget planning for concurrent x264 encodes.
+
+Every libx264 instance starts a thread pool sized to all cores, so a few
+parallel re-encodes oversubscribe the machine many times over. The planner
+splits a core budget into N concurrent jobs with T threads each (N * T <=
+budget) and passes T to FFmpeg and x264.
+
+Which split is best depends on the clips: a short play spends much of its
+time in fixed costs (process start, seeking, filling the lookahead) that
+extra threads do not shorten, so many single-threaded jobs win; a few long
+clips are better served by fewer jobs with more threads each. The planner
+models the encode time of each clip as
+
+    startup + thread_startup * T + duration * cost * ((1 - p) + p / T)
+
+(Amdahl's law with parallel fraction p), simulates the worker pool on the
+actual clip list in queue order, and picks the split with the shortest
+total time, i.e. the most clips per minute.
+"""
+
+import heapq
+import os
+from typing import Any, Dict, Optional, Sequence, Union
+
+# Encode time model (seconds); calibrate with benchmarks/bench_encoding_profiles.py
+ENCODE_MODEL = {
+    'startup': 0.5,             # per FFmpeg run: process start, input seek, lookahead fill
+    'thread_startup': 0.03,     # per thread: frame-thread pipeline fill and teardown
+    'parallel_fraction': 0.92,  # share of the encoding work that scales with threads
+}
+
+# pixel rate the profile costs refer to (1080p30)
+REFERENCE_PIXEL_RATE = 1920 * 1080 * 30
+
+
+def encode_cost(profile_cost: float, video_info: Optional[Dict[str, Any]] = None) -> float:
+    """
+    Single-thread encoding seconds per second of source for a profile and source.
+
+    Args:
+        profile_cost (float): Cost of the profile for 1080p30 sources (see ENCODING_PROFILES).
+        video_info (dict, optional): Probe info of the source (width, height, fps) to scale the cost.
+    """
+    if not video_info or not video_info.get('width') or not video_info.get('fps'):
+        return profile_cost
+    pixel_rate = video_info['width'] * video_info['height'] * video_info['fps']
+    return profile_cost * pixel_rate / REFERENCE_PIXEL_RATE
+
+
+def encode_time(duration: float, threads: int, cost: float, model: Optional[Dict[str, float]] = None) -> float:
+    """Estimated wall time of one encode of a clip of the given duration (seconds)."""
+    model = dict(ENCODE_MODEL, **(model or {}))
+    parallel = model['parallel_fraction']
+    return (model['startup'] + model['thread_startup'] * threads +
+            duration * cost * ((1.0 - parallel) + parallel / threads))
+
+
+def simulate_makespan(times: Sequence[float], jobs: int) -> float:
+    """Total time of running tasks in queue order on a pool of `jobs` workers."""
+    workers = [0.0] * max(1, jobs)
+    for task_time in times:
+        # the next task starts on the worker that becomes free first
+        heapq.heapreplace(workers, workers[0] + task_time)
+    return max(workers)
+
+
+def lookahead_threads(threads: int) -> int:
+    """x264 lookahead threads for an encoder with the given number of threads."""
+    return max(1, threads // 4)
+
+
+def x265_frame_threads(threads: int) -> int:
+    """x265 frame threads for a thread pool of the given size (x265's own defaults per core count)."""
+    for cores, frame_threads in ((32, 6), (16, 5), (8, 3), (4, 2)):
+        if threads >= cores:
+            return frame_threads
+    return 1
+
+
+def plan_encodes(durations: Sequence[float], core_budget: Optional[int] = None,
+                 cost: Union[float, Sequence[float]] = 1.0, model: Optional[Dict[str, float]] = None, jobs: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Choose the number of concurrent encodes and threads per encode.
+
+    Args:
+        durations (list): Durations of the clips to encode (seconds), in queue order.
+        core_budget (int, optional): Cores shared by all encodes (default: all cores).
+        cost (float or list): Single-thread encoding seconds per second of source (see encode_cost),
+            for all clips or one per clip (clips of sources with different resolutions or frame rates).
+        model (dict, optional): Overrides of ENCODE_MODEL.
+        jobs (int, optional): Fixed number of concurrent encodes; only the threads are chosen.
+
+    Returns:
+        dict: jobs, threads, lookahead_threads, makespan (estimated seconds),
+              clips_per_minute and candidates (one dict per evaluated split).
+    """
+    budget = max(1, int(core_budget or os.cpu_count() or 1))
+    count = len(durations)
+    costs = [cost] * count if isinstance(cost, (int, float)) else list(cost)
+    if len(costs) != count:
+        raise ValueError(f"Expected {count} clip costs, got {len(costs)}")
+    candidates = []
+
+    thread_options = [max(1, budget // jobs)] if jobs else range(1, budget + 1)
+    for threads in thread_options:
+        concurrent = jobs or budget // threads
+        # more workers than clips would only sit idle
+        concurrent = max(1, min(concurrent, count or 1))
+        times = [encode_time(duration, threads, clip_cost, model) for duration, clip_cost in zip(durations, costs)]
+        makespan = simulate_makespan(times, concurrent)
+        candidates.append({
+            'jobs': concurrent,
+            'threads': threads,
+            'makespan': makespan,
+            'clips_per_minute': count * 60.0 / makespan if makespan else 0.0,
+        })
+
+    # shortest total time; on a tie, the split with fewer threads per job
+    best = min(candidates, key=lambda candidate: (round(candidate['makespan'], 6), candidate['threads']))
+    return dict(best, lookahead_threads=lookahead_threads(best['threads']), candidates=candidates)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""
+Exact cumulative timeline for concatenated clips.
+
+Summing the float stream durations of the clips drifts away from the real
+timestamps of the concatenated video, because the concat demuxer offsets
+each file by its own (differently rounded) duration. This module measures
+every clip in integer timebase units from its video packets, converts the
+clip length to the integer microseconds the concat demuxer works in, and
+writes exactly those durations into the concat list. The demuxer then uses
+the same numbers we used to compute the clip offsets, so the offsets in
+clip_times.csv match the concatenated video without accumulating drift.
+"""
+
+import csv
+import logging
+import subprocess
+from fractions import Fraction
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from utils.pf_media import MediaSource
+
+logger = logging.getLogger('pf_timeline')
+
+# The concat demuxer keeps file durations and offsets in AV_TIME_BASE units
+AV_TIME_BASE = 1000000
+
+
+def _us_to_ms(microseconds: int) -> int:
+    # round half up, like FFmpeg's own timestamp rescaling
+    return (microseconds + 500) // 1000
+
+
+def scan_packets(video_path: str, backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Measure the video stream of a clip from its packet timestamps and durations.
+
+    Args:
+        video_path (str): Path to the clip.
+        backend (str, optional): Media backend of utils/pf_media.py (default: PyAV if installed).
+
+    Returns:
+        dict: time_base (Fraction), start_pts and end_pts (timebase units, end is the
+              largest pts + duration) and nb_packets.
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails (ffmpeg backend).
+        ValueError: If the clip has no video packets.
+    """
+    start_pts = end_pts = None
+    nb_packets = 0
+    with MediaSource(video_path, backend) as source:
+        time_base = source.info['time_base']
+        for packet in source.read_packets():
+            if packet.pts is None:
+                continue
+            start_pts = packet.pts if start_pts is None else min(start_pts, packet.pts)
+            end_pts = packet.pts + packet.duration if end_pts is None else max(end_pts, packet.pts + packet.duration)
+            nb_packets += 1
+
+    if time_base is None or not nb_packets:
+        raise ValueError(f"No video packets found in {video_path}")
+
+    return {'time_base': Fraction(time_base), 'start_pts': start_pts, 'end_pts': end_pts, 'nb_packets': nb_packets}
+
+
+def build_timeline(file_list: List[str], workers: int = 8) -> List[Dict[str, Any]]:
+    """
+    Build the cumulative timeline of a list of clips in concatenation order.
+
+    Args:
+        file_list (list): Clip paths in the order they will be concatenated.
+        workers (int): Number of clips scanned concurrently.
+
+    Returns:
+        list: One entry per clip with file, name ("play N"), nb_packets,
+              duration_us / start_us (integer microseconds, as used by the
+              concat demuxer) and duration_ms / start_ms (rounded milliseconds).
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        scans = list(executor.map(scan_packets, file_list))
+
+    timeline = []
+    start_us = 0
+    for index, (file, scan) in enumerate(zip(file_list, scans)):
+        duration_ts = scan['end_pts'] - scan['start_pts']
+        duration_us = round(duration_ts * scan['time_base'] * AV_TIME_BASE)
+        timeline.append({
+            'file': file,
+            'name': "play " + str(index + 1),
+            'nb_packets': scan['nb_packets'],
+            'start_us': start_us,
+            'duration_us': duration_us,
+            'start_ms': _us_to_ms(start_us),
+            'duration_ms': _us_to_ms(duration_us),
+        })
+        start_us += duration_us
+
+    return timeline
+
+
+def write_concat_list(timeline: List[Dict[str, Any]], list_path: str) -> None:
+    """
+    Write a concat demuxer list with an exact duration directive per clip.
+
+    Args:
+        timeline (list): Timeline from build_timeline.
+        list_path (str): Path of the list file to write.
+    """
+    with open(list_path, "w") as output:
+        for entry in timeline:
+            # quotes in file names are escaped as '\'' for the concat demuxer
+            file = entry['file'].replace("'", "'\\''")
+            seconds, micros = divmod(entry['duration_us'], AV_TIME_BASE)
+            output.write(f"file '{file}'\n")
+            output.write(f"duration {seconds}.{micros:06d}\n")
+
+
+def write_timeline_csv(timeline: List[Dict[str, Any]], csv_path: str) -> None:
+    """
+    Write clip_times.csv for Dartfish with Position and Duration in milliseconds.
+
+    Args:
+        timeline (list): Timeline from build_timeline.
+        csv_path (str): Path of the CSV file to write.
+    """
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Name', 'Position', 'Duration'])
+        for entry in timeline:
+            writer.writerow([entry['name'], entry['start_ms'], entry['duration_ms']])
+
+
+def verify_timeline(timeline: List[Dict[str, Any]], concatenated_path: str) -> List[Dict[str, Any]]:
+    """
+    Probe the concatenated video and report how far each clip start drifted.
+
+    The first frame of clip N is the frame that follows all packets of clips
+    1..N-1 in presentation order. Its timestamp in the concatenated video is
+    compared with the start written to clip_times.csv.
+
+    Args:
+        timeline (list): Timeline from build_timeline.
+        concatenated_path (str): Path to the concatenated video.
+
+    Returns:
+        list: One entry per clip with name, expected_ms, actual_ms (None if the
+              output has fewer frames than expected) and drift_ms.
+    """
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time',
+        '-of', 'csv=p=0',
+        concatenated_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    pts_times = sorted(float(line) for line in result.stdout.split() if line not in ('', 'N/A'))
+    first_pts = pts_times[0] if pts_times else 0.0
+
+    report = []
+    packet_index = 0
+    for entry in timeline:
+        actual_ms: Optional[float] = None
+        drift_ms: Optional[float] = None
+        if packet_index < len(pts_times):
+            actual_ms = (pts_times[packet_index] - first_pts) * 1000
+            drift_ms = actual_ms - entry['start_ms']
+        report.append({
+            'name': entry['name'],
+            'expected_ms': entry['start_ms'],
+            'actual_ms': actual_ms,
+            'drift_ms': drift_ms,
+        })
+        packet_index += entry['nb_packets']
+
+    if len(pts_times) != packet_index:
+        logger.warning(f"Concatenated video has {len(pts_times)} packets, the clips have {packet_index}")
+    return report
+
+
+def print_drift_report(report: List[Dict[str, Any]]) -> None:
+    """Print the per-clip drift of verify_timeline and the largest deviation."""
+    for entry in report:
+        if entry['drift_ms'] is None:
+            print(f"{entry['name']:>10}: expected {entry['expected_ms']} ms, missing in output")
+        else:
+            print(f"{entry['name']:>10}: expected {entry['expected_ms']} ms, "
+                  f"actual {entry['actual_ms']:.1f} ms, drift {entry['drift_ms']:+.1f} ms")
+
+    drifts = [abs(entry['drift_ms']) for entry in report if entry['drift_ms'] is not None]
+    if drifts:
+        print(f"Largest drift: {max(drifts):.1f} ms over {len(report)} clips")
@@ -13,10 +13,14 @@ Date: [Current Date]
 """
 
 import os
-import csv
+import re
 import subprocess
 import logging
-from typing import List, Dict, Optional, Tuple, Any
+import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterator, Optional, Tuple, Any
 
 # Configure logging
 logging.basicConfig(
@@ -27,7 +31,17 @@ logger = logging.getLogger('video_splitter')
 
 # Import helper functions
 from utils.pf_helpers import select_folder, select_file
-from utils.pf_create_dartclip import create_dartclip
+from utils.pf_create_dartclip import create_dartclips
+from utils.pf_events import Event, as_event, iter_events, read_events
+from utils.pf_manifest import SplitManifest, event_hash, probe_duration
+from utils.pf_probe import default_cache as default_probe_cache, get_video_info
+from utils.pf_encoding import DEFAULT_PROFILE, encoder_args, get_profile
+from utils.pf_scheduler import encode_cost, plan_encodes
+from utils.pf_progress import ProgressReporter, run_ffmpeg
+from utils.pf_media import MediaSource, resolve_backend
+from utils.pf_follow import EventTail, RecordingWatcher
+from utils.pf_keyframes import (load_keyframe_index, update_keyframe_index, keyframe_at_or_before,
+                                keyframe_after, is_keyframe, SEEK_EPSILON)
 
 
 class VideoSplitter:
@@ -59,6 +73,26 @@ class VideoSplitter:
                 - time_offset (float): Offset to apply to event times
                 - buffer (float): Extra time to add to the end of each clip in seconds
                 - start_number (int): Starting number for clip filename enumeration
+                - workers (int): Number of clips cut concurrently (0 or None = one per CPU core;
+                  when re-encoding, 0 or None lets the scheduler choose jobs and threads)
+                - split_mode (str): 'per_clip' (one FFmpeg run per clip) or 'single_pass'
+                  (one FFmpeg run that reads the source once for a batch of clips)
+                - single_pass_batch (int): Maximum number of clips written by one single-pass run
+                - keyframe_align (bool): Start copied clips exactly on the keyframe at or before
+                  the event, using the cached keyframe index of the source
+                - smart_cut (bool): Re-encode only the part before the first keyframe of a copied
+                  clip and stream-copy the rest (H.264 sources, per-clip mode)
+                - resume (bool): Skip clips that the job manifest of the clips folder records as
+                  complete for the same event and parameters
+                - profile (str or dict): Encoding profile for re-encoded clips (see utils/pf_encoding.py)
+                - video_filters (list): Video filters replacing those of the profile (e.g. another crop)
+                - core_budget (int): Cores shared by concurrent re-encodes (None = all cores)
+                - threads_per_job (int): Encoder threads per re-encode (None = from the core budget)
+                - progress (ProgressReporter): Receives FFmpeg progress, a record per clip and the
+                  stage timings (see utils/pf_progress.py); None = stage timings only
+                - media_backend (str): 'pyav' writes copied clips in-process from a source kept open
+                  per worker, starting on the keyframe at or before the event (per-clip mode, needs
+                  PyAV; see utils/pf_media.py); None = one FFmpeg process per clip
         """
         # Default configuration
         self.config = {
@@ -69,15 +103,37 @@ class VideoSplitter:
             'time_offset': 0,        # Offset to apply to event times
             'buffer': 0.5,           # 500ms buffer at the end of each clip
             'start_number': 1,       # Starting number for clip filenames
+            'workers': 1,            # Number of FFmpeg clip jobs run concurrently
+            'split_mode': 'per_clip',  # 'per_clip' or 'single_pass'
+            'single_pass_batch': 50,   # Clips written per single-pass FFmpeg run
+            'keyframe_align': False, # Snap copied clips to the keyframe index
+            'smart_cut': False,      # Re-encode only the GOP fragment before the first keyframe
+            'resume': True,          # Skip clips completed by an earlier run (job manifest)
+            'profile': DEFAULT_PROFILE,  # Encoding profile used when re-encoding
+            'video_filters': None,   # None = the filters of the profile
+            'core_budget': None,     # Cores shared by concurrent re-encodes (None = all)
+            'threads_per_job': None, # Encoder threads per re-encode (None = planned)
+            'progress': None,        # ProgressReporter for progress records and stage timings
+            'media_backend': None,   # 'pyav' = copy clips in-process, None = FFmpeg per clip
         }
         
         # Update with provided configuration
         if config:
             self.config.update(config)
+        self.progress = self.config['progress'] or ProgressReporter()
+        if self.config['media_backend']:
+            resolve_backend(self.config['media_backend'])
+        # opened sources of the in-process copy, one per worker thread and source video
+        self._media_local = threading.local()
+        self._media_lock = threading.Lock()
+        self._media_sources = []
+        # recordings followed by follow_video: path -> probe info of the first poll and the
+        # keyframe index, kept in memory and extended as the file grows
+        self._live_sources = {}
             
         logger.info("VideoSplitter initialized with config: %s", self.config)
     
-    def extract_events(self, csv_path: str) -> List[Dict[str, str]]:
+    def extract_events(self, csv_path: str) -> List[Event]:
         """
         Extract events data from a CSV file.
         
@@ -85,7 +141,8 @@ class VideoSplitter:
             csv_path (str): Path to the CSV file containing event data.
             
         Returns:
-            list: List of dictionaries where each dictionary represents an event.
+            list: List of Event records (read-only, dictionary-like rows with
+                  Position and Duration parsed to milliseconds).
             
         Raises:
             ValueError: If required columns are missing from the CSV file.
@@ -93,27 +150,8 @@ class VideoSplitter:
         """
         logger.info(f"Extracting events from {csv_path}")
         
-        if not os.path.exists(csv_path):
-            raise FileNotFoundError(f"CSV file not found: {csv_path}")
-            
-        events = []
-        
         try:
-            with open(csv_path, 'r', encoding="utf-8-sig") as file:
-                reader = csv.DictReader(file)
-                
-                # Check if the required columns exist in the CSV file (case-insensitive)
-                required_columns = ['Position', 'Duration']
-                field_names_lower = [field.lower() for field in reader.fieldnames]
-                missing_columns = [col for col in required_columns if col.lower() not in field_names_lower]
-                
-                if missing_columns:
-                    raise ValueError(f"Required columns {missing_columns} not found in the CSV file.")
-                
-                # Iterate over each row in the CSV file
-                for row in reader:
-                    events.append(row)
-        
+            events = read_events(csv_path)
         except Exception as e:
             logger.error(f"Error extracting events: {e}")
             raise
@@ -121,55 +159,140 @@ class VideoSplitter:
         logger.info(f"Extracted {len(events)} events")
         return events
     
-    def split_video(self, video_path: str, events: List[Dict[str, str]], output_folder: Optional[str] = None) -> str:
+    def iter_events(self, csv_path: str) -> Iterator[Event]:
+        """
+        Stream the events of a CSV file without reading the whole file into memory.
+        
+        Args:
+            csv_path (str): Path to the CSV file containing event data.
+            
+        Yields:
+            Event: One event per data row, in file order.
+            
+        Raises:
+            ValueError: If required columns are missing from the CSV file.
+            FileNotFoundError: If the CSV file does not exist.
+        """
+        logger.info(f"Streaming events from {csv_path}")
+        return iter_events(csv_path)
+    
+    def split_video(self, video_path: str, events: List[Dict[str, str]], output_folder: Optional[str] = None,
+                    start_number: Optional[int] = None) -> Dict[str, Any]:
         """
         Split a video file into clips based on event timestamps.
         
+        The per-clip FFmpeg jobs are scheduled on a pool of ``workers`` threads
+        (see the configuration). With a single worker the clips are cut one after
+        another, exactly as before. With ``split_mode='single_pass'`` the source is
+        read once per batch of clips instead of once per clip.
+        
+        Every clip is recorded in the job manifest of the clips folder. With ``resume``
+        a rerun skips the clips that are complete and unchanged, and cuts only the
+        missing, failed or changed ones.
+        
         Args:
             video_path (str): Path to the video file.
-            events (list): List of events with timing information.
+            events (list): List of events with timing information (Event records or row dictionaries).
             output_folder (str, optional): Path to the output folder. If None, a folder selection dialog will open.
+            start_number (int, optional): Number of the first clip of this call (default: the
+                start_number of the configuration), e.g. to cut the plays of a game in several calls.
             
         Returns:
-            str: Path to the folder containing the generated clips.
+            dict: Summary of the run with the keys:
+                - output_folder (str): Path to the folder containing the generated clips
+                - clips_created (int): Number of clips written successfully
+                - clips_skipped (int): Number of clips reused from an earlier run
+                - clips_failed (int): Number of clips that could not be written
+                - wall_time (float): Total time spent splitting in seconds
+                - split_mode (str): The split mode that was used
+                - clips (list): One dict per clip in Play_NNN order with the keys
+                  clip_number, angle (None for a single video), output_file, status
+                  ('created', 'skipped' or 'failed'), wall_time (seconds) and error (None on success;
+                  for a skipped clip, the reason if the event lies outside the recording)
+                - stage_times (dict): Seconds and runs per stage of this splitter
+                  (dartclips, keyframe_index, clips)
+            Returns None if no output folder was selected.
             
         Raises:
             FileNotFoundError: If the video file does not exist.
             ValueError: If events list is empty.
-            subprocess.CalledProcessError: If FFmpeg command fails.
         """
         logger.info(f"Splitting video {video_path}")
         
+        # Verify video file exists
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        
+        file_name = os.path.splitext(os.path.basename(video_path))[0]
+        sources = [{'angle': None, 'video': video_path, 'offset': 0.0}]
+        return self._split_sources(sources, events, output_folder, start_number, file_name)
+    
+    def split_angles(self, sources: List[Dict[str, Any]], events: List[Dict[str, str]],
+                     output_folder: Optional[str] = None, start_number: Optional[int] = None,
+                     name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Split the recordings of several camera angles of one game with one event list.
+        
+        Every event is cut from every angle in one run: the events are read and the
+        dartclips written once, and the clips of all angles share the worker pool.
+        The clips of a play sit next to each other in the clips folder as
+        Play_NNN_<Angle>.mp4 (the angle name without spaces or special characters),
+        each with its own dartclip file.
+        
+        Args:
+            sources (list): One dict per angle with the keys:
+                - angle (str): Name of the angle, e.g. "All 22"
+                - video (str): Path to the recording of the angle
+                - offset (float, optional): Sync offset in seconds, added to time_offset for
+                  this recording (e.g. -1.5 if it started 1.5 s after the one the events were tagged on)
+            events (list): List of events with timing information (Event records or row dictionaries).
+            output_folder (str, optional): Path to the output folder. If None, a folder selection dialog will open.
+            start_number (int, optional): Number of the first play (default: the start_number of the configuration).
+            name (str, optional): Name of the clips folder "<name> Clips" (default: the name of the first video).
+            
+        Returns:
+            dict: Summary of the run like split_video, with one clip record per play and angle.
+            Returns None if no output folder was selected.
+            
+        Raises:
+            FileNotFoundError: If a video file does not exist.
+            ValueError: If no sources or events are given, or two angles get the same file name.
+        """
+        if not sources:
+            raise ValueError("No angle videos provided for splitting")
+        sources = [dict(source, offset=float(source.get('offset') or 0.0)) for source in sources]
+        tags = [angle_tag(source['angle']) for source in sources]
+        if not all(tags) or len(set(tags)) != len(tags):
+            raise ValueError(f"Angle names must be distinct in file names: {[source['angle'] for source in sources]}")
+        for source in sources:
+            if not os.path.exists(source['video']):
+                raise FileNotFoundError(f"Video file not found: {source['video']}")
+        
+        logger.info("Splitting angles " + ", ".join(f"{source['angle']} ({source['video']}, {source['offset']:+.3f}s)"
+                                                   for source in sources))
+        name = name or os.path.splitext(os.path.basename(sources[0]['video']))[0]
+        return self._split_sources(sources, events, output_folder, start_number, name)
+    
+    def _split_sources(self, sources: List[Dict[str, Any]], events: List[Dict[str, str]],
+                       output_folder: Optional[str], start_number: Optional[int], name: str) -> Optional[Dict[str, Any]]:
+        """
+        Cut the events from one or more source videos into the "<name> Clips" folder (see split_video).
+        
+        A source with angle None is a single video (clips Play_NNN.mp4, manifest entries by clip
+        number); other sources get the angle in the clip name and the manifest entry.
+        """
         # Extract configuration
         flag_skip = self.config['skip']
-        flag_reencode = self.config['reencode']
         flag_dartclip = self.config['create_dartclip']
         time_offset = self.config['time_offset']
         buffer = self.config['buffer']
-        start_number = self.config['start_number']  # Get the starting number from config
-        
-        # Verify video file exists
-        if not os.path.exists(video_path):
-            raise FileNotFoundError(f"Video file not found: {video_path}")
+        if start_number is None:
+            start_number = self.config['start_number']  # Get the starting number from config
             
         # Verify events
         if not events:
             raise ValueError("No events provided for splitting")
         
-        # Helper function for case-insensitive column lookup
-        def get_column_value(event, column_name):
-            # First try exact match
-            if column_name in event:
-                return event[column_name]
-            
-            # Try case-insensitive match
-            for key in event:
-                if key.lower() == column_name.lower():
-                    return event[key]
-            
-            # If not found, raise exception
-            raise KeyError(f"Required column '{column_name}' not found in event: {event}")
-        
         # Where should the clips go?
         if output_folder is None:
             video_folder = select_folder(title="Select output folder for clips")
@@ -180,8 +303,7 @@ class VideoSplitter:
             video_folder = output_folder
         
         # Path to the new folder
-        file_name = os.path.splitext(os.path.basename(video_path))[0]
-        new_folder_name = file_name + " Clips"
+        new_folder_name = name + " Clips"
         new_folder_path = os.path.join(video_folder, new_folder_name)
         
         # Create the new folder if it doesn't exist
@@ -189,92 +311,770 @@ class VideoSplitter:
             os.makedirs(new_folder_path)
             logger.info(f"Created output folder: {new_folder_path}")
         
-        # Loop for each clip
-        clips_created = 0
+        split_start = time.perf_counter()
+        total_clips = len(events) + start_number - 1
+        
+        # Job manifest of the clips folder, identifies each source by size and mtime
+        manifest = SplitManifest(new_folder_path, sources[0]['video'])
+        for source in sources:
+            source['params'] = {
+                'split_mode': self.config['split_mode'],
+                'reencode': self.config['reencode'],
+                'keyframe_align': self.config['keyframe_align'],
+                'smart_cut': self.config['smart_cut'],
+            }
+            if source['video'] in self._live_sources:
+                # A followed recording is still growing: its end is checked by follow_video, and
+                # its size and mtime change on every poll, so they would make every clip of a
+                # restarted follow run look stale. The cut range and the clip file identify the job.
+                source['duration'] = None
+            else:
+                info = get_video_info(source['video'])
+                source['duration'] = info['duration'] if info else None
+                source_stat = os.stat(source['video'])
+                source['params'].update(source_size=source_stat.st_size, source_mtime=source_stat.st_mtime)
+            if source['angle'] is not None:
+                source['params']['angle'] = source['angle']
+            if self._copies_in_process():
+                source['params']['media_backend'] = self.config['media_backend']
+            if self.config['reencode']:
+                # only re-encoded clips depend on the profile (copied clips keep their manifest entries)
+                source['params']['encoding'] = encoder_args(self.config['profile'], self.config['video_filters'])
+        
+        # Build one job per clip (and angle), keeping the Play_NNN numbering of the event list
+        jobs = []
+        clip_results = []
+        dartclip_items = []
         for index, event in enumerate(events):
             # Skip some files if requested
             if index + 1 < flag_skip:
                 logger.info(f"Skipping clip {index + 1} as per configuration")
                 continue
             
-            try:
-                # Calculate start time and duration using case-insensitive column lookup
-                starttime = float(get_column_value(event, 'Position')) / 1000 + time_offset
-                duration = float(get_column_value(event, 'Duration')) / 1000 + buffer
-                
-                # Output name with leading zeros to 3 digits (001, 010, 100)
-                # Modified to use start_number as the base
-                clip_number = index + start_number
-                output_file = f"Play_{clip_number:03d}.mp4"
+            # Output name with leading zeros to 3 digits (001, 010, 100)
+            # Modified to use start_number as the base
+            clip_number = index + start_number
+            
+            # Position and Duration were parsed to milliseconds when the event was read
+            event = as_event(event, index)
+            for source in sources:
+                angle = source['angle']
+                if angle is None:
+                    output_file = f"Play_{clip_number:03d}.mp4"
+                    manifest_key = clip_number
+                else:
+                    output_file = f"Play_{clip_number:03d}_{angle_tag(angle)}.mp4"
+                    manifest_key = f"{clip_number} {angle}"
                 output_path = os.path.join(new_folder_path, output_file)
                 
-                # Create a dartclip file from the event if requested
-                if flag_dartclip:
-                    try:
-                        create_dartclip(event, os.path.splitext(output_path)[0])
-                        logger.info(f"Created dartclip for Play_{clip_number:03d}")
-                    except Exception as e:
-                        logger.error(f"Error creating dartclip for Play_{clip_number:03d}: {e}")
+                if event.position is None or event.duration is None:
+                    error = f"Invalid or missing Position/Duration in event: {dict(event)}"
+                    logger.error(f"Column error processing clip {clip_number}: {error}")
+                    clip_results.append(self._clip_result(clip_number, output_file, 'failed', 0.0, error, angle))
+                    continue
                 
-                # Prepare FFmpeg command based on re-encoding preference
-                if not flag_reencode:
-                    # Copy video and audio
-                    cmd = [
-                        "ffmpeg",
-                        "-ss", str(starttime),
-                        "-t", str(duration),
-                        "-i", video_path,
-                        "-c:v", "copy",  # Copy video codec
-                        "-an",           # Disable audio
-                        "-v", "quiet",
-                        "-hide_banner",
-                        output_path
-                    ]
-                else:
-                    # With re-encoding to H264
-                    cmd = [
-                        "ffmpeg",
-                        "-y",  # Overwrite output if exists
-                        "-ss", str(starttime),
-                        "-t", str(duration),
-                        "-i", video_path,
-                        '-vf', 'crop=iw:ih-600',  # Crop 300 from top and bottom
-                        "-bsf:v", "h264_mp4toannexb",
-                        "-preset", "slow",  # Slow for generally best results
-                        "-crf", "18",
-                        "-x264-params", "keyint=15:scenecut=0",
-                        "-vcodec", "libx264",
-                        "-acodec", "copy",
-                        "-hide_banner",
-                        output_path
-                    ]
+                # Calculate start time and duration in seconds (in the time of this source)
+                starttime = event.position / 1000 + time_offset + source['offset']
+                duration = event.duration / 1000 + buffer
+                # e.g. an angle that started recording after the event, or stopped before it
+                error = None
+                if starttime + duration <= 0:
+                    error = (f"Event ({starttime:.3f}s to {starttime + duration:.3f}s) ends before the recording "
+                             f"{os.path.basename(source['video'])} starts")
+                elif source['duration'] and starttime >= source['duration']:
+                    error = (f"Event starts at {starttime:.3f}s, after the recording "
+                             f"{os.path.basename(source['video'])} ends ({source['duration']:.3f}s)")
+                if error:
+                    logger.warning(f"Skipping clip {clip_number}: {error}")
+                    clip_results.append(self._clip_result(clip_number, output_file, 'skipped', 0.0, error, angle))
+                    continue
+                if starttime < 0:
+                    # the recording started during the event: cut from its start to the end of the event
+                    duration += starttime
+                    starttime = 0.0
+
+                # Create a dartclip file from the event if requested (written in one batch below)
+                if flag_dartclip:
+                    dartclip_items.append((event, os.path.splitext(output_path)[0]))
                 
-                # Run the prepared command in a subprocess
-                logger.info(f"Processing clip {clip_number}/{len(events) + start_number - 1}")
-                subprocess.run(cmd, check=True)
+                params = dict(source['params'], starttime=starttime, duration=duration)
+                job_hash = event_hash(event, params)
+                if self.config['resume'] and manifest.is_complete(manifest_key, job_hash):
+                    logger.info(f"Skipping clip {clip_number}, already complete: {output_file}")
+                    clip_results.append(self._clip_result(clip_number, output_file, 'skipped', 0.0, angle=angle))
+                    continue
                 
-                # Verify the output file exists
-                if os.path.exists(output_path):
-                    clips_created += 1
-                    logger.info(f"Created clip: {output_file}")
+                jobs.append({
+                    'clip_number': clip_number,
+                    'angle': angle,
+                    'video_path': source['video'],
+                    'output_file': output_file,
+                    'output_path': output_path,
+                    'starttime': starttime,
+                    'duration': duration,
+                    'params': params,
+                    'event_hash': job_hash,
+                    'manifest': manifest,
+                    'manifest_key': manifest_key,
+                })
+        
+        if dartclip_items:
+            with self.progress.stage('dartclips', count=len(dartclip_items)):
+                self._write_dartclips(dartclip_items)
+        
+        # Use the keyframe index for exact copy ranges. Single-pass copies always need it,
+        # since output-side seeking cannot find the keyframe before a clip on its own.
+        # The in-process copy starts on a keyframe as well.
+        if not self.config['reencode'] and (self.config['keyframe_align'] or self.config['smart_cut'] or
+                                            self.config['split_mode'] == 'single_pass' or
+                                            self._copies_in_process()):
+            with self.progress.stage('keyframe_index'):
+                for source in sources:
+                    self._apply_keyframe_index(source['video'],
+                                               [job for job in jobs if job['video_path'] == source['video']])
+        
+        with self.progress.stage('clips', count=len(jobs)):
+            clip_results.extend(self._run_clip_jobs(sources[0]['video'], jobs, total_clips))
+        angle_order = {source['angle']: position for position, source in enumerate(sources)}
+        clip_results.sort(key=lambda result: (result['clip_number'], angle_order[result['angle']]))
+        
+        # Keep the probe results of the verified clips for the next run
+        # (follow_video saves them once when it stops)
+        if not self._live_sources:
+            default_probe_cache().save()
+        
+        clips_created = sum(1 for result in clip_results if result['status'] == 'created')
+        clips_skipped = sum(1 for result in clip_results if result['status'] == 'skipped')
+        clips_failed = len(clip_results) - clips_created - clips_skipped
+        wall_time = time.perf_counter() - split_start
+        
+        logger.info(f"Finished processing {clips_created} clips in {new_folder_path} "
+                    f"({clips_skipped} skipped, {clips_failed} failed, {wall_time:.1f}s)")
+        return {
+            'output_folder': new_folder_path,
+            'clips_created': clips_created,
+            'clips_skipped': clips_skipped,
+            'clips_failed': clips_failed,
+            'wall_time': wall_time,
+            'split_mode': self.config['split_mode'],
+            'clips': clip_results,
+            'stage_times': self.progress.stage_times(),
+        }
+
+    def follow_video(self, video_path: str, csv_path: str, output_folder: Optional[str] = None,
+                     poll_interval: float = 2.0, idle_timeout: float = 120.0,
+                     stop_event: Optional[threading.Event] = None) -> Optional[Dict[str, Any]]:
+        """
+        Split a recording that is still running, while the event CSV is still being tagged.
+
+        Every poll reads the rows appended to the CSV and how far the recording has been
+        written (see utils/pf_follow.py). A clip is cut as soon as its end, including
+        time_offset and buffer, lies in the written part, so it is ready seconds after the
+        play ends. The recording must be readable while it grows (fragmented MP4 or MPEG-TS).
+
+        Following stops when stop_event is set (or on Ctrl+C), or when neither the recording
+        nor the CSV has grown for idle_timeout seconds; the events still waiting are cut then.
+
+        Args:
+            video_path (str): Path to the growing recording.
+            csv_path (str): Path to the event CSV the taggers append to.
+            output_folder (str, optional): Path to the output folder. If None, a folder selection dialog will open.
+            poll_interval (float): Seconds between two checks of the files.
+            idle_timeout (float): Seconds without growth after which the recording counts as finished.
+            stop_event (threading.Event, optional): Set to stop following.
+
+        Returns:
+            dict: Summary of all clips, like split_video, with the key events (the events read).
+            Returns None if no output folder was selected.
+        """
+        if output_folder is None:
+            output_folder = select_folder(title="Select output folder for clips")
+            if not output_folder:
+                logger.error("No output folder selected")
+                return None
+
+        # the event numbers come from the CSV rows; skipped rows are filtered here
+        cutter = VideoSplitter(dict(self.config, skip=0, progress=self.progress))
+        cutter._live_sources[video_path] = {'info': None, 'keyframe_index': None}
+        first_number = self.config['start_number']
+        skip = self.config['skip']
+        time_offset = self.config['time_offset']
+        buffer = self.config['buffer']
+
+        tail = EventTail(csv_path)
+        watcher = RecordingWatcher(video_path, self.config['media_backend'])
+        events = []
+        pending = []
+        results = []
+        follow_start = time.perf_counter()
+        logger.info(f"Following {video_path} and {csv_path}")
+
+        while True:
+            new_events = [event for event in tail.read_new() if event.index + 1 >= skip]
+            events.extend(new_events)
+            pending.extend(new_events)
+
+            recorded = watcher.recorded_until()
+            idle = min(watcher.idle_seconds(), tail.idle_seconds())
+            finished = (stop_event is not None and stop_event.is_set()) or idle >= idle_timeout
+
+            if finished:
+                ready = pending
+            else:
+                # events without a valid time are reported as failed right away
+                ready = [event for event in pending
+                         if event.position is None or event.duration is None or
+                         recorded is not None and
+                         (event.position + event.duration) / 1000 + time_offset + buffer <= recorded]
+            if ready and os.path.exists(video_path):
+                cut = {event.index for event in ready}
+                pending = [event for event in pending if event.index not in cut]
+                # one split per run of consecutive rows keeps the Play_NNN numbers of the CSV
+                ready.sort(key=lambda event: event.index)
+                runs = [[ready[0]]]
+                for event in ready[1:]:
+                    if event.index == runs[-1][-1].index + 1:
+                        runs[-1].append(event)
+                    else:
+                        runs.append([event])
+                for run in runs:
+                    results.append(cutter.split_video(video_path, run, output_folder,
+                                                      start_number=first_number + run[0].index))
+                    logger.info(f"Cut clips {first_number + run[0].index} to {first_number + run[-1].index} "
+                                f"(recorded until {recorded or 0.0:.1f}s)")
+
+            self.progress.emit('follow', recorded=recorded, events=len(events), pending=len(pending),
+                               clips=sum(result['clips_created'] for result in results))
+            if finished:
+                break
+            try:
+                if stop_event is not None:
+                    stop_event.wait(poll_interval)
                 else:
-                    logger.warning(f"Failed to create clip: {output_file}")
-                    
-            except KeyError as e:
-                logger.error(f"Column error processing clip {index + start_number}: {e}")
-            except subprocess.CalledProcessError as e:
-                logger.error(f"FFmpeg error processing clip {index + start_number}: {e}")
+                    time.sleep(poll_interval)
+            except KeyboardInterrupt:
+                # Ctrl+C ends the recording: the next poll cuts what is still waiting
+                logger.info("Stopped following, cutting the remaining events")
+                stop_event = threading.Event()
+                stop_event.set()
+
+        if pending:
+            logger.error(f"{len(pending)} events could not be cut, the recording {video_path} does not exist")
+        default_probe_cache().save()
+        summary = merge_split_results(results, time.perf_counter() - follow_start, self.progress)
+        summary['events'] = events
+        return summary
+
+    def _run_clip_jobs(self, video_path: str, jobs: List[Dict[str, Any]], total_clips: int) -> List[Dict[str, Any]]:
+        """
+        Run the FFmpeg work for every clip, either serially or on a bounded thread pool.
+        
+        In 'per_clip' mode every clip is one FFmpeg task. In 'single_pass' mode the
+        clips are grouped into batches of ``single_pass_batch`` outputs and each batch
+        is one FFmpeg task that reads the source once.
+        
+        Args:
+            video_path (str): Path to the source video file (of the jobs without a video_path).
+            jobs (list): Clip jobs as built by split_video.
+            total_clips (int): Highest clip number, used for progress messages.
+            
+        Returns:
+            list: One clip result per job, in the same order as the jobs (grouped by
+                  source video in single-pass mode).
+        """
+        split_mode = self.config['split_mode']
+        if split_mode == 'per_clip':
+            tasks = [[job] for job in jobs]
+            run_task = self._run_clip_job
+        elif split_mode == 'single_pass':
+            # a batch reads a single source
+            batch_size = max(1, int(self.config['single_pass_batch']))
+            source_jobs = {}
+            for job in jobs:
+                source_jobs.setdefault(job.get('video_path', video_path), []).append(job)
+            tasks = [group[i:i + batch_size] for group in source_jobs.values()
+                     for i in range(0, len(group), batch_size)]
+            run_task = self._run_single_pass_batch
+        else:
+            raise ValueError(f"Unknown split_mode: {split_mode}")
+        
+        if self.config['reencode']:
+            # x264 jobs share the core budget instead of starting one thread per core each
+            workers = self._plan_encode_threads(video_path, tasks)
+        else:
+            workers = self.config['workers'] or os.cpu_count() or 1
+        workers = max(1, min(int(workers), len(tasks) or 1))
+        
+        try:
+            if workers == 1:
+                task_results = [run_task(task[0].get('video_path', video_path), task, total_clips, False)
+                                for task in tasks]
+            else:
+                logger.info(f"Running {len(tasks)} {split_mode} tasks on {workers} workers")
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(run_task, task[0].get('video_path', video_path), task, total_clips, True)
+                               for task in tasks]
+                    # Collect in submission order so the results follow the Play_NNN numbering
+                    task_results = [future.result() for future in futures]
+        finally:
+            self._close_media_sources()
+        
+        return [result for results in task_results for result in results]
+    
+    def _source_info(self, video_path: str) -> Optional[Dict[str, Any]]:
+        """Probe info of a source; a followed recording is probed once, not on every poll."""
+        live = self._live_sources.get(video_path)
+        if live is None:
+            return get_video_info(video_path)
+        if live['info'] is None:
+            live['info'] = get_video_info(video_path)
+        return live['info']
+    
+    def _plan_encode_threads(self, video_path: str, tasks: List[List[Dict[str, Any]]]) -> int:
+        """
+        Split the core budget across concurrent re-encode tasks.
+        
+        With a fixed number of workers, each gets an equal share of the budget.
+        With workers = 0 / None, the scheduler picks the number of jobs and threads
+        that finishes the clips of this run soonest (see utils/pf_scheduler.py).
+        The threads are stored in the clip jobs.
+        
+        Returns:
+            int: Number of tasks to run concurrently.
+        """
+        budget = self.config['core_budget'] or os.cpu_count() or 1
+        workers = self.config['workers'] or None
+        threads = self.config['threads_per_job']
+        
+        if threads:
+            workers = workers or max(1, budget // threads)
+        elif tasks:
+            # each task is cut from one source; angles may differ in resolution and frame rate
+            profile_cost = get_profile(self.config['profile'])['cost']
+            source_costs = {}
+            costs = []
+            for task in tasks:
+                source = task[0].get('video_path', video_path)
+                if source not in source_costs:
+                    source_costs[source] = encode_cost(profile_cost, self._source_info(source))
+                costs.append(source_costs[source])
+            durations = [sum(job['duration'] for job in task) for task in tasks]
+            plan = plan_encodes(durations, budget, costs, jobs=workers)
+            workers, threads = plan['jobs'], plan['threads']
+            logger.info(f"Encoding {len(tasks)} tasks as {workers} jobs x {threads} threads "
+                        f"(core budget {budget}, estimated {plan['makespan']:.0f}s)")
+        
+        for task in tasks:
+            for job in task:
+                job['threads'] = threads
+        return workers or 1
+    
+    def _run_clip_job(self, video_path: str, jobs: List[Dict[str, Any]], total_clips: int,
+                      capture_output: bool = False) -> List[Dict[str, Any]]:
+        """
+        Cut a single clip with its own FFmpeg process and time it.
+        
+        Args:
+            video_path (str): Path to the source video file.
+            jobs (list): A single clip job with clip_number, output_file, output_path,
+                starttime and duration.
+            total_clips (int): Highest clip number, used for progress messages.
+            capture_output (bool): Capture FFmpeg's stderr instead of letting it write to the
+                console. Used by the worker pool so the output of parallel jobs does not interleave.
+            
+        Returns:
+            list: The clip result (see split_video).
+        """
+        job = jobs[0]
+        clip_number = job['clip_number']
+        starttime = job['starttime']
+        duration = job['duration']
+        output_ts_offset = None
+        if job.get('keyframe_aligned'):
+            # Seek just past the keyframe so FFmpeg does not fall back to the one before it,
+            # and shift the copy back so the keyframe is not cut off by the edit list
+            starttime += SEEK_EPSILON
+            duration -= SEEK_EPSILON
+            output_ts_offset = SEEK_EPSILON
+        
+        logger.info(f"Processing clip {clip_number}/{total_clips}")
+        clip_start = time.perf_counter()
+        if job.get('split_point') is not None:
+            error = self._run_smart_cut(video_path, job, capture_output)
+        elif self._copies_in_process() and job.get('keyframe_aligned'):
+            error = self._write_segment(video_path, job)
+        else:
+            cmd = self._build_clip_command(video_path, starttime, duration, job['output_path'], job.get('threads'),
+                                           output_ts_offset)
+            error = self._run_ffmpeg(cmd, capture_output, duration, clip=clip_number)
+        wall_time = time.perf_counter() - clip_start
+        if error:
+            logger.error(f"FFmpeg error processing clip {clip_number}: {error}")
+        
+        return [self._verify_clip(job, wall_time, error)]
+    
+    def _copies_in_process(self) -> bool:
+        """True if copied clips are written in-process (media_backend 'pyav', per-clip copy)."""
+        return (self.config['media_backend'] == 'pyav' and not self.config['reencode'] and
+                self.config['split_mode'] == 'per_clip')
+    
+    def _write_segment(self, video_path: str, job: Dict[str, Any]) -> Optional[str]:
+        """
+        Copy a keyframe-aligned clip from the source kept open by this worker thread.
+        
+        Returns:
+            str or None: Error message, or None on success.
+        """
+        try:
+            sources = getattr(self._media_local, 'sources', None)
+            if sources is None:
+                sources = self._media_local.sources = {}
+            source = sources.get(video_path)
+            if source is None:
+                source = sources[video_path] = MediaSource(video_path, self.config['media_backend'])
+                with self._media_lock:
+                    self._media_sources.append(source)
+            source.write_segment(job['output_path'], job['starttime'], job['starttime'] + job['duration'])
+        except Exception as e:
+            return f"In-process copy failed: {e}"
+        return None
+    
+    def _close_media_sources(self) -> None:
+        """Close the sources opened by the in-process copy."""
+        with self._media_lock:
+            for source in self._media_sources:
+                source.close()
+            self._media_sources = []
+        self._media_local = threading.local()
+    
+    def _run_single_pass_batch(self, video_path: str, jobs: List[Dict[str, Any]], total_clips: int,
+                               capture_output: bool = False) -> List[Dict[str, Any]]:
+        """
+        Cut a batch of clips with one FFmpeg process that reads the source once.
+        
+        The input is opened a single time, seeked to the start of the earliest clip
+        in the batch, and every clip is written as a separate output with its own
+        output-side ``-ss``/``-t``. In copy mode the clips are keyframe aligned, so
+        each one starts on the keyframe at or before its position as in per-clip mode.
+        
+        Args:
+            video_path (str): Path to the source video file.
+            jobs (list): Clip jobs of this batch.
+            total_clips (int): Highest clip number, used for progress messages.
+            capture_output (bool): Capture FFmpeg's stderr instead of letting it write to the console.
+            
+        Returns:
+            list: One clip result per job. The batch wall time is split evenly across its clips.
+        """
+        output_starts = [self._single_pass_start(job) for job in jobs]
+        
+        # Input seek slightly before the earliest clip: timestamps of the batch are
+        # relative to batch_start afterwards
+        batch_start = max(0.0, min(output_starts) - SEEK_EPSILON)
+        threads = jobs[0].get('threads')
+        cmd = ["ffmpeg"] + self._global_args()
+        if threads:
+            cmd += ["-threads", str(threads)]
+        if batch_start > 0:
+            cmd += ["-ss", str(batch_start)]
+        cmd += ["-i", video_path]
+        for job, output_start in zip(jobs, output_starts):
+            end = job['starttime'] + job['duration']
+            cmd += self._map_args()
+            if output_start > 0:
+                cmd += ["-ss", str(output_start - batch_start)]
+            if job.get('keyframe_aligned'):
+                # Make the copied keyframe the first timestamp of the clip
+                cmd += ["-t", str(end - output_start)]
+                cmd += ["-output_ts_offset", str(output_start - job['starttime'])]
+            else:
+                # The window opens SEEK_EPSILON early; keep its length so the frame at the end
+                # of the clip stays out, as in a per-clip cut
+                cmd += ["-t", str(job['duration'])]
+            cmd += self._codec_args(threads)
+            cmd.append(job['output_path'])
+        
+        logger.info(f"Processing clips {jobs[0]['clip_number']}-{jobs[-1]['clip_number']}/{total_clips} in a single pass")
+        batch_timer = time.perf_counter()
+        batch_duration = max(job['starttime'] + job['duration'] for job in jobs) - batch_start
+        error = self._run_ffmpeg(cmd, capture_output, batch_duration, clip=jobs[0]['clip_number'])
+        wall_time = (time.perf_counter() - batch_timer) / len(jobs)
+        if error:
+            logger.error(f"FFmpeg error processing clips {jobs[0]['clip_number']}-{jobs[-1]['clip_number']}: {error}")
+        
+        return [self._verify_clip(job, wall_time, error) for job in jobs]
+    
+    @staticmethod
+    def _single_pass_start(job: Dict[str, Any]) -> float:
+        """
+        Source time at which a single-pass output starts writing (its output-side -ss).
+        
+        A stream copy only starts on a keyframe whose decoding timestamp is past -ss,
+        and with B-frames that is a few frames before the keyframe is displayed. A
+        keyframe-aligned clip therefore opens its window right after the previous
+        keyframe, so the first keyframe that passes is the one it was aligned to.
+        A clip on the very first keyframe gets no -ss at all (returns 0).
+        """
+        if job.get('keyframe_aligned'):
+            previous_keyframe = job.get('previous_keyframe')
+            return previous_keyframe + SEEK_EPSILON if previous_keyframe is not None else 0.0
+        return max(0.0, job['starttime'] - SEEK_EPSILON)
+    
+    def _apply_keyframe_index(self, video_path: str, jobs: List[Dict[str, Any]]) -> None:
+        """
+        Adjust the copy ranges of the clip jobs using the keyframe index of the source.
+        
+        With keyframe_align, each clip starts exactly on the keyframe at or before its
+        event (the end of the clip stays where it was). With smart_cut, clips that do
+        not start on a keyframe get a split_point: the part before it is re-encoded and
+        the rest is stream-copied. Smart cut needs an H.264 source and per-clip mode;
+        otherwise the clips are keyframe aligned instead.
+        
+        Args:
+            video_path (str): Path to the source video file.
+            jobs (list): Clip jobs as built by split_video, modified in place.
+        """
+        live = self._live_sources.get(video_path)
+        if live is not None:
+            # a growing recording: only the packets written since the last poll are scanned
+            index = update_keyframe_index(video_path, live['keyframe_index'], self.config['media_backend'])
+            live['keyframe_index'] = index
+        else:
+            index = load_keyframe_index(video_path)
+        keyframes = index['keyframes']
+        if not keyframes:
+            logger.warning(f"No keyframes found in {video_path}, cutting without the keyframe index")
+            return
+        
+        smart_cut = self.config['smart_cut']
+        if smart_cut and (index['codec'] != 'h264' or self.config['split_mode'] != 'per_clip'):
+            logger.warning("Smart cut needs an H.264 source and split_mode='per_clip', "
+                           "aligning clips to keyframes instead")
+            smart_cut = False
+        
+        for job in jobs:
+            starttime = job['starttime']
+            end = starttime + job['duration']
+            
+            if is_keyframe(keyframes, starttime) or not smart_cut:
+                keyframe = keyframe_at_or_before(keyframes, starttime)
+                if keyframe is None:
+                    keyframe = keyframes[0]
+                job['starttime'] = keyframe
+                job['duration'] = end - keyframe
+                job['keyframe_aligned'] = True
+                job['previous_keyframe'] = keyframe_at_or_before(keyframes, keyframe - 2 * SEEK_EPSILON)
+            else:
+                # Re-encode up to the next keyframe (or the whole clip if it has none)
+                next_keyframe = keyframe_after(keyframes, starttime)
+                job['split_point'] = min(next_keyframe, end) if next_keyframe is not None else end
+    
+    def _run_smart_cut(self, video_path: str, job: Dict[str, Any], capture_output: bool = False) -> Optional[str]:
+        """
+        Cut a clip by re-encoding the fragment before its first keyframe and copying the rest.
+        
+        Both parts are written as MPEG-TS (parameter sets in-band) to a temporary folder
+        next to the clip and then joined with the concat demuxer without re-encoding.
+        
+        Args:
+            video_path (str): Path to the source video file.
+            job (dict): Clip job with a split_point.
+            capture_output (bool): Capture FFmpeg's stderr instead of letting it write to the console.
+            
+        Returns:
+            str or None: Error message, or None on success.
+        """
+        starttime = job['starttime']
+        end = starttime + job['duration']
+        split_point = job['split_point']
+        
+        with tempfile.TemporaryDirectory(prefix=".smartcut_", dir=os.path.dirname(job['output_path'])) as tmp_folder:
+            parts = [os.path.join(tmp_folder, "head.ts")]
+            head_cmd = [
+                "ffmpeg", "-y", "-v", "error", "-hide_banner",
+                "-ss", str(starttime),
+                "-i", video_path,
+                "-t", str(split_point - starttime),
+                "-map", "0:v:0",
+                "-c:v", "libx264",
+                "-preset", "fast",
+                "-crf", "18",
+                "-an",
+                "-f", "mpegts",
+                parts[0]
+            ]
+            error = self._run_ffmpeg(head_cmd, capture_output, split_point - starttime, clip=job['clip_number'])
+            if error:
+                return f"Smart cut head: {error}"
+            
+            if end - split_point > SEEK_EPSILON:
+                parts.append(os.path.join(tmp_folder, "tail.ts"))
+                tail_cmd = [
+                    "ffmpeg", "-y", "-v", "error", "-hide_banner",
+                    "-ss", str(split_point + SEEK_EPSILON),
+                    "-i", video_path,
+                    "-t", str(end - split_point - SEEK_EPSILON),
+                    "-map", "0:v:0",
+                    "-c:v", "copy",
+                    "-bsf:v", "h264_mp4toannexb",
+                    "-an",
+                    "-f", "mpegts",
+                    parts[1]
+                ]
+                error = self._run_ffmpeg(tail_cmd, capture_output, end - split_point, clip=job['clip_number'])
+                if error:
+                    return f"Smart cut tail: {error}"
+            
+            list_file = os.path.join(tmp_folder, "parts.txt")
+            with open(list_file, "w") as f:
+                f.writelines(f"file '{os.path.basename(part)}'\n" for part in parts)
+            
+            concat_cmd = ["ffmpeg"] + self._global_args() + [
+                "-f", "concat",
+                "-safe", "0",
+                "-i", list_file,
+                "-c", "copy",
+                job['output_path']
+            ]
+            return self._run_ffmpeg(concat_cmd, capture_output, clip=job['clip_number'])
+    
+    def _run_ffmpeg(self, cmd: List[str], capture_output: bool = False, duration: Optional[float] = None,
+                    **fields: Any) -> Optional[str]:
+        """
+        Run an FFmpeg command and return an error message, or None on success.
+        
+        FFmpeg never gets to read from our stdin, so parallel jobs cannot block on a prompt.
+        With an active progress reporter, FFmpeg's progress (against the expected
+        ``duration``) is reported with the given fields and stderr is always captured.
+        """
+        if self.progress.active:
+            try:
+                returncode, stderr = run_ffmpeg(cmd, duration, self.progress, stage='clip', **fields)
             except Exception as e:
-                logger.error(f"Unexpected error processing clip {index + start_number}: {e}")
+                return f"Unexpected error: {e}"
+            if not returncode:
+                return None
+            error = f"FFmpeg exited with status {returncode}"
+            if stderr.strip():
+                error += f": {stderr.strip().splitlines()[-1]}"
+            return error
+        
+        try:
+            subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL,
+                           stderr=subprocess.PIPE if capture_output else None)
+        except subprocess.CalledProcessError as e:
+            error = f"FFmpeg exited with status {e.returncode}"
+            if e.stderr and e.stderr.strip():
+                error += f": {e.stderr.decode(errors='replace').strip().splitlines()[-1]}"
+            return error
+        except Exception as e:
+            return f"Unexpected error: {e}"
+        return None
+    
+    def _verify_clip(self, job: Dict[str, Any], wall_time: float, error: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Check the output of a finished clip job, record it in the job manifest and
+        create its result record.
+        
+        A clip only counts as created if the file can be probed and has a duration,
+        so a clip cut off by a crash is cut again on the next run.
+        """
+        size = duration = None
+        if not error:
+            if not os.path.exists(job['output_path']):
+                error = "Output file was not created"
+            else:
+                size = os.path.getsize(job['output_path'])
+                duration = probe_duration(job['output_path'])
+                if not duration:
+                    error = "Output file is not a readable video"
+        
+        manifest = job.get('manifest')
+        if manifest is not None:
+            manifest.record(job.get('manifest_key', job['clip_number']), job['output_file'], job['event_hash'], job['params'],
+                            'failed' if error else 'created', size, duration, error)
+        
+        self.progress.emit('clip', clip=job['clip_number'], file=job['output_file'],
+                           status='failed' if error else 'created', seconds=round(wall_time, 3),
+                           size=size, duration=duration, threads=job.get('threads'))
+        
+        if error:
+            logger.warning(f"Failed to create clip: {job['output_file']} ({error})")
+            return self._clip_result(job['clip_number'], job['output_file'], 'failed', wall_time, error,
+                                     job.get('angle'))
+        
+        logger.info(f"Created clip: {job['output_file']} ({wall_time:.2f}s)")
+        return self._clip_result(job['clip_number'], job['output_file'], 'created', wall_time,
+                                 angle=job.get('angle'))
+    
+    def _build_clip_command(self, video_path: str, starttime: float, duration: float, output_path: str,
+                            threads: Optional[int] = None, output_ts_offset: Optional[float] = None) -> List[str]:
+        """
+        Build the FFmpeg command for a single clip based on the re-encoding preference.
+        
+        Args:
+            video_path (str): Path to the source video file.
+            starttime (float): Start of the clip in seconds.
+            duration (float): Length of the clip in seconds.
+            output_path (str): Path of the clip to write.
+            threads (int, optional): Decoder and encoder threads of a re-encode.
+            output_ts_offset (float, optional): Time added to the output timestamps, e.g. to
+                move a copied keyframe just before the seek position back to the clip start.
+            
+        Returns:
+            list: FFmpeg command line.
+        """
+        input_args = ["-threads", str(threads)] if threads else []
+        output_args = ["-output_ts_offset", str(output_ts_offset)] if output_ts_offset else []
+        return (["ffmpeg"] + self._global_args() + input_args +
+                ["-ss", str(starttime), "-t", str(duration), "-i", video_path] +
+                output_args + self._codec_args(threads) + [output_path])
+    
+    def _global_args(self) -> List[str]:
+        """FFmpeg global options for the configured re-encoding preference."""
+        # Always overwrite: the job manifest decides which clips need to be (re)written
+        if not self.config['reencode']:
+            return ["-y", "-v", "quiet", "-hide_banner"]
+        return ["-y", "-hide_banner"]
+    
+    def _map_args(self) -> List[str]:
+        """Stream selection for one output of a multi-output (single-pass) command."""
+        if not self.config['reencode']:
+            return ["-map", "0:v:0"]
+        return ["-map", "0:v:0", "-map", "0:a:0?"]
+    
+    def _codec_args(self, threads: Optional[int] = None) -> List[str]:
+        """FFmpeg output options for the configured re-encoding preference."""
+        if not self.config['reencode']:
+            # Copy video and audio
+            return [
+                "-c:v", "copy",  # Copy video codec
+                "-an",           # Disable audio
+            ]
         
-        logger.info(f"Finished processing {clips_created} clips in {new_folder_path}")
-        return new_folder_path
+        # With re-encoding to H264, settings from the encoding profile
+        return encoder_args(self.config['profile'], self.config['video_filters'], threads)
+    
+    @staticmethod
+    def _clip_result(clip_number: int, output_file: str, status: str, wall_time: float,
+                     error: Optional[str] = None, angle: Optional[str] = None) -> Dict[str, Any]:
+        """Create the result record of a single clip."""
+        return {
+            'clip_number': clip_number,
+            'angle': angle,
+            'output_file': output_file,
+            'status': status,
+            'wall_time': wall_time,
+            'error': error,
+        }
     
     def create_dartclips_for_folder(self, events: List[Dict[str, str]], clips_folder: str, 
                                    file_pattern: str = "Play_{:03d}.mp4") -> int:
         """
         Create dartclip files for existing video clips in a folder.
         
+        The folder is listed once and all dartclip files are written in one batch.
+        
         Args:
             events (list): List of event dictionaries from CSV.
             clips_folder (str): Folder containing the video clips.
@@ -293,34 +1093,48 @@ class VideoSplitter:
             logger.error(f"Clips folder not found: {clips_folder}")
             return 0
         
-        dartclips_created = 0
+        existing_files = set(os.listdir(clips_folder))
+        
+        dartclip_items = []
         for index, event in enumerate(events):
             # Generate the expected filename based on the pattern and start_number
             clip_number = index + start_number
             clip_name = file_pattern.format(clip_number)
-            clip_path = os.path.join(clips_folder, clip_name)
             
             # Skip if the clip doesn't exist
-            if not os.path.exists(clip_path):
-                logger.warning(f"Clip not found: {clip_path}")
+            if clip_name not in existing_files:
+                logger.warning(f"Clip not found: {os.path.join(clips_folder, clip_name)}")
                 continue
             
-            # Create the dartclip file
-            try:
-                # Use the filename without extension as the base for the dartclip
-                base_path = os.path.splitext(clip_path)[0]
-                create_dartclip(event, base_path)
-                dartclips_created += 1
-                logger.info(f"Created dartclip for {clip_name}")
-            except Exception as e:
-                logger.error(f"Error creating dartclip for {clip_name}: {e}")
+            # Use the filename without extension as the base for the dartclip
+            dartclip_items.append((event, os.path.join(clips_folder, os.path.splitext(clip_name)[0])))
         
+        dartclips_created = self._write_dartclips(dartclip_items)
         logger.info(f"Created {dartclips_created} dartclip files")
         return dartclips_created
+    
+    def _write_dartclips(self, dartclip_items: List[Tuple[Any, str]]) -> int:
+        """
+        Write the dartclip files of many clips in one batch.
+        
+        Args:
+            dartclip_items (list): (event, output name without extension) pairs.
+            
+        Returns:
+            int: Number of dartclip files written.
+        """
+        workers = self.config['workers'] or os.cpu_count() or 1
+        errors = create_dartclips(dartclip_items, workers=workers)
         
+        for (event, output_name), error in zip(dartclip_items, errors):
+            if error:
+                logger.error(f"Error creating dartclip for {os.path.basename(output_name)}: {error}")
+        return sum(1 for error in errors if error is None)
+    
     def process_video(self, video_path: Optional[str] = None, 
                      csv_path: Optional[str] = None,
-                     clips_folder: Optional[str] = None) -> Any:
+                     clips_folder: Optional[str] = None,
+                     output_folder: Optional[str] = None) -> Any:
         """
         Process a video file according to the configuration.
         
@@ -334,9 +1148,12 @@ class VideoSplitter:
             video_path (str, optional): Path to the video file. Required if split_video=True.
             csv_path (str, optional): Path to the CSV file with events data. Always required.
             clips_folder (str, optional): Path to folder with existing clips. Required if split_video=False.
+            output_folder (str, optional): Folder in which the clips folder is created when splitting.
+            
+            Paths that are not given are asked for with a dialog.
             
         Returns:
-            str or int: Path to output folder if splitting video, or number of dartclips created.
+            dict or int: Split summary (see split_video) if splitting video, or number of dartclips created.
         """
         # Select CSV file if not provided (needed for all operations)
         if not csv_path:
@@ -368,8 +1185,7 @@ class VideoSplitter:
             
             # Split the video
             try:
-                output_folder = self.split_video(video_path, events)
-                return output_folder
+                return self.split_video(video_path, events, output_folder)
             except Exception as e:
                 logger.error(f"Failed to split video: {e}")
                 return None
@@ -397,6 +1213,37 @@ class VideoSplitter:
             return None
 
 
+def angle_tag(angle: str) -> str:
+    """Angle name as used in clip file names, e.g. "All 22" -> "All22"."""
+    return re.sub(r'[^\w-]+', '', str(angle))
+
+
+def merge_split_results(results: List[Dict[str, Any]], wall_time: float,
+                        progress: Optional[ProgressReporter] = None) -> Dict[str, Any]:
+    """
+    Combine the summaries of several split_video calls into the folder of one game.
+
+    Args:
+        results (list): Summaries returned by VideoSplitter.split_video (same output folder).
+        wall_time (float): Seconds of the whole run.
+        progress (ProgressReporter, optional): Reporter whose stage times are reported.
+
+    Returns:
+        dict: Summary with output_folder, clips_created, clips_skipped, clips_failed,
+              wall_time, clips (in Play_NNN order) and stage_times.
+    """
+    clips = sorted((clip for result in results for clip in result['clips']), key=lambda clip: clip['clip_number'])
+    return {
+        'output_folder': results[0]['output_folder'] if results else None,
+        'clips_created': sum(result['clips_created'] for result in results),
+        'clips_skipped': sum(result['clips_skipped'] for result in results),
+        'clips_failed': sum(result['clips_failed'] for result in results),
+        'wall_time': wall_time,
+        'clips': clips,
+        'stage_times': progress.stage_times() if progress is not None else {},
+    }
+
+
 def main():
     """
     Main function to run the video splitter interactively.
@@ -416,7 +1263,7 @@ def main():
             splitter = VideoSplitter({'split_video': True, 'create_dartclip': False})
             result = splitter.process_video()
             if result:
-                print(f"Successfully created clips in: {result}")
+                print(f"Successfully created {result['clips_created']} clips in: {result['output_folder']}")
             else:
                 print("Video splitting process was not completed successfully.")
                 
@@ -434,7 +1281,7 @@ def main():
             splitter = VideoSplitter({'split_video': True, 'create_dartclip': True})
             result = splitter.process_video()
             if result:
-                print(f"Successfully created clips with dartclip files in: {result}")
+                print(f"Successfully created {result['clips_created']} clips with dartclip files in: {result['output_folder']}")
             else:
                 print("Video processing was not completed successfully.")
                 
@@ -449,6 +1296,7 @@ def main():
             time_offset = float(input("Time offset in seconds (default: 0): ") or 0)
             buffer = float(input("Buffer time in seconds (default: 0.5): ") or 0.5)
             create_dartclip = input("Create dartclip files? (y/n, default: y): ").lower() != 'n'
+            workers = int(input("Number of clips to cut in parallel (default: 1): ") or 1)
             
             # Create configuration dictionary
             config = {
@@ -458,7 +1306,8 @@ def main():
                 'reencode': reencode,
                 'time_offset': time_offset,
                 'buffer': buffer,
-                'start_number': start_number
+                'start_number': start_number,
+                'workers': workers
             }
             
             # Create splitter with custom configuration
@@ -466,7 +1315,7 @@ def main():
             result = splitter.process_video()
             
             if result:
-                print(f"Successfully processed video with custom configuration. Output in: {result}")
+                print(f"Successfully processed video with custom configuration. Output in: {result['output_folder']}")
             else:
                 print("Video processing with custom configuration was not completed successfully.")
                 